@@ -1,5 +1,6 @@
 from addict import Dict
 from base.base import Base
+from base.cow_dict import CowDict
 from api import topology, gds, tag, equivalent_circuit
 import toolbox
 import copy
@@ -61,19 +62,19 @@ class Design(Base):
 
     def extract_options(self):
         """
-        Extract the current object's design options and return a deep copy.
+        Extract the current object's design options.
 
         Input:
             None
         
         Output:
-            options: Dict, containing a deep copy of the current design object's topology, GDS, and tag options.
+            options: CowDict, containing independent copies of the current design object's topology, GDS, and tag options.
         """
-        options = Dict()
+        options = CowDict()
         options.topology = self.topology.options
         options.gds = self.gds.options
         options.tag = self.tag.options
-        return copy.deepcopy(options)
+        return options
 
     def inject_options(self, options):
         """
@@ -425,18 +426,19 @@ class Design(Base):
         diagram.savefig(circ_path)
         return
 
-    def generate_equivalent_circuit(self):
+    def generate_equivalent_circuit(self, edit: bool = False, backend: str = "symbolic"):
         """
         Generate an equivalent circuit.
 
         Input:
-            None
+            edit: bool, if True open the GUI to edit the circuit, default is False (headless, see EquivalentCircuit.show).
+            backend: str, 'symbolic' or 'numeric', eigenvalue backend of the qucat Network.
         
         Output:
             None
         """
         topo_ops = copy.deepcopy(self.topology.options)
-        self.equivalent_circuit.generate_equ_circ_from_topo(topo_ops=topo_ops)
+        self.equivalent_circuit.generate_equ_circ_from_topo(topo_ops=topo_ops, edit=edit, backend=backend)
         return
 
     def generate_random_topo_edges(self, edges_num: int = None):
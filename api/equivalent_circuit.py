@@ -9,6 +9,7 @@ import func_modules
 import copy
 import numpy as np
 import qucat
+import time
 
 class EquivalentCircuit(Base):
     def __init__(self, **init_ops):
@@ -37,7 +38,12 @@ class EquivalentCircuit(Base):
         self.options_path = None  
         self.qcsv_path = None  
         self.rcsv_path = None  
+        self.netlist = None  # In-memory equivalent circuit, written to the files above by save()
         self.op_name_list = list(self.__dict__.keys())  
+        self.qucat_cir = None  # qucat circuit, built from the netlist by get_qucat_circuit
+        self.qucat_backend = "symbolic"
+        self._qucat_cir_source = None  # (netlist, version) qucat_cir was built from
+        self.timings = Dict()  # seconds spent building the netlist, the qucat Network and in the GUI
 
         # Call the module to generate equivalent circuit options
         options = func_modules.equ_circ.generate_equivalent_circuit(**init_ops)
@@ -74,12 +80,15 @@ class EquivalentCircuit(Base):
             setattr(self, op_name, op_value)  
         return
 
-    def generate_equ_circ_from_topo(self, topo_ops):
+    def generate_equ_circ_from_topo(self, topo_ops, edit=False, backend="symbolic"):
         """
         Generate an equivalent circuit based on topology parameters.
 
         Input:
             topo_ops: dict, topology parameters.
+            edit: bool, if True open the GUI to edit the circuit. Otherwise (default) the circuit is built headless,
+                  the qucat Network is built from the netlist at the first calculation and show() opens the GUI.
+            backend: str, 'symbolic' or 'numeric', eigenvalue backend of the qucat Network.
 
         Output:
             None
@@ -88,23 +97,74 @@ class EquivalentCircuit(Base):
         self.options_path = "./equ_circ_files/equ_circ_options.txt"
         self.qcsv_path = "./equ_circ_files/qubit.csv"
         self.rcsv_path = "./equ_circ_files/readout.csv"
+        self.qucat_backend = backend
+        self.qucat_cir = None
+        self.timings = Dict()
 
         # Call the module to generate an equivalent circuit
-        equ_circ.generate_equ_circ(topo_ops=topo_ops, 
-                                   txt_path=self.options_path, 
-                                   qcsv_path=self.qcsv_path, 
-                                   rcsv_path=self.rcsv_path)
+        start = time.perf_counter()
+        self.netlist = equ_circ.generate_equ_circ_netlist(topo_ops)
+        self.timings.netlist = time.perf_counter() - start
+        if not edit:
+            return
+
+        # The GUI reads the circuit from the files
+        self.save()
         
         #from equ_circ.qucat import GUI
         from qucat import GUI
 
+        start = time.perf_counter()
+
         self.qucat_cir = GUI(self.options_path,  # Location of the circuit file
                edit=True,  # Open the GUI to edit the circuit
                plot=True,  # Plot the circuit after editing
                print_network=False  # Do not print the network
                )
+
+        self.timings.gui = time.perf_counter() - start
+
+        # Keep the edits made in the GUI, the qucat circuit is rebuilt with the selected backend at the next calculation
+        self.netlist = equ_circ.load_equ_circ(self.options_path, self.qcsv_path, self.rcsv_path)
+        self.qucat_cir = None
+        self._qucat_cir_source = None
+        return
+
+    def save(self, txt_path=None, qcsv_path=None, rcsv_path=None):
+        """
+        Write the equivalent circuit to its txt and csv files.
+
+        Input:
+            txt_path: str, path of the txt file, default self.options_path.
+            qcsv_path: str, path of the qubit csv file, default self.qcsv_path.
+            rcsv_path: str, path of the coupling csv file, default self.rcsv_path.
+
+        Output:
+            None
+        """
+        self.netlist.save(txt_path=txt_path or self.options_path,
+                          qcsv_path=qcsv_path or self.qcsv_path,
+                          rcsv_path=rcsv_path or self.rcsv_path)
         return
 
+    def get_qucat_circuit(self):
+        """
+        Qucat circuit of the equivalent circuit, rebuilt from the in-memory netlist after changes.
+
+        Input:
+            None
+
+        Output:
+            qucat Qcircuit object.
+        """
+        source = self._qucat_cir_source
+        if self.qucat_cir is None or source is None or source[0] is not self.netlist or source[1] != self.netlist.version:
+            start = time.perf_counter()
+            self.qucat_cir = self.netlist.network(backend=self.qucat_backend)
+            self._qucat_cir_source = (self.netlist, self.netlist.version)
+            self.timings.network = time.perf_counter() - start
+        return self.qucat_cir
+
     def show(self):
         """
         Display the generated equivalent circuit.
@@ -115,8 +175,12 @@ class EquivalentCircuit(Base):
         Output:
             None
         """
+        self.save()
         path = self.options_path  
         equ_circ.display_equ_circ(txt_path=path)  
+        # The circuit may have been edited in the GUI, rebuild the qucat circuit at the next calculation
+        self.netlist = equ_circ.load_equ_circ(self.options_path, self.qcsv_path, self.rcsv_path)
+        self.qucat_cir = None
         return
 
     def change_qubit_options(self, qubit_name, value):
@@ -130,9 +194,7 @@ class EquivalentCircuit(Base):
         Output:
             None
         """
-        options_path = self.options_path  
-        qcsv_path = self.qcsv_path  
-        equ_circ.change_qubit_options(options_path, qcsv_path, qubit_name, value)
+        self.netlist.change_qubit_options(qubit_name, value)
         return
 
     def change_coupling_options(self, coupling_line_name, op_name, op_value):
@@ -147,9 +209,7 @@ class EquivalentCircuit(Base):
         Output:
             None
         """
-        options_path = self.options_path  
-        rcsv_path = self.rcsv_path  
-        equ_circ.change_coupling_options(options_path, rcsv_path, coupling_line_name, op_name, op_value)
+        self.netlist.change_coupling_options(coupling_line_name, op_name, op_value)
         return
 
     def save_image(self, path):
@@ -162,6 +222,7 @@ class EquivalentCircuit(Base):
         Output:
             None
         """
+        self.save()
         options_path = self.options_path  
         equ_circ.save_equ_circ_image(options_path, path)
         return
@@ -176,8 +237,7 @@ class EquivalentCircuit(Base):
         Output:
             dict, containing the options for the qubit.
         """
-        qcsv_path = self.qcsv_path  
-        return equ_circ.find_qubit_options(qcsv_path=qcsv_path, qubit_name=qubit_name)
+        return self.netlist.find_qubit_options(qubit_name)
 
     def find_coupling_options(self, coupling_line_name, op_name):
         """
@@ -190,8 +250,7 @@ class EquivalentCircuit(Base):
         Output:
             dict, containing the value of the coupling line options.
         """
-        rcsv_path = self.rcsv_path  
-        return equ_circ.find_coupling_options(rcsv_path=rcsv_path, coupling_line_name=coupling_line_name, op_name=op_name)
+        return self.netlist.find_coupling_options(coupling_line_name, op_name)
 
     def calculate_qubits_parms(self, f_q, Ec):
         """
@@ -251,19 +310,19 @@ class EquivalentCircuit(Base):
             return True
         
     def call_eigenfrequencies(self, **kwargs):
-        EF = self.qucat_cir.eigenfrequencies(**kwargs)
+        EF = self.get_qucat_circuit().eigenfrequencies(**kwargs)
         return EF
     
     def call_loss_rates(self, **kwargs):
-        LR = self.qucat_cir.loss_rates(**kwargs)
+        LR = self.get_qucat_circuit().loss_rates(**kwargs)
         return LR
 
     def call_anharmonicities(self, **kwargs):
-        AH = self.qucat_cir.anharmonicities(**kwargs)
+        AH = self.get_qucat_circuit().anharmonicities(**kwargs)
         return AH
     
     def call_kerr(self, **kwargs):
-        KR = self.qucat_cir.kerr(**kwargs)
+        KR = self.get_qucat_circuit().kerr(**kwargs)
         return KR
     
 
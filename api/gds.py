@@ -5,6 +5,9 @@
 
 from addict import Dict
 from base.gds_base import GdsBase
+from base.cow_dict import CowDict
+from base.cmpnts_base import draw_cmpnts
+from base.gds_stream import GdsStreamWriter
 import func_modules.cpls
 import func_modules.qubits
 import func_modules.qubits.primitives
@@ -73,12 +76,12 @@ class Gds(GdsBase):
             None
 
         Output:
-            options: Dict, containing option parameters for all components.
+            options: CowDict, containing option parameters for all components.
         """
-        options = Dict()
+        options = CowDict()
         for cmpnts_name in self.cmpnts_name_list:
             options[cmpnts_name] = getattr(self, cmpnts_name).options
-        return copy.deepcopy(options)
+        return options
 
     def inject_options(self, options):
         """
@@ -90,20 +93,31 @@ class Gds(GdsBase):
         Output:
             None
         """
-        options = copy.deepcopy(options)
+        old_cmpnts = {}
+        for cmpnts_name in self.cmpnts_name_list:
+            if hasattr(self, cmpnts_name):
+                old_cmpnts[cmpnts_name] = getattr(self, cmpnts_name).get_cmpnts()
         self.clear()
-        for cmpnts_name, cmpnts_ops in options.items():
+        for cmpnts_name, cmpnts_ops in dict.items(options):
             cmpnts_class_name = toolbox.convert_to_camel_case(cmpnts_name)
             cmpnts_class = getattr(components, cmpnts_class_name)
-            super().__setattr__(cmpnts_name, cmpnts_class(options=cmpnts_ops))
+            cmpnts = cmpnts_class(options=cmpnts_ops)
+            cmpnts.adopt_gds(old_cmpnts.get(cmpnts_name, {}))  # Keep the cells of unchanged components
+            super().__setattr__(cmpnts_name, cmpnts)
         return
 
-    def draw_gds(self):
+    def draw_gds(self, instancing: bool = False, flatten: bool = True, profile: bool = False, workers: int = 1):
         """
         Generate GDS layout based on component composition.
 
         Input:
-            None
+            instancing: bool, if True, identical components (modulo position and rotation) share one master cell
+                        and are placed with gdspy.CellReference.
+            flatten: bool, if False, references are kept in the layout instead of being flattened into polygons.
+            profile: bool, if True, the wall time and peak memory of each phase are stored in self.draw_report
+                     and printed.
+            workers: int or None, the number of processes drawing the components, None uses all cores.
+                     The components of all groups share one process pool.
 
         Output:
             None
@@ -111,27 +125,64 @@ class Gds(GdsBase):
         gdspy.library.use_current_library = False
         self.lib = gdspy.GdsLibrary()
         self.cell_Dict = Dict()
+        self.draw_report = Dict() if profile else None
         # Draw GDS for each component
-        for cmpnts_name in self.cmpnts_name_list:
-            cmpnts = getattr(self, cmpnts_name)
-            cmpnts.draw_gds()
-        # Add each component's cell to the library
-        for cmpnts_name in self.cmpnts_name_list:
-            cmpnts = getattr(self, cmpnts_name)
-            cmpnts_cell_Dict = copy.deepcopy(cmpnts.cell_Dict)
-            for cell_name, cell in cmpnts_cell_Dict.items():
-                if cell_name not in self.cell_Dict.keys():  # If the cell does not exist, create a new one
-                    self.cell_Dict[cell_name] = self.lib.new_cell(cell_name)
-                self.cell_Dict[cell_name].add(cell)
-        # Layer by chip name
-        for chip_name, cell in self.cell_Dict.items():
-            layer_num = toolbox.custom_hash(chip_name)
-            self.cell_Dict[chip_name].flatten(single_layer=layer_num, single_datatype=0)
+        with toolbox.profile_phase(self.draw_report, "draw_components"):
+            if workers != 1:
+                cmpnt_list = []
+                for cmpnts_name in self.cmpnts_name_list:
+                    cmpnt_list.extend(getattr(self, cmpnts_name).get_drawn_cmpnts(instancing))
+                draw_cmpnts(cmpnt_list, workers)  # The groups below only assemble the drawn cells
+            for cmpnts_name in self.cmpnts_name_list:
+                cmpnts = getattr(self, cmpnts_name)
+                cmpnts.draw_gds(instancing=instancing, flatten=flatten)
+        # Add each component's cell to the library, the polygons are shared with the component cells
+        with toolbox.profile_phase(self.draw_report, "assemble"):
+            for cmpnts_name in self.cmpnts_name_list:
+                cmpnts = getattr(self, cmpnts_name)
+                for cell_name, cell in cmpnts.cell_Dict.items():
+                    if cell_name not in self.cell_Dict.keys():  # If the cell does not exist, create a new one
+                        self.cell_Dict[cell_name] = self.lib.new_cell(cell_name)
+                    self.cell_Dict[cell_name].add(cell)
+        # Layer by chip name, without flattening the master cells are already on their chip layer
+        with toolbox.profile_phase(self.draw_report, "remap_layers"):
+            for chip_name, cell in self.cell_Dict.items():
+                layer_num = toolbox.custom_hash(chip_name)
+                toolbox.flatten_to_layer(cell, layer_num, 0, keep_references=not flatten)
         # Create the overall cell
         module_name = toolbox.convert_to_snake_case(self.__class__.__name__)
         self.cell = self.lib.new_cell(module_name)
         for chip_name, chip_cell in self.cell_Dict.items():
             self.cell.add(chip_cell)
+        if not flatten:
+            self.lib.add(self.cell, include_dependencies=True)  # Master cells must be written with the layout
+        if profile:
+            for phase, record in self.draw_report.items():
+                print("{}: {:.3f} s, peak memory {:.2f} MB".format(phase, record.time, record.peak_memory / 2**20))
+        return
+
+    def stream_gds(self, path: str, instancing: bool = False, release: bool = True, progress=None, timestamp=None):
+        """
+        Write the GDS layout to a file component by component, without building the whole library in memory.
+        The file is identical to the one written by save_gds with the default draw options.
+
+        Input:
+            path: str, the path of the GDS file.
+            instancing: bool, place identical components through a shared master cell.
+            release: bool, if True, the geometry of each component is dropped once written,
+                     the next draw redraws it.
+            progress: callable or None, called as progress(done, total, cmpnt_name) after each component.
+            timestamp: datetime, the modification time written to the file, the current time if None.
+
+        Output:
+            None
+        """
+        cmpnts_list = [getattr(self, cmpnts_name) for cmpnts_name in self.cmpnts_name_list]
+        total = sum(len(cmpnts.cmpnt_name_list) for cmpnts in cmpnts_list)
+        writer = GdsStreamWriter(path, timestamp=timestamp, progress=progress, total=total)
+        for cmpnts in cmpnts_list:
+            writer.write_cmpnts(cmpnts, instancing=instancing, release=release)
+        writer.close(toolbox.convert_to_snake_case(self.__class__.__name__))
         return
 
     def calc_general_ops(self):
@@ -261,9 +312,8 @@ class Gds(GdsBase):
         Output:
             None
         """
-        ops = self.options
-        q0_ops = copy.deepcopy(ops.qubits[q0_name])
-        q1_ops = copy.deepcopy(ops.qubits[q1_name])
+        q0_ops = getattr(self.qubits, q0_name).options
+        q1_ops = getattr(self.qubits, q1_name).options
 
         cpl_ops = func_modules.cpls.add_cpl(q0_ops=q0_ops,
                                                 q0_pin_num=q0_pin_num,
@@ -273,8 +323,7 @@ class Gds(GdsBase):
                                                 chip=chip,
                                                 geometric_ops=geometric_ops)
 
-        ops.coupling_lines[cpl_ops.name] = copy.deepcopy(cpl_ops)
-        self.inject_options(ops)
+        self.coupling_lines.add(cpl_ops)  # Only the new coupling line is created
         return
 
     def routing(self, **routing_ops):
@@ -287,8 +336,7 @@ class Gds(GdsBase):
         Output:
             None
         """
-        gds_ops = self.options
-        routing_ops["gds_ops"] = copy.deepcopy(gds_ops)  # Pass GDS options as routing parameters
+        routing_ops["gds_ops"] = self.options  # Pass GDS options as routing parameters, a copy-on-write view
         gds_ops = routing.routing(**routing_ops)  # Call the routing module to generate routing information
         self.inject_options(gds_ops)  # Update GDS options
         return
@@ -448,19 +496,21 @@ class Gds(GdsBase):
         # Future logic implementation
         return
 
-    def generate_cross_overs_from_cpls_and_tmls(self, **gene_ops):
+    def generate_cross_overs_from_cpls_and_tmls(self, control_lines: bool = False, **gene_ops):
         """
         Generate crossovers (compatible with old versions).
 
         Input:
+            control_lines: bool, if True, crossings with the control lines are covered as well.
             gene_ops: dict, containing parameters for generating crossovers.
 
         Output:
             None
         """
-        gds_ops = copy.deepcopy(self.options)
-        gene_ops["cpls_ops"] = copy.deepcopy(gds_ops.coupling_lines)  # Pass coupling line parameters
-        gene_ops["tmls_ops"] = copy.deepcopy(gds_ops.transmission_lines)  # Pass transmission line parameters
+        gene_ops["cpls_ops"] = copy.deepcopy(self.coupling_lines.options)  # Pass coupling line parameters
+        gene_ops["tmls_ops"] = copy.deepcopy(self.transmission_lines.options)  # Pass transmission line parameters
+        if control_lines:
+            gene_ops["ctls_ops"] = copy.deepcopy(self.control_lines.options)  # Pass control line parameters
         self.cross_overs.generate_cross_overs(**gene_ops)  # Call the crossover generation method
         return
 
@@ -482,10 +532,15 @@ class Gds(GdsBase):
             if gene_ops["transmission_lines"] == True:
                 gene_ops["tmls_ops"] = copy.deepcopy(self.transmission_lines.options)  # Pass transmission line parameters
             del gene_ops["transmission_lines"]
+        if "control_lines" in gene_ops.keys():
+            if gene_ops["control_lines"] == True:
+                gene_ops["ctls_ops"] = copy.deepcopy(self.control_lines.options)  # Pass control line parameters
+            del gene_ops["control_lines"]
         self.cross_overs.initialization(**gene_ops)  # Initialize crossovers
         return
 
-    def auto_generate_indium_bumps(self, coord1, coord2, min_distance_points, min_distance_polygons, chip_name, type):
+    def auto_generate_indium_bumps(self, coord1, coord2, min_distance_points, min_distance_polygons, chip_name, type,
+                                   keep_out_chips: list = None, plot: bool = False):
         """
         Automatically generate indium bumps.
 
@@ -496,24 +551,28 @@ class Gds(GdsBase):
             min_distance_polygons: float, the minimum distance between polygons.
             chip_name: str, the name of the chip.
             type: str, the type of bump.
+            keep_out_chips: list, the chips whose polygons the bumps keep away from, all chips if None.
+            plot: bool, whether to plot the polygons and the generated bumps.
 
         Output:
             None
         """
-        gds_ops = self.options
-        temp_gds_file = self.save_gds("./for_auto_gene_indium.gds")  # Save temporary GDS file
+        self.draw_gds()  # Unchanged components keep their cached cells
+        if keep_out_chips is None:
+            keep_out_chips = list(self.cell_Dict.keys())
+        cells = [self.cell_Dict[name] for name in keep_out_chips if name in self.cell_Dict.keys()]
 
-        indium_ops = func_modules.indium_bumps.indium_primitive.process_gds_with_indium_optimized(
-            temp_gds_file, 
-            coord1, 
-            coord2, 
-            min_distance_points, 
+        indium_ops = func_modules.indium_bumps.indium_primitive.process_cells_with_indium(
+            cells,
+            coord1,
+            coord2,
+            min_distance_points,
             min_distance_polygons,
             chip_name,
-            type
+            type,
+            plot=plot
         )
-        gds_ops.indium_bumps = copy.deepcopy(indium_ops)  # Save generated indium bump parameters
-        self.inject_options(gds_ops)  # Update GDS options
+        self.indium_bumps.inject_options(indium_ops)  # Only the indium bumps are re-created
         return
 
     def auto_generate_air_bridge(self, line_type, line_name, spacing=120, chip_name="chip3"):
@@ -546,8 +605,7 @@ class Gds(GdsBase):
 
         corner_radius = gds_ops[line_type][line_name].corner_radius
         ab_ops = func_modules.others.air_bridge_primitive.add_air_bridges(path, corner_radius, spacing, chip_name)  # Generate air bridge
-        gds_ops.others.update(ab_ops)  # Update other component parameters
-        self.inject_options(gds_ops)  # Update GDS options
+        self.others.batch_add(list(ab_ops.values()))  # Add or replace only the generated air bridges
         return
 
     def auto_generate_air_bridge2(self, line_type, line_name, spacing=120, chip_name="chip3", width=10, air_bridge_type="AirBridge"):
@@ -588,8 +646,7 @@ class Gds(GdsBase):
                                                                         chip_name=chip_name,
                                                                         width=width,
                                                                         air_bridge_type=air_bridge_type)
-        gds_ops.air_bridges = copy.deepcopy(ab_ops)
-        self.inject_options(gds_ops)
+        self.air_bridges.inject_options(ab_ops)  # Only the air bridges are re-created
         return
     
     def auto_generate_air_bridge3(self, line_type, line_name, spacing=120, chip_name="chip3", width=10, air_bridge_type="AirBridgeNb"):
@@ -630,8 +687,7 @@ class Gds(GdsBase):
                                                                         chip_name=chip_name,
                                                                         width=width,
                                                                         air_bridge_type=air_bridge_type)
-        gds_ops.air_bridges = copy.deepcopy(ab_ops)
-        self.inject_options(gds_ops)
+        self.air_bridges.inject_options(ab_ops)  # Only the air bridges are re-created
         return
     
     def auto_generate_air_bridge4(self, line_type, line_name, spacing=120, chip_name="chip3", width=10, air_bridge_type="AirBridgeNb"):
@@ -673,28 +729,59 @@ class Gds(GdsBase):
                                                                          chip_name=chip_name,
                                                                          width=width,
                                                                          air_bridge_type=air_bridge_type)
-        gds_ops.air_bridges = copy.deepcopy(ab_ops)
-        self.inject_options(gds_ops)
+        self.air_bridges.inject_options(ab_ops)  # Only the air bridges are re-created
         return
-    
-    def optimize_air_bridges_layout(self):
+
+    def auto_generate_air_bridges_all(self, line_types=("control_lines", "transmission_lines"), spacing=120, chip_name=None, width=10, air_bridge_type="AirbridgeNb"):
         """
-        Automatically optimize air bridges layout.
+        Automatically generate air bridges for all lines of the given types in one call, as auto_generate_air_bridge4 does for one line.
+        Lines without pos/path or corner_radius are skipped, and the existing air bridges are replaced.
 
         Input:
-            None
+            line_types: tuple or list, the types of lines, supports "control_lines" and "transmission_lines".
+            spacing: float, the spacing of the air bridge, default is 120.
+            chip_name: str, the name of the chip, the chip of each line if None.
+            width: float, the width of the air bridge, default is 10.
+            air_bridge_type: str, the type of air bridge, default is "AirbridgeNb".
 
         Output:
-            None
+            skipped: list, the names of the lines that were not bridged.
+        """
+        allow_type_list = ["control_lines", "transmission_lines"]
+        for line_type in line_types:
+            if line_type not in allow_type_list:
+                raise ValueError("Automatic generation of air bridges for {} has not been developed.".format(line_type))
+
+        ab_ops, skipped = func_modules.air_bridges.auto_generate_air_bridges_ops_all(gds_ops=self.options,
+                                                                                     line_types=line_types,
+                                                                                     spacing=spacing,
+                                                                                     chip_name=chip_name,
+                                                                                     width=width,
+                                                                                     air_bridge_type=air_bridge_type)
+        self.air_bridges.inject_options(ab_ops)  # Only the air bridges are re-created
+        return skipped
+
+    def optimize_air_bridges_layout(self, priority=None):
+        """
+        Automatically optimize air bridges layout: overlapping air bridges of all lines are found at once
+        and removed in a deterministic order of priority.
+
+        Input:
+            priority: callable or None, priority(index, name, ops) returning a sortable key, lower values are kept first.
+                      If None, the overlaps at the corners of each line are resolved as before (the corner bridge is
+                      kept if its two neighbours overlap, removed otherwise), then the options order is used.
+
+        Output:
+            report: Dict, the number of overlapping pairs, the removed air bridges and the bridges they overlapped.
         """
 
         # parameters preparation
         gds_ops = self.options
 
         # operation
-        new_gds_ops = func_modules.air_bridges.optimize_air_bridges_layout(gds_ops)
-        self.inject_options(new_gds_ops)
-        return
+        new_gds_ops, report = func_modules.air_bridges.optimize_air_bridges_layout(gds_ops, priority=priority)
+        self.air_bridges.inject_options(new_gds_ops.air_bridges)  # Only the air bridges are re-created
+        return report
     
     def get_gds_bounding_box(self):
         min_coor, max_coor = toolbox.get_cell_bounding_box(self.cell)
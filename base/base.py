@@ -94,7 +94,7 @@ class Base():
             None
 
         Output:
-            options: dict, the current object's parameters (deep copy).
+            options: dict, the current object's parameters. `extract_options` already returns an
+                     independent dictionary (a copy-on-write view for components), so no further copy is made.
         """
-        options = self.extract_options()  # Extract all parameters of the current object
-        return copy.deepcopy(options)  # Return a deep copy of the parameters
\ No newline at end of file
+        return self.extract_options()  # Extract all parameters of the current object
\ No newline at end of file
@@ -1,4 +1,5 @@
 from addict import Dict
+from base.cow_dict import CowDict
 import toolbox
 import copy
 
@@ -6,6 +7,13 @@ class BranchBase():
     """
     The BranchBase class, a base class for handling logic of different branches.
     Provides common functionalities such as branch processing and hash method generation.
+
+    Ownership of the options:
+        - The branch options are kept as a copy-on-write view (CowDict) of the caller's options, nothing is copied
+          when the branch is created and the caller's options are never modified.
+        - Each branch method receives its own view and may modify it freely, it returns a new sub-tree.
+        - The result is not copied here. The public entry function of a module (e.g. gene_rdls) makes the one
+          copy at the API boundary, so the returned options share nothing with the caller's options.
     """
 
     def __init__(self, **branch_options):
@@ -18,7 +26,7 @@ class BranchBase():
         Output:
             None
         """
-        self.branch_options = Dict(branch_options)  # Store branch options as an accessible dictionary structure
+        self.branch_options = CowDict.share(branch_options)  # View of the branch options, children are copied on access
         return
 
     def branch_process(self):
@@ -29,19 +37,21 @@ class BranchBase():
             1. Generate a unique hash value based on the keys of `branch_options`.
             2. If the generated hash value is empty, return an empty dictionary.
             3. If the hash value is not defined as a class method, throw an exception.
-            4. If the method corresponding to the hash value exists, call that method to execute branch logic.
+            4. If the method corresponding to the hash value exists, call that method with a new view of the
+               branch options to execute branch logic.
 
         Input:
             None (operates based on class attribute `branch_options`).
 
         Output:
-            result: dict, the result of branch processing (returned after a deep copy).
+            result: dict, the result of branch processing. It may share unmodified children with the branch
+                    options, the caller copies it once if it needs an independent tree.
 
         Exception:
             ValueError: Thrown when the generated hash value is not defined as a class method.
         """
         # Extract branch options and generate a hash value
-        branch_options = copy.deepcopy(self.branch_options)  # Deep copy branch options to prevent modification of original data
+        branch_options = CowDict.share(self.branch_options)  # Private view, modifications do not reach the original data
         hash_num = self.hash_method(list(branch_options.keys()))  # Generate hash value
 
         # If the hash value is empty, directly return an empty dictionary
@@ -53,10 +63,7 @@ class BranchBase():
             raise ValueError("No method {} defined".format(hash_num))
         
         # Call the method corresponding to the hash value for branch processing
-        result = getattr(self, hash_num)(branch_options)
-
-        # Return a deep copy of the processing result
-        return copy.deepcopy(result)
+        return getattr(self, hash_num)(branch_options)
 
     def hash_method(self, options_name_list):
         """
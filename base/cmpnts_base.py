@@ -3,11 +3,47 @@
 ############################
 
 from addict import Dict
-import copy, gdspy, library
+from concurrent.futures import ProcessPoolExecutor
+import copy, gdspy, library, os
 from base.gds_base import GdsBase
+from base.library_base import LibraryBase
+from base.cow_dict import CowDict
+from base.gds_stream import GdsStreamWriter
 import toolbox
 
 
+def draw_cmpnts(cmpnt_list, workers: int = 1):
+    """
+    Draws the GDS cells of the components whose parameters changed since their last draw.
+
+    With more than one worker the components are drawn in a process pool and the drawn cells are
+    sent back to the components of this process, in the order of cmpnt_list. On platforms that spawn
+    processes (Windows, macOS) the calling script needs an `if __name__ == "__main__":` guard.
+
+    Input:
+        cmpnt_list: list, the components (LibraryBase) to draw.
+        workers: int or None, the number of processes, None uses all cores, 1 draws in this process.
+
+    Output:
+        None
+    """
+    dirty_list = [cmpnt for cmpnt in cmpnt_list if cmpnt.is_gds_dirty()]
+    if workers == 1 or len(dirty_list) < 2:
+        for cmpnt in dirty_list:
+            cmpnt.refresh_gds()
+        return
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(dirty_list) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        states = executor.map(LibraryBase.draw_gds_state,
+                              [type(cmpnt) for cmpnt in dirty_list],
+                              [cmpnt.dump_gds_state() for cmpnt in dirty_list],
+                              chunksize=chunksize)
+        for cmpnt, state in zip(dirty_list, states):
+            cmpnt.load_gds_state(state)
+    return
+
+
 class CmpntsBase(GdsBase):
     """
     The CmpntsBase class, a base class for components, includes common methods for all components.
@@ -42,13 +78,14 @@ class CmpntsBase(GdsBase):
             None
 
         Output:
-            options: Dict, a dictionary containing parameters of all components.
+            options: CowDict, a dictionary containing parameters of all components. The parameters of
+                     each component are shared with its snapshot and copied only when accessed.
         """
-        options = Dict()
+        options = CowDict()
         for cmpnt_name in self.cmpnt_name_list:
             cmpnt_inst = getattr(self, cmpnt_name)  # Get component instance
-            options[cmpnt_name] = copy.deepcopy(getattr(cmpnt_inst, "options"))  # Deep copy parameters
-        return copy.deepcopy(options)
+            dict.__setitem__(options, cmpnt_name, cmpnt_inst.snapshot_options())  # Share parameters
+        return options
 
     def inject_options(self, options):
         """
@@ -63,31 +100,90 @@ class CmpntsBase(GdsBase):
         Exception:
             ValueError: Throws an exception when the component type is empty or not defined in the library.
         """
-        options = copy.deepcopy(options)
+        old_cmpnts = self.get_cmpnts()
         self.clear()  # Clear existing components
-        for cmpnt_name, cmpnt_ops in options.items():
-            cmpnt_type = cmpnt_ops.type
+        for cmpnt_name, cmpnt_ops in dict.items(options):  # Components copy their own parameters
+            self._put_cmpnt(cmpnt_name, self._create_cmpnt(cmpnt_name, cmpnt_ops))
+        self.adopt_gds(old_cmpnts)  # Keep the cells of unchanged components
 
-            ### Error checking ###
-            if cmpnt_type == Dict():
-                raise ValueError(f"{cmpnt_name}'s type is empty!")  # Exception for empty type
+    def get_cmpnts(self):
+        """
+        Returns the current component instances.
 
-            module_name = toolbox.convert_to_snake_case(self.__class__.__name__)
-            module_name_list = getattr(getattr(library, module_name), "module_name_list")
-            class_name_list = [toolbox.convert_to_camel_case(i) for i in module_name_list]
-            if cmpnt_type not in class_name_list:
-                raise ValueError(f"{cmpnt_type} not in {class_name_list}")  # Exception for undefined type
+        Input:
+            None
+
+        Output:
+            cmpnts: dict, mapping component names to component instances.
+        """
+        return {cmpnt_name: getattr(self, cmpnt_name) for cmpnt_name in self.cmpnt_name_list}
+
+    def adopt_gds(self, old_cmpnts):
+        """
+        Reuses the drawn cells of previous component instances whose parameters did not change.
+
+        Input:
+            old_cmpnts: dict, mapping component names to previous component instances.
+
+        Output:
+            None
+        """
+        for cmpnt_name in self.cmpnt_name_list:
+            if cmpnt_name in old_cmpnts:
+                getattr(self, cmpnt_name).adopt_gds(old_cmpnts[cmpnt_name])
+
+    def _create_cmpnt(self, cmpnt_name, cmpnt_ops):
+        """
+        Creates a single component instance from its parameters, without registering it.
+
+        Input:
+            cmpnt_name: str, the name of the component.
+            cmpnt_ops: dict, the parameters of the component.
+
+        Output:
+            cmpnt_inst: LibraryBase, the created component instance.
+
+        Exception:
+            ValueError: Throws an exception when the component type is empty or not defined in the library.
+        """
+        cmpnt_type = cmpnt_ops.type
+
+        ### Error checking ###
+        if cmpnt_type == Dict():
+            raise ValueError(f"{cmpnt_name}'s type is empty!")  # Exception for empty type
+
+        module_name = toolbox.convert_to_snake_case(self.__class__.__name__)
+        module_name_list = getattr(getattr(library, module_name), "module_name_list")
+        class_name_list = [toolbox.convert_to_camel_case(i) for i in module_name_list]
+        if cmpnt_type not in class_name_list:
+            raise ValueError(f"{cmpnt_type} not in {class_name_list}")  # Exception for undefined type
+
+        return getattr(getattr(library, module_name), cmpnt_type)(options=cmpnt_ops)
+
+    def _put_cmpnt(self, cmpnt_name, cmpnt_inst):
+        """
+        Registers a component instance, replacing an existing component with the same name in place.
 
-            ### Inject component instances ###
-            super().__setattr__(cmpnt_name, getattr(getattr(library, module_name), cmpnt_type)(options=cmpnt_ops))
+        Input:
+            cmpnt_name: str, the name of the component.
+            cmpnt_inst: LibraryBase, the component instance.
+
+        Output:
+            None
+        """
+        super().__setattr__(cmpnt_name, cmpnt_inst)
+        if cmpnt_name not in self.cmpnt_name_list:
             self.cmpnt_name_list.append(cmpnt_name)
 
-    def draw_gds(self):
+    def draw_gds(self, instancing: bool = False, flatten: bool = True, workers: int = 1):
         """
         Draws the GDS layout of the components.
 
         Input:
-            None
+            instancing: bool, if True, components that support instancing and have identical geometric
+                        parameters share one master cell and are placed with gdspy.CellReference.
+            flatten: bool, if False, the chip cells keep their references instead of being flattened.
+            workers: int or None, the number of processes drawing the components, see draw_cmpnts.
 
         Output:
             None
@@ -96,19 +192,23 @@ class CmpntsBase(GdsBase):
         self.lib = gdspy.GdsLibrary()
         self.cell_Dict = Dict()
 
-        # Generate libs for each component
-        for cmpnt_name in self.cmpnt_name_list:
-            cmpnt = getattr(self, cmpnt_name)
-            cmpnt.draw_gds()
+        # Generate libs for each component, unchanged components keep their cached cells
+        draw_cmpnts(self.get_drawn_cmpnts(instancing), workers)
 
         # Traverse components and add component cells by chip
         for cmpnt_name in self.cmpnt_name_list:
             cmpnt = getattr(self, cmpnt_name)
-            chip_name = cmpnt.chip
-            if chip_name is None or chip_name == Dict():
-                chip_name = "None"
+            chip_name = self.get_chip_name(cmpnt)
             if chip_name not in self.cell_Dict.keys():
                 self.cell_Dict[chip_name] = self.lib.new_cell(chip_name)
+
+            # Instanced components are placed as references to a shared master cell
+            if instancing and cmpnt.instance_pos_key is not None:
+                master_cell = self.get_master_cell(cmpnt, chip_name)
+                origin, rotation = cmpnt.instance_transform()
+                self.cell_Dict[chip_name].add(gdspy.CellReference(master_cell, origin=origin, rotation=rotation))
+                continue
+
             self.cell_Dict[chip_name].add(cmpnt.cell)
 
             # Special handling for qubit's jj_chip
@@ -120,16 +220,95 @@ class CmpntsBase(GdsBase):
                     self.cell_Dict[jj_chip_name] = self.lib.new_cell(jj_chip_name)
                 self.cell_Dict[jj_chip_name].add(cmpnt.jj_cell)
 
-        # Layer by chip
+        # Layer by chip, master cells are already on the chip layer when references are kept
         for chip_name, cell in self.cell_Dict.items():
             layer_num = toolbox.custom_hash(chip_name)
-            self.cell_Dict[chip_name].flatten(single_layer=layer_num, single_datatype=0)
+            toolbox.flatten_to_layer(cell, layer_num, 0, keep_references=not flatten)
 
         # Create the overall cell
         module_name = toolbox.convert_to_snake_case(self.__class__.__name__)
         self.cell = self.lib.new_cell(module_name)
         for chip_name, chip_cell in self.cell_Dict.items():
             self.cell.add(chip_cell)
+        if not flatten:
+            self.lib.add(self.cell, include_dependencies=True)  # Master cells must be written with the layout
+
+    def stream_gds(self, path: str, instancing: bool = False, release: bool = True, progress=None, timestamp=None):
+        """
+        Writes the layout to a GDS file component by component, see GdsStreamWriter.
+        The file is identical to the one written by save_gds with the default draw options.
+
+        Input:
+            path: str, the path of the GDS file.
+            instancing: bool, place identical components through a shared master cell.
+            release: bool, if True, the geometry of each component is dropped once written.
+            progress: callable or None, called as progress(done, total, cmpnt_name) after each component.
+            timestamp: datetime, the modification time written to the file, the current time if None.
+
+        Output:
+            None
+        """
+        writer = GdsStreamWriter(path, timestamp=timestamp, progress=progress, total=len(self.cmpnt_name_list))
+        writer.write_cmpnts(self, instancing=instancing, release=release)
+        writer.close(toolbox.convert_to_snake_case(self.__class__.__name__))
+        return
+
+    @staticmethod
+    def get_chip_name(cmpnt):
+        """
+        Returns the name of the chip cell a component is drawn in.
+
+        Input:
+            cmpnt: LibraryBase, the component.
+
+        Output:
+            chip_name: str, the chip of the component, "None" if it has no chip.
+        """
+        chip_name = cmpnt.chip
+        if chip_name is None or chip_name == Dict():
+            chip_name = "None"
+        return chip_name
+
+    def get_drawn_cmpnts(self, instancing: bool = False):
+        """
+        Returns the components that are drawn individually, i.e. not placed as references to a master cell.
+
+        Input:
+            instancing: bool, whether instancing is enabled.
+
+        Output:
+            cmpnt_list: list, the components in the order of cmpnt_name_list.
+        """
+        cmpnt_list = []
+        for cmpnt_name in self.cmpnt_name_list:
+            cmpnt = getattr(self, cmpnt_name)
+            if not (instancing and cmpnt.instance_pos_key is not None):
+                cmpnt_list.append(cmpnt)
+        return cmpnt_list
+
+    def get_master_cell(self, cmpnt, chip_name):
+        """
+        Returns the master cell shared by all components with the same geometry on a chip, drawing it on first use.
+
+        Input:
+            cmpnt: LibraryBase, a component supporting instancing.
+            chip_name: str, the chip the component belongs to.
+
+        Output:
+            master_cell: gdspy.Cell, the master geometry on the chip layer, drawn at the origin without rotation.
+        """
+        if not hasattr(self, "master_cell_Dict"):
+            self.master_cell_Dict = {}
+        key = (cmpnt.__class__.__name__, chip_name, cmpnt.instance_key())
+        if key not in self.master_cell_Dict:
+            module_name = toolbox.convert_to_snake_case(self.__class__.__name__)
+            master_name = "{}_{}_master{}".format(module_name, cmpnt.type, len(self.master_cell_Dict))
+            master = cmpnt.draw_instance_master(master_name)
+            master_cell = gdspy.Cell(master_name)
+            master_cell.add(master.cell)
+            toolbox.flatten_to_layer(master_cell, toolbox.custom_hash(chip_name), 0)
+            self.master_cell_Dict[key] = master_cell
+        return self.master_cell_Dict[key]
 
     def calc_general_ops(self):
         """
@@ -157,12 +336,11 @@ class CmpntsBase(GdsBase):
             None
         """
         for cmpnt_name in self.cmpnt_name_list:
-            cmpnt_ops = copy.deepcopy(getattr(self, cmpnt_name).options)
-            pos = copy.deepcopy(cmpnt_ops[pos_name])
-            pos = list(pos)
+            cmpnt = getattr(self, cmpnt_name)
+            pos = list(getattr(cmpnt, pos_name))
             pos = (pos[0] + dx, pos[1] + dy)
-            cmpnt_ops[pos_name] = copy.deepcopy(pos)
-            getattr(self, cmpnt_name).inject_options(cmpnt_ops)
+            cmpnt.inject_options(Dict({pos_name: pos}))
+            cmpnt.calc_general_ops()  # Pins and outline depend on the position
 
     def change_option(self, op_name, op_value):
         """
@@ -176,10 +354,9 @@ class CmpntsBase(GdsBase):
             None
         """
         for cmpnt_name in self.cmpnt_name_list:
-            cmpnt_ops = copy.deepcopy(getattr(self, cmpnt_name).options)
-            cmpnt_ops[op_name] = copy.deepcopy(op_value)
-            getattr(self, cmpnt_name).inject_options(cmpnt_ops)
-            self.calc_general_ops()  # Recalculate common parameters
+            cmpnt = getattr(self, cmpnt_name)
+            cmpnt.inject_options(Dict({op_name: op_value}))  # Unknown parameters are ignored
+            cmpnt.calc_general_ops()  # Recalculate common parameters
 
     def change_options(self, new_options):
         """
@@ -191,17 +368,15 @@ class CmpntsBase(GdsBase):
         Output:
             None
         """
-        new_options = copy.deepcopy(new_options)
         for cmpnt_name in self.cmpnt_name_list:
-            cmpnt_ops = copy.deepcopy(getattr(self, cmpnt_name).options)
-            for op_name, op_value in new_options.items():
-                cmpnt_ops[op_name] = copy.deepcopy(op_value)
-            getattr(self, cmpnt_name).inject_options(cmpnt_ops)
-            self.calc_general_ops()  # Recalculate common parameters
+            cmpnt = getattr(self, cmpnt_name)
+            cmpnt.inject_options(new_options)  # Unknown parameters are ignored
+            cmpnt.calc_general_ops()  # Recalculate common parameters
 
     def add(self, options):
         """
-        Adds a new component.
+        Adds a new component. Only the new component is instantiated; a component with the same
+        name is replaced.
 
         Input:
             options: dict, containing parameters for the new component.
@@ -221,11 +396,44 @@ class CmpntsBase(GdsBase):
         if type is None:
             raise ValueError("Please specify a type")
 
-        old_ops = copy.deepcopy(self.options)
-        new_ops = copy.deepcopy(old_ops)
+        self._put_cmpnt(name, self._create_cmpnt(name, options))
 
-        new_ops[name] = copy.deepcopy(options)
-        self.inject_options(new_ops)
+    def remove(self, name):
+        """
+        Removes a component without touching the other components.
+
+        Input:
+            name: str, the name of the component to remove.
+
+        Output:
+            None
+
+        Exception:
+            ValueError: Throws an exception when the component does not exist.
+        """
+        if name not in self.cmpnt_name_list:
+            raise ValueError(f"There is no component named {name}")
+        delattr(self, name)
+        self.cmpnt_name_list.remove(name)
+
+    def replace(self, name, options):
+        """
+        Replaces the parameters of an existing component by re-creating only that component.
+        The component keeps its position in the component list.
+
+        Input:
+            name: str, the name of the component to replace.
+            options: dict, the new parameters of the component.
+
+        Output:
+            None
+
+        Exception:
+            ValueError: Throws an exception when the component does not exist.
+        """
+        if name not in self.cmpnt_name_list:
+            raise ValueError(f"There is no component named {name}")
+        self._put_cmpnt(name, self._create_cmpnt(name, options))
 
     def copy_component(self, old_name, new_name):
         """
@@ -238,9 +446,8 @@ class CmpntsBase(GdsBase):
         Output:
             None
         """
-        ops = self.options
-        ops[new_name] = copy.deepcopy(ops[old_name])
-        self.inject_options(ops)
+        ops = getattr(self, old_name).snapshot_options()
+        self._put_cmpnt(new_name, self._create_cmpnt(new_name, ops))
 
     def generate_row(self, start_pos, dist, key, num, pre_name, type, geometric_options: Dict = None):
         """
@@ -258,19 +465,8 @@ class CmpntsBase(GdsBase):
         Output:
             None
         """
-        ops = self.options
-        for i in range(num):
-            op = Dict()
-            name = pre_name + "_{}".format(i)
-            op.name = name
-            op.type = type
-            pos = (start_pos[0] + i * dist, start_pos[1])
-            op[key] = copy.deepcopy(pos)
-            if geometric_options is not None:
-                for k, v in geometric_options.items():
-                    op[k] = copy.deepcopy(v)
-            ops[name] = copy.deepcopy(op)
-        self.inject_options(ops)
+        pos_list = [(start_pos[0] + i * dist, start_pos[1]) for i in range(num)]
+        self.batch_generate(pos_list, key, pre_name, type, geometric_options)
 
     def generate_row_middle(self, mid_pos, dist, key, num, pre_name, type, geometric_options: Dict = None):
         """
@@ -288,30 +484,18 @@ class CmpntsBase(GdsBase):
         Output:
             None
         """
-        ops = self.options
         # Generate a set of coordinate points
         pos_list = []
         for i in range(num):
             pos = (mid_pos[0] + i * dist, mid_pos[1])
-            pos_list.append(copy.deepcopy(pos))
+            pos_list.append(pos)
         move_dist = (pos_list[0][0] + pos_list[-1][0]) / 2
         for i in range(num):
-            pos = copy.deepcopy(pos_list[i])
+            pos = pos_list[i]
             pos_list[i] = (pos[0] - move_dist, pos[1])
 
-        # Generate parameters for each component
-        for i in range(num):
-            op = Dict()
-            name = pre_name + "_{}".format(i)
-            op.name = name
-            op.type = type
-            pos = copy.deepcopy(pos_list[i])
-            op[key] = copy.deepcopy(pos)
-            if geometric_options is not None:
-                for k, v in geometric_options.items():
-                    op[k] = copy.deepcopy(v)
-            ops[name] = copy.deepcopy(op)
-        self.inject_options(ops)
+        # Generate the components
+        self.batch_generate(pos_list, key, pre_name, type, geometric_options)
 
     def batch_generate(self, pos_list, key, pre_name, type, geometric_options: Dict = None):
         """
@@ -327,23 +511,20 @@ class CmpntsBase(GdsBase):
         Output:
             None
         """
-        ops = self.options
         for i in range(len(pos_list)):
-            pos = copy.deepcopy(pos_list[i])
             name = pre_name + "_{}".format(i)
             options = Dict()
             options.name = name
             options.type = type
-            options[key] = copy.deepcopy(pos)
+            options[key] = copy.deepcopy(pos_list[i])
             if geometric_options is not None:
                 for k, v in geometric_options.items():
-                    options[k] = copy.deepcopy(v)
-            ops[name] = copy.deepcopy(options)
-        self.inject_options(ops)
+                    options[k] = v  # Values are copied when the component is created
+            self._put_cmpnt(name, self._create_cmpnt(name, options))
 
     def batch_change(self, name_list, op_name, op_value):
         """
-        Batch modify component options.
+        Batch modify component options. Only the listed components are re-created.
 
         Input:
             name_list: list, a list of component names to be modified.
@@ -353,20 +534,17 @@ class CmpntsBase(GdsBase):
         Output:
             None
         """
-        ops = self.options
-        for i in range(len(name_list)):
-            name = name_list[i]
-            options = copy.deepcopy(ops[name])
-            options[op_name] = copy.deepcopy(op_value)
-            ops[name] = copy.deepcopy(options)
-        self.inject_options(ops)
+        for name in name_list:
+            options = getattr(self, name).options
+            options[op_name] = op_value  # Values are copied when the component is created
+            self.replace(name, options)
 
     def batch_add(self, options_list):
         """
-        Fast add components.
+        Fast add components. Only the new components are instantiated.
 
         Input:
-            options_list: dict, containing parameters for the new component.
+            options_list: list, containing parameters for each new component.
 
         Output:
             None
@@ -374,14 +552,10 @@ class CmpntsBase(GdsBase):
         Exception:
             ValueError: Throws an exception when the component name or type is not specified.
         """
-        # Bulk operation, avoid multiple copies and injections
-        new_ops = self.options.copy()
+        # Check all parameters first so that nothing is added when one of them is invalid
         for options in options_list:
-            name = options.name
-            type = options.type
-            if name is None or type is None:
+            if options.name is None or options.type is None:
                 raise ValueError(f"Invalid options: {options}")
 
-            new_ops[name] = options
-        
-        self.inject_options(new_ops)
\ No newline at end of file
+        for options in options_list:
+            self._put_cmpnt(options.name, self._create_cmpnt(options.name, options))
@@ -0,0 +1,150 @@
+##########################################################################
+# Copy-on-write options dictionary shared by the base classes
+##########################################################################
+
+from addict import Dict
+import copy
+
+# Leaf types that are never mutated in place and can be shared freely
+_IMMUTABLE_TYPES = (str, int, float, bool, complex, bytes, type(None))
+
+
+def detach(value):
+    """
+    Returns a private copy of an option value without touching any shared node.
+
+    Mappings become addict Dicts and lists/tuples are rebuilt element-wise,
+    matching what `Dict(options)` followed by `copy.deepcopy` used to produce.
+
+    Input:
+        value: any type, the option value to copy.
+
+    Output:
+        value: any type, a copy that shares no mutable state with the input.
+    """
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    if isinstance(value, dict):
+        new = Dict()
+        for k, v in dict.items(value):
+            dict.__setitem__(new, k, detach(v))
+        return new
+    if isinstance(value, (list, tuple)):
+        return type(value)(detach(v) for v in value)
+    return copy.deepcopy(value)
+
+
+class CowDict(Dict):
+    """
+    An addict Dict whose children may be shared with other option trees.
+
+    A CowDict created by `share` references the children of its source instead of
+    copying them. A child is copied the first time it is accessed through this node,
+    so reading stays cheap and a mutation only copies the nodes on the touched path.
+    The source tree is never modified and can be handed out again.
+    """
+
+    @classmethod
+    def share(cls, source):
+        """
+        Creates a new node that shares all children with `source`.
+
+        Input:
+            source: dict, the options tree to share.
+
+        Output:
+            node: CowDict, a node owned by the caller whose children are copied on access.
+        """
+        node = cls()
+        dict.update(node, dict.items(source))
+        return node
+
+    def _owned(self):
+        owned = self.__dict__.get("_cow_owned")
+        if owned is None:
+            owned = set()
+            object.__setattr__(self, "_cow_owned", owned)
+        return owned
+
+    def _own(self, key, value):
+        """
+        Replaces a shared child by a private copy before it is handed out.
+        """
+        owned = self._owned()
+        if key in owned or isinstance(value, _IMMUTABLE_TYPES):
+            return value
+        if isinstance(value, dict):
+            value = CowDict.share(value)
+        else:
+            value = detach(value)
+        dict.__setitem__(self, key, value)
+        owned.add(key)
+        return value
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if dict.__contains__(self, key):
+            value = self._own(key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._owned().add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._owned().discard(key)
+
+    def __iter__(self):
+        # Defined so that dict(...) and dict.update(...) read children through __getitem__
+        return iter(dict.keys(self))
+
+    def get(self, key, default=None):
+        if not dict.__contains__(self, key):
+            return default
+        return self[key]
+
+    def items(self):
+        return [(k, self[k]) for k in dict.keys(self)]
+
+    def values(self):
+        return [self[k] for k in dict.keys(self)]
+
+    def pop(self, key, *args):
+        if dict.__contains__(self, key):
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *args)
+
+    def popitem(self):
+        if not dict.__len__(self):
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(dict.keys(self)))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if dict.__contains__(self, key):
+            return self[key]
+        self[key] = default
+        return default
+
+    def copy(self):
+        return CowDict.share(self)
+
+    def __copy__(self):
+        return CowDict.share(self)
+
+    def to_dict(self):
+        return detach(self).to_dict()
+
+    def __deepcopy__(self, memo):
+        # A deep copy shares nothing, so it is a plain addict Dict tree, like the options before copy-on-write
+        other = Dict()
+        memo[id(self)] = other
+        for key, value in dict.items(self):
+            dict.__setitem__(other, copy.deepcopy(key, memo), copy.deepcopy(value, memo))
+        return other
+
+    def __reduce__(self):
+        return (self.__class__, (), None, None, iter(dict.items(self)))
@@ -68,17 +68,28 @@ class GdsBase(Base):
 
         return
 
-    def save_gds(self, path: str = "./gds.gds"):
+    def save_gds(self, path: str = "./gds.gds", stream: bool = False, **draw_ops):
         """
         Save the GDS layout to a GDS file.
 
         Input:
             path: The path to save the GDS file.
+            stream: If True, the layout is written component by component with stream_gds instead of
+                    being built in memory first. Subclasses providing stream_gds support this.
+            draw_ops: Keyword arguments passed to draw_gds, e.g. instancing=True, flatten=False or profile=True,
+                      or to stream_gds, e.g. progress=callback.
 
         Output:
             The path where the GDS file is saved.
         """
-        self.draw_gds()
         toolbox.jg_and_create_path(path)
-        self.lib.write_gds(outfile=path)
+        if stream:
+            self.stream_gds(path, **draw_ops)
+            return path
+        self.draw_gds(**draw_ops)
+        report = Dict() if draw_ops.get("profile", False) else None
+        with toolbox.profile_phase(report, "write"):
+            self.lib.write_gds(outfile=path)
+        if report is not None:
+            print("write: {:.3f} s, peak memory {:.2f} MB".format(report.write.time, report.write.peak_memory / 2**20))
         return path
\ No newline at end of file
@@ -0,0 +1,175 @@
+##########################################################################
+# Streaming GDSII export, component by component
+##########################################################################
+
+from addict import Dict
+import copy, datetime, io, struct, tempfile
+import gdspy
+import toolbox
+
+
+class GdsStreamWriter:
+    """
+    Writes the layout of component groups (CmpntsBase) to a GDSII file without building the GdsLibrary.
+
+    Each component is drawn, its records are written to a spooled buffer of its chip cell and its
+    geometry is released before the next component is drawn. The chip cells and the top cell are
+    assembled from these buffers when the writer is closed. The records are the ones
+    GdsLibrary.write_gds writes for the flattened layout built by draw_gds, in the same order,
+    so both files are byte-identical for the same timestamp.
+    """
+
+    # Size up to which a chip buffer is kept in memory before moving to a temporary file
+    spool_size = 2**24
+    # Size of the blocks copied from the buffers to the file
+    chunk_size = 2**20
+
+    def __init__(self, path, name: str = "library", unit: float = 1.0e-6, precision: float = 1.0e-9,
+                 timestamp=None, progress=None, total: int = 0):
+        """
+        Opens the GDSII file and writes the library header.
+
+        Input:
+            path: str, the path of the GDSII file.
+            name: str, the library name.
+            unit: float, the user unit in meters.
+            precision: float, the database unit in meters.
+            timestamp: datetime, the modification time written to the file, the current time if None.
+            progress: callable or None, called as progress(done, total, cmpnt_name) after each component is written.
+            total: int, the number of components to be written, passed to progress.
+
+        Output:
+            None
+        """
+        self.timestamp = datetime.datetime.today() if timestamp is None else timestamp
+        self.multiplier = unit / precision
+        self.writer = gdspy.GdsWriter(path, name=name, unit=unit, precision=precision, timestamp=self.timestamp)
+        self.chip_Dict = Dict()  # chip name -> Dict(polygons, paths, labels) record buffers
+        self.progress = progress
+        self.total = total
+        self.done = 0
+        return
+
+    def report(self, cmpnt_name):
+        """
+        Counts a written component and reports the progress.
+        """
+        self.done += 1
+        if self.progress is not None:
+            self.progress(self.done, self.total, cmpnt_name)
+        return
+
+    def get_chip(self, chip_name):
+        """
+        Returns the record buffers of a chip cell, creating them in order of first appearance.
+        """
+        if chip_name not in self.chip_Dict.keys():
+            for kind in ["polygons", "paths", "labels"]:
+                self.chip_Dict[chip_name][kind] = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        return self.chip_Dict[chip_name]
+
+    def write_elements(self, chip_name, polygons, paths, labels):
+        """
+        Writes elements to a chip cell on the layer of the chip.
+
+        Input:
+            chip_name: str, the chip cell.
+            polygons: list, PolygonSet objects, left unchanged.
+            paths: list, FlexPath or RobustPath objects, left unchanged.
+            labels: list, Label objects, left unchanged.
+
+        Output:
+            None
+        """
+        chip = self.get_chip(chip_name)
+        layer = toolbox.custom_hash(chip_name)
+        for polygon in polygons:
+            polygon = copy.copy(polygon)
+            polygon.layers = [layer] * len(polygon.polygons)
+            polygon.datatypes = [0] * len(polygon.polygons)
+            polygon.to_gds(chip.polygons, self.multiplier)
+        for path in paths:
+            path = copy.deepcopy(path)
+            path.layers = [layer] * path.n
+            path.datatypes = [0] * path.n
+            path.to_gds(chip.paths, self.multiplier)
+        for label in labels:
+            label = copy.deepcopy(label)
+            label.layer = layer
+            label.to_gds(chip.labels, self.multiplier)
+        return
+
+    def write_cmpnts(self, cmpnts, instancing: bool = False, release: bool = True):
+        """
+        Draws and writes the components of a group in the order CmpntsBase.draw_gds adds them.
+
+        Input:
+            cmpnts: CmpntsBase, the component group.
+            instancing: bool, place identical components through a shared master cell, see CmpntsBase.draw_gds.
+            release: bool, if True, the geometry of each component is dropped once written.
+
+        Output:
+            None
+        """
+        instanced_list = []
+        for cmpnt_name in cmpnts.cmpnt_name_list:
+            cmpnt = getattr(cmpnts, cmpnt_name)
+            chip_name = cmpnts.get_chip_name(cmpnt)
+            self.get_chip(chip_name)
+            if instancing and cmpnt.instance_pos_key is not None:
+                instanced_list.append((cmpnt, chip_name))
+                continue
+            cmpnt.refresh_gds()
+            self.write_elements(chip_name, cmpnt.cell.polygons, cmpnt.cell.paths, cmpnt.cell.labels)
+            if hasattr(cmpnt, "jj_cell"):
+                jj_chip_name = cmpnt.jj_chip
+                if jj_chip_name is None or jj_chip_name == Dict():
+                    jj_chip_name = "None"
+                self.write_elements(jj_chip_name, cmpnt.jj_cell.polygons, cmpnt.jj_cell.paths, cmpnt.jj_cell.labels)
+            if release:
+                cmpnt.release_gds()
+            self.report(cmpnt_name)
+        # The flattened references follow the plain geometry of the group
+        for cmpnt, chip_name in instanced_list:
+            origin, rotation = cmpnt.instance_transform()
+            reference = gdspy.CellReference(cmpnts.get_master_cell(cmpnt, chip_name), origin=origin, rotation=rotation)
+            self.write_elements(chip_name, reference.get_polygonsets(), reference.get_paths(), reference.get_labels())
+            self.report(cmpnt.name)
+        return
+
+    def write_cell(self, name, buffers_list):
+        """
+        Writes a cell whose elements are the concatenated record buffers.
+        """
+        def records():
+            header = io.BytesIO()
+            gdspy.Cell(name, exclude_from_current=True).to_gds(header, self.multiplier, self.timestamp)
+            yield header.getvalue()[:-4]  # Structure header without the end of structure record
+            for kind in ["polygons", "paths", "labels"]:
+                for buffers in buffers_list:
+                    buffers[kind].seek(0)
+                    yield from iter(lambda: buffers[kind].read(self.chunk_size), b"")
+            yield struct.pack(">2H", 4, 0x0700)
+
+        self.writer.write_binary_cells(records())
+        return
+
+    def close(self, top_name: str):
+        """
+        Writes the chip cells and the top cell containing all chips, then closes the file.
+
+        Input:
+            top_name: str, the name of the top cell.
+
+        Output:
+            None
+        """
+        for chip_name, chip in self.chip_Dict.items():
+            self.write_cell(chip_name, [chip])
+        self.write_cell(top_name, list(self.chip_Dict.values()))
+        self.writer.close()
+        for chip in self.chip_Dict.values():
+            for buffer in chip.values():
+                buffer.close()
+        self.chip_Dict = Dict()
+        return
@@ -1,12 +1,31 @@
 from base.gds_base import GdsBase
+from base.cow_dict import CowDict, detach
 from addict import Dict
-import copy
+import gdspy, math, toolbox
 
 class LibraryBase(GdsBase):
     """
     LibraryBase serves as the base class for each component, providing common methods including parameter extraction, injection, and modification.
+
+    Parameters are stored as attributes. A read-only snapshot of them is built lazily and shared
+    with every caller of `options`; assigning any parameter attribute invalidates the snapshot.
+    Parameter attributes must therefore be reassigned rather than modified in place.
+
+    The GDS cell is cached: `refresh_gds` only redraws when the parameters differ from the ones
+    recorded at the last draw.
     """
 
+    _options_snapshot = None
+    _gds_snapshot = None  # Parameter snapshot at the last draw
+    _gds_key = None  # Frozen parameters at the last draw, see toolbox.freeze_options
+
+    # Instancing: components of one class whose parameters only differ in the keys below share a master cell
+    # placed with gdspy.CellReference. A subclass opts in by naming the parameter that translates its whole
+    # geometry and, optionally, the parameter that rotates it (in radians) around that position.
+    instance_pos_key = None
+    instance_rotation_key = None
+    instance_ignore_keys = ("name", "topo_pos", "outline", "readout_pins", "control_pins", "coupling_pins")
+
     def __init__(self, options=Dict()):
         """
         Initializes the LibraryBase object.
@@ -35,13 +54,42 @@ class LibraryBase(GdsBase):
             super().__setattr__(op_name, op)
 
         # Save the list of parameter names
-        self.op_name_list = list(self.__dict__.keys())
+        self.op_name_list = [k for k in self.__dict__.keys() if not k.startswith("_")]
 
         # Inject parameters and calculate common parameters
-        self.inject_options(Dict(options))
+        self.inject_options(options if options is not None else Dict())
         self.calc_general_ops()  # Calculate common parameters
         return
 
+    def __setattr__(self, name, value):
+        """
+        Sets an attribute and drops the options snapshot when a parameter changes.
+        """
+        if name in self.__dict__.get("op_name_list", ()):
+            object.__setattr__(self, "_options_snapshot", None)
+        super().__setattr__(name, value)
+
+    def snapshot_options(self):
+        """
+        Returns the shared snapshot of all current parameters.
+
+        The snapshot is rebuilt only after a parameter has been reassigned. It must be treated as
+        read-only; use `options` or `extract_options` to get a dictionary that may be modified.
+
+        Input:
+            None
+
+        Output:
+            options: Dict, the shared parameter snapshot.
+        """
+        if self._options_snapshot is None:
+            options = Dict()
+            # Iterate over the list of parameter names and copy the corresponding attributes once
+            for op_name in self.op_name_list:
+                dict.__setitem__(options, op_name, detach(getattr(self, op_name)))
+            object.__setattr__(self, "_options_snapshot", options)
+        return self._options_snapshot
+
     def extract_options(self):
         """
         Extracts all parameters of the current object.
@@ -50,14 +98,10 @@ class LibraryBase(GdsBase):
             None
 
         Output:
-            options: dict, a dictionary containing all current parameters.
+            options: CowDict, a dictionary containing all current parameters. It shares its values
+                     with the snapshot and copies them only when they are accessed.
         """
-        options = Dict()
-        # Iterate over the list of parameter names and extract corresponding attributes
-        for op_name in self.op_name_list:
-            op = getattr(self, op_name)
-            options[op_name] = copy.deepcopy(op)  # Deep copy parameter values
-        return copy.deepcopy(options)  # Return a deep copy of the parameter dictionary
+        return CowDict.share(self.snapshot_options())
 
     def inject_options(self, options):
         """
@@ -69,11 +113,202 @@ class LibraryBase(GdsBase):
         Output:
             None
         """
-        for k, v in options.items():
+        object.__setattr__(self, "_options_snapshot", None)  # Parameters are about to change
+        for k, v in dict.items(options):
             if k in self.op_name_list:  # If the parameter name is in the defined parameter list
-                super().__setattr__(k, copy.deepcopy(v))  # Set parameter value
+                super().__setattr__(k, detach(v))  # Set a private copy of the parameter value
+        return
+
+    def is_gds_dirty(self):
+        """
+        Checks whether the GDS cell must be redrawn.
+
+        Input:
+            None
+
+        Output:
+            dirty: bool, True if nothing was drawn yet or the parameters changed since the last draw.
+        """
+        snapshot = self.snapshot_options()
+        if snapshot is self._gds_snapshot:
+            return False
+        if self._gds_key is None or toolbox.freeze_options(snapshot) != self._gds_key:
+            return True
+        # Parameters were reassigned to identical values
+        object.__setattr__(self, "_gds_snapshot", snapshot)
+        return False
+
+    def refresh_gds(self):
+        """
+        Draws the GDS cell only if the parameters changed since the last draw, otherwise keeps the cached cell.
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        if self.is_gds_dirty():
+            self.draw_gds()
+            self.record_gds()
+        return
+
+    def record_gds(self):
+        """
+        Marks the current GDS cell as up to date with the current parameters.
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        snapshot = self.snapshot_options()  # Read after drawing, in case drawing updated parameters
+        object.__setattr__(self, "_gds_snapshot", snapshot)
+        object.__setattr__(self, "_gds_key", toolbox.freeze_options(snapshot))
+        return
+
+    def release_gds(self):
+        """
+        Drops the drawn GDS objects to free their memory; the next refresh_gds draws the component again.
+
+        Input:
+            None
+
+        Output:
+            None
+        """
+        for k, v in list(self.__dict__.items()):
+            if isinstance(v, (gdspy.Cell, gdspy.GdsLibrary)):
+                object.__delattr__(self, k)
+        object.__setattr__(self, "_gds_snapshot", None)
+        object.__setattr__(self, "_gds_key", None)
+        return
+
+    def dump_gds_state(self):
+        """
+        Returns the attributes needed to draw this component in another process.
+        Previously drawn GDS objects are left out since they are replaced by the draw.
+
+        Input:
+            None
+
+        Output:
+            state: dict, attribute name -> value, picklable.
+        """
+        return {k: v for k, v in self.__dict__.items()
+                if not k.startswith("_") and not isinstance(v, (gdspy.Cell, gdspy.GdsLibrary))}
+
+    def load_gds_state(self, state):
+        """
+        Takes over the attributes of a copy of this component drawn in another process.
+
+        Input:
+            state: dict, the attributes of the drawn copy, see draw_gds_state.
+
+        Output:
+            None
+        """
+        for k, v in state.items():
+            object.__setattr__(self, k, v)
+        object.__setattr__(self, "_options_snapshot", None)  # Drawing may have updated parameters
+        self.record_gds()
         return
 
+    @staticmethod
+    def draw_gds_state(cmpnt_type, state):
+        """
+        Draws a copy of a component rebuilt from its attributes, used as the worker of a process pool.
+
+        Input:
+            cmpnt_type: type, the component class.
+            state: dict, the attributes returned by dump_gds_state.
+
+        Output:
+            state: dict, the attributes of the copy after drawing, including the GDS cells.
+        """
+        gdspy.library.use_current_library = False
+        cmpnt = cmpnt_type.__new__(cmpnt_type)
+        cmpnt.__dict__.update(state)
+        cmpnt.draw_gds()
+        return {k: v for k, v in cmpnt.__dict__.items() if not k.startswith("_")}
+
+    def adopt_gds(self, other):
+        """
+        Takes over the drawn GDS cells of another instance of the same component when the parameters are identical.
+        Used to keep the cache when components are re-created from their options.
+
+        Input:
+            other: LibraryBase, the previous instance of the component.
+
+        Output:
+            None
+        """
+        if type(other) is not type(self) or other._gds_key is None:
+            return
+        snapshot = self.snapshot_options()
+        if toolbox.freeze_options(snapshot) != other._gds_key:
+            return
+        # Attributes created by drawing (lib, cell, ...) are the ones the new instance does not have yet
+        for k, v in other.__dict__.items():
+            if k not in self.__dict__:
+                object.__setattr__(self, k, v)
+        object.__setattr__(self, "_gds_snapshot", snapshot)
+        object.__setattr__(self, "_gds_key", other._gds_key)
+        return
+
+    def instance_key(self):
+        """
+        Computes the key of the master cell shared by identical components.
+
+        Input:
+            None
+
+        Output:
+            key: tuple, the frozen parameters that affect the geometry, ignoring position and rotation
+                 (see toolbox.freeze_options), compared exactly when used as a dictionary key.
+        """
+        ignore_keys = set(self.instance_ignore_keys)
+        ignore_keys.update([self.instance_pos_key, self.instance_rotation_key])
+        snapshot = self.snapshot_options()
+        return toolbox.freeze_options({k: v for k, v in dict.items(snapshot) if k not in ignore_keys})
+
+    def instance_transform(self):
+        """
+        Returns the placement of this component relative to its master cell.
+
+        Input:
+            None
+
+        Output:
+            origin: tuple, the position of the component.
+            rotation: float, the rotation in degrees, as expected by gdspy.CellReference.
+        """
+        pos = getattr(self, self.instance_pos_key)
+        rotation = 0
+        if self.instance_rotation_key is not None:
+            rotation = math.degrees(getattr(self, self.instance_rotation_key))
+        return (pos[0], pos[1]), rotation
+
+    def draw_instance_master(self, master_name):
+        """
+        Draws a copy of this component at the origin without rotation.
+
+        Input:
+            master_name: str, the name given to the copy.
+
+        Output:
+            master: LibraryBase, the drawn copy, whose cell is the master geometry.
+        """
+        ops = self.options
+        ops.name = master_name
+        ops[self.instance_pos_key] = (0, 0)
+        if self.instance_rotation_key is not None:
+            ops[self.instance_rotation_key] = 0
+        master = self.__class__(options=ops)
+        master.draw_gds()
+        return master
+
     def change_option(self, op_name, op_value):
         """
         Modifies the value of a single parameter.
@@ -106,15 +341,11 @@ class LibraryBase(GdsBase):
         Exception:
             ValueError: Throws an exception when some parameter names do not exist.
         """
-        new_options = copy.deepcopy(new_options)  # Deep copy new parameters
-        options = copy.deepcopy(self.options)  # Extract a deep copy of current parameters
-        
-        # Iterate over the new parameter dictionary, check and update parameters
-        for op_name, op_value in new_options.items():
+        # Check all parameter names before modifying anything
+        for op_name in new_options.keys():
             if not hasattr(self, op_name):  # Check if the parameter exists
                 raise ValueError("{} has no parameter named {}".format(self.name, op_name))
-            options[op_name] = copy.deepcopy(op_value)  # Update parameter value
 
-        # Inject the updated parameters
-        self.inject_options(options)
+        # Inject the updated parameters, values are copied by inject_options
+        self.inject_options(new_options)
         return
\ No newline at end of file
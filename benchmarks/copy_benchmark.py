@@ -0,0 +1,101 @@
+#########################################################################
+# File Name: copy_benchmark.py
+# Description: Counts the deep copies made by the routing and readout line dispatch on a grid design.
+#              Run from the repository root: python benchmarks/copy_benchmark.py [n]
+#              (n x n qubits, default 6). Not imported by the package.
+#########################################################################
+
+import contextlib
+import copy
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from addict import Dict
+
+
+@contextlib.contextmanager
+def count_deepcopies(report):
+    """
+    Count the copy.deepcopy calls made inside the block.
+
+    copy.deepcopy is replaced for the whole interpreter while the block runs, so this is only meant for
+    single-threaded benchmarks.
+
+    Input:
+        report: Dict, where the counts are stored:
+                calls: int, the number of top-level copy.deepcopy calls.
+                objects: int, the number of objects visited by the copies, nested calls included.
+                design_copies: int, the number of top-level copies of a whole design (options with
+                               qubits, gds_ops or qubits_ops).
+
+    Output:
+        None
+    """
+    deepcopy = copy.deepcopy
+    depth = [0]
+    report.calls = 0
+    report.objects = 0
+    report.design_copies = 0
+
+    def counting_deepcopy(x, memo=None, _nil=[]):
+        if depth[0] == 0:
+            report.calls += 1
+            if isinstance(x, dict) and any(key in dict.keys(x) for key in ["qubits", "gds_ops", "qubits_ops"]):
+                report.design_copies += 1
+        report.objects += 1
+        depth[0] += 1
+        try:
+            return deepcopy(x, memo, _nil)
+        finally:
+            depth[0] -= 1
+
+    copy.deepcopy = counting_deepcopy
+    try:
+        yield
+    finally:
+        copy.deepcopy = deepcopy
+
+
+def benchmark(name, function):
+    """
+    Run function and print its deep copy counts and duration.
+    """
+    report = Dict()
+    start = time.perf_counter()
+    with count_deepcopies(report):
+        result = function()
+    print("{:<24} deepcopy calls {:>6}  objects copied {:>8}  full design copies {:>3}  {:.3f} s".format(
+        name, report.calls, report.objects, report.design_copies, time.perf_counter() - start))
+    return result
+
+
+def main(n=6):
+    from api.design import Design
+    import func_modules
+    import routing
+
+    design = Design(topo_row=n, topo_col=n)
+    design.topology.generate_full_edges()
+    design.generate_qubits(topology=True, qubits_type="Transmon", dist=2000, chip_name="chip0")
+    design.generate_coupling_lines(topology=True, qubits=True, cpls_type="CouplingLineStraight")
+    design.generate_chip(qubits=True, chip_name="chip0")
+    design.generate_readout_lines(qubits=True, rdls_type="ReadoutCavity", chip_name="chip0")
+
+    gds_ops = design.gds.options
+    benchmark("routing.routing", lambda: routing.routing(gds_ops=gds_ops, method="Flipchip_routing"))
+    benchmark("Gds.routing", lambda: design.gds.routing(method="Flipchip_routing"))
+    benchmark("generate_readout_lines",
+              lambda: func_modules.rdls.generate_readout_lines(qubits_ops=design.gds.qubits.options,
+                                                               rdls_type="ReadoutCavity", chip_name="chip0"))
+    return
+
+
+if __name__ == "__main__":
+    # Files written while building the design go to a temporary directory
+    with tempfile.TemporaryDirectory() as path:
+        os.chdir(path)
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
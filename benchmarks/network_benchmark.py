@@ -0,0 +1,123 @@
+#########################################################################
+# File Name: network_benchmark.py
+# Description: Times create_network of the Flipchip_IBM routing on synthetic n x n square topologies.
+#              Run from the repository root: python benchmarks/network_benchmark.py [n ...] [--revision REV]
+#              (default sizes 32 and 64). With --revision, create_network of routing/Flipchip_IBM/control_lines.py
+#              at that git revision is timed instead, e.g. --revision cd8a241^ for the quadratic version.
+#              The disjoint path search is disabled so only the network construction is timed.
+#              Not imported by the package.
+#########################################################################
+
+import argparse
+import builtins
+import contextlib
+import copy
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silence the progress prints of the design and routing functions inside the block.
+    """
+    print_ = builtins.print
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        yield
+    finally:
+        builtins.print = print_
+
+
+def load_control_lines(revision=None):
+    """
+    Load the Flipchip_IBM control_lines module, from the working tree or from a git revision.
+
+    Input:
+        revision: str, the git revision to load the module from, the working tree if None.
+
+    Output:
+        module: the control_lines module, with the disjoint path search disabled.
+    """
+    path = "routing/Flipchip_IBM/control_lines.py"
+    if revision is None:
+        with open(os.path.join(ROOT, path)) as file:
+            source = file.read()
+    else:
+        source = subprocess.check_output(["git", "show", "{}:{}".format(revision, path)], cwd=ROOT, text=True)
+    # A separate module, so that disabling the path search does not affect the package
+    module = types.ModuleType("control_lines")
+    exec(compile(source, "{}@{}".format(path, revision or "working tree"), "exec"), module.__dict__)
+    module.find_disjoint_paths = lambda G, start_to_end, *args, **kwargs: []
+    return module
+
+
+def network_inputs(n):
+    """
+    Build the inputs of create_network for an n x n square topology, as generate_ctls does.
+
+    Input:
+        n: int, the number of qubit rows and columns.
+
+    Output:
+        inputs: tuple, (init_pos, pad_pos, control_pos, path_pos, topo_poss, pins).
+    """
+    from addict import Dict
+    from api.design import Design
+    from routing.Flipchip_IBM import control_lines, pins
+
+    with quiet():
+        design = Design(topo_row=n, topo_col=n)
+        design.topology.generate_full_edges()
+        design.generate_qubits(topology=True, qubits_type="Transmon", dist=2000, chip_name="chip0")
+        design.generate_chip(qubits=True, chip_name="chip0")
+        gds_ops = design.gds.options
+        qubits_ops = gds_ops.qubits
+        pins_ops = pins.generate_pins(qubits_ops=qubits_ops, chip_ops=gds_ops.chips["chip0"], pins_type="LaunchPad")
+
+    topo_poss = Dict()
+    for q_name, q_ops in qubits_ops.items():
+        topo_poss[q_name] = copy.deepcopy(q_ops.topo_pos)
+    qubits = control_lines.aj_control_pins(control_lines.convert_qubits_format(copy.deepcopy(qubits_ops)))
+    init_pos, pad_pos = control_lines.calculate_launch_pad_pos(pins_ops)
+    control_pos = control_lines.calculate_qubit_control_pos(topo_poss, qubits)
+    path_pos = control_lines.calculate_path_pos(topo_poss, qubits)
+    return init_pos, pad_pos, control_pos, path_pos, topo_poss, pins_ops
+
+
+def benchmark(n, module):
+    """
+    Time create_network of module on an n x n square topology and print the graph size.
+    """
+    inputs = network_inputs(n)
+    start = time.perf_counter()
+    with quiet():
+        G = module.create_network(*inputs)[0]
+    print("{:>3}x{:<3} nodes {:>7}  edges {:>7}  create_network {:.2f} s".format(
+        n, n, G.number_of_nodes(), G.number_of_edges(), time.perf_counter() - start))
+    return
+
+
+def main(sizes=(32, 64), revision=None):
+    module = load_control_lines(revision)
+    for n in sizes:
+        benchmark(n, module)
+    return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time create_network on synthetic square topologies.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[32, 64], help="numbers of qubit rows and columns")
+    parser.add_argument("--revision", default=None, help="git revision of control_lines.py to time")
+    args = parser.parse_args()
+    # Files written while building the design go to a temporary directory
+    with tempfile.TemporaryDirectory() as path:
+        os.chdir(path)
+        main(args.sizes, args.revision)
@@ -1,4 +1,4 @@
-from base.cmpnts_base import CmpntsBase
+from base.cmpnts_base import CmpntsBase, draw_cmpnts
 from addict import Dict
 import gdspy
 import toolbox
@@ -41,12 +41,27 @@ class Chips(CmpntsBase):
         self.inject_options(options)  # Inject parameters
         return
     
-    def draw_gds(self):
+    @staticmethod
+    def get_chip_name(cmpnt):
+        """
+        Returns the name of the chip cell a chip is drawn in, which is the chip itself.
+
+        Input:
+            cmpnt: LibraryBase, the chip.
+
+        Output:
+            chip_name: str, the name of the chip.
+        """
+        return cmpnt.name
+
+    def draw_gds(self, instancing: bool = False, flatten: bool = True, workers: int = 1):
         """
         Draw GDS layout for multiple chip components.
 
         Input:
-            None
+            instancing: bool, accepted for compatibility with CmpntsBase.draw_gds; chips are never instanced.
+            flatten: bool, accepted for compatibility with CmpntsBase.draw_gds; chip cells contain no references.
+            workers: int or None, the number of processes drawing the chips, see draw_cmpnts.
 
         Output:
             None
@@ -55,15 +70,13 @@ class Chips(CmpntsBase):
         self.lib = gdspy.GdsLibrary()  # Create a new GDS library
         self.cell_Dict = Dict()
 
-        # Generate lib for each component
-        for cmpnt_name in self.cmpnt_name_list:
-            cmpnt = getattr(self, cmpnt_name)
-            cmpnt.draw_gds()
+        # Generate lib for each component, unchanged components keep their cached cells
+        draw_cmpnts(self.get_drawn_cmpnts(), workers)
 
         # Traverse components, add each component to the corresponding chip cell center
         for cmpnt_name in self.cmpnt_name_list:
             cmpnt = getattr(self, cmpnt_name)
-            chip_name = cmpnt.name
+            chip_name = self.get_chip_name(cmpnt)
             if chip_name not in self.cell_Dict.keys():
                 self.cell_Dict[chip_name] = self.lib.new_cell(chip_name)
             self.cell_Dict[chip_name].add(cmpnt.cell)
@@ -71,7 +84,7 @@ class Chips(CmpntsBase):
         # Layer by chip name (set layer number)
         for chip_name, cell in self.cell_Dict.items():
             layer_num = toolbox.custom_hash(chip_name)
-            self.cell_Dict[chip_name].flatten(single_layer=layer_num, single_datatype=0)
+            toolbox.flatten_to_layer(self.cell_Dict[chip_name], layer_num, 0)
 
         # Create an overall cell, and integrate all chip cells into the total cell center
         module_name = toolbox.convert_to_snake_case(self.__class__.__name__)
@@ -128,10 +141,7 @@ class Chips(CmpntsBase):
             None
         """
         chip_ops = func_modules.chips.generate_chip(**gene_ops)  # Call the function module to generate chip options
-        chip_name = chip_ops.name  # Get chip name
-        chips_ops = copy.deepcopy(self.options)  # Get options for the current chip set
-        chips_ops[chip_name] = copy.deepcopy(chip_ops)  # Add the new chip to the option dictionary
-        self.inject_options(chips_ops)  # Inject updated options
+        self.add(chip_ops)  # Add the new chip without re-creating the others
         return
     
     def copy_chip(self, old_chip_name, new_chip_name):
@@ -145,8 +155,7 @@ class Chips(CmpntsBase):
         Output:
             None
         """
-        chips_ops = self.extract_options()  # Extract parameters of the current chip set
-        chips_ops[new_chip_name] = copy.deepcopy(chips_ops[old_chip_name])  # Copy the original chip parameters
-        chips_ops[new_chip_name].name = new_chip_name  # Update the name of the new chip
-        self.inject_options(chips_ops)  # Inject updated parameters
+        chip_ops = getattr(self, old_chip_name).options  # Copy the original chip parameters
+        chip_ops.name = new_chip_name  # Update the name of the new chip
+        self.add(chip_ops)  # Add the new chip without re-creating the others
         return
@@ -5,6 +5,7 @@
 ############################################################################################
 
 from equ_circ import primitives
+from equ_circ import netlist
 from equ_circ import equ_circ_old
 from addict import Dict
 import copy
@@ -27,6 +28,34 @@ def generate_equ_circ(topo_ops, txt_path, qcsv_path, rcsv_path):
     return
 
 
+def generate_equ_circ_netlist(topo_ops):
+    """
+    Generate the plasma circuit in memory.
+
+    Input:
+        topo_ops: Topology operation parameters.
+
+    Output:
+        EquivalentCircuitNetlist object, written to files by its save method.
+    """
+    return primitives.generate_equ_circ_netlist(topo_ops)
+
+
+def load_equ_circ(txt_path=None, qcsv_path=None, rcsv_path=None):
+    """
+    Load plasma circuit files into memory.
+
+    Input:
+        txt_path: Text file path.
+        qcsv_path: Quantum bit parameter CSV file path.
+        rcsv_path: Coupling parameter CSV file path.
+
+    Output:
+        EquivalentCircuitNetlist object.
+    """
+    return netlist.EquivalentCircuitNetlist.load(txt_path=txt_path, qcsv_path=qcsv_path, rcsv_path=rcsv_path)
+
+
 def display_equ_circ(txt_path):
     """
     Display plasma circuit text information.
@@ -0,0 +1,285 @@
+#########################################################################
+# File Name: netlist.py
+# Description: In-memory equivalent circuit.
+#              Holds the elements of the equivalent circuit txt file together with the qubit and coupler tables
+#              (qubit.csv and readout.csv), indexed by label and name. Files are only written by save().
+#########################################################################
+
+import csv
+import numpy as np
+import toolbox
+from equ_circ.qucat import Network, string_to_component
+
+e = 1.60217657e-19  # Elementary charge
+hbar = 1.0545718E-34  # Reduced Planck's constant
+
+
+def node(x, y):
+    """
+    Node name of the point (x, y), as written in the equivalent circuit txt file.
+    """
+    return str(x) + "," + str(y)
+
+
+def charging_energy(Cq):
+    """
+    Charging energy in MHz of a qubit with the capacitance Cq in fF.
+    """
+    Ec = e ** 2 / 2 / float(Cq) / 10 ** -15 / hbar
+    return round(Ec / 2 / np.pi / 1e6, 2)
+
+
+class EquivalentCircuitNetlist:
+    """
+    Equivalent circuit kept in memory.
+
+    Elements are [type, node_minus, node_plus, value, label] lists in the order of the txt file, with value and
+    label None when empty. Qubit and coupler rows keep the columns of qubit.csv (name, pos, C in fF, L in nH, Ec in
+    MHz) and readout.csv (name, pos, C in fF, L in nH). Components, qubits and couplers are found through dictionary
+    indices, so editing a value costs O(1) and nothing is written until save().
+    """
+
+    qubit_columns = ['name', 'pos', 'C', 'L', 'Ec']
+    coupler_columns = ['name', 'pos', 'C', 'L']
+
+    def __init__(self):
+        self.elements = []
+        self.qubits = {}  # name -> row of qubit.csv, as a dict of qubit_columns
+        self.couplers = {}  # name -> row of readout.csv, as a dict of coupler_columns
+        self._element_index = {}  # (type, label) -> index of the first element with this type and label
+        self.version = 0  # Incremented at each change
+
+    def add_element(self, element_type, node_minus, node_plus, value=None, label=None):
+        """
+        Add an element.
+
+        Input:
+            element_type: String, one of 'C', 'L', 'J', 'R', 'W', 'G'.
+            node_minus: String, first node (see node()).
+            node_plus: String, second node.
+            value: Float, value of the element in SI units, or None.
+            label: String, label of the element, or None.
+
+        Output:
+            index: Integer, index of the element.
+        """
+        self.elements.append([element_type, node_minus, node_plus, value, label])
+        index = len(self.elements) - 1
+        if label is not None:
+            self._element_index.setdefault((element_type, label), index)
+        self.version += 1
+        return index
+
+    def add_qubit(self, name, pos, Cq, Lj):
+        """
+        Add a row to the qubit table.
+
+        Input:
+            name: String, qubit name.
+            pos: Tuple, position of the qubit circuit.
+            Cq: Float, capacitance in fF.
+            Lj: Float, junction inductance in nH.
+
+        Output:
+            None
+        """
+        self.qubits[name] = dict(name=name, pos=pos, C=Cq, L=Lj, Ec=charging_energy(Cq))
+        self.version += 1
+        return
+
+    def add_coupler(self, name, pos, Cr, Lr):
+        """
+        Add a row to the coupler table.
+
+        Input:
+            name: String, coupler name.
+            pos: Tuple, position of the coupler circuit.
+            Cr: Float, capacitance in fF.
+            Lr: Float, inductance in nH.
+
+        Output:
+            None
+        """
+        self.couplers[name] = dict(name=name, pos=pos, C=Cr, L=Lr)
+        self.version += 1
+        return
+
+    def find_element(self, element_type, label):
+        """
+        Index of the first element with the type and label, None if there is none.
+        """
+        return self._element_index.get((element_type, label))
+
+    def set_element_value(self, index, value):
+        """
+        Set the value (SI units) of the element at index.
+        """
+        self.elements[index][3] = value
+        self.version += 1
+        return
+
+    def find_qubit(self, qubit_name):
+        """
+        Row of the qubit table, looked up by name and lower-case name, None if there is none.
+        """
+        for name in [qubit_name, qubit_name.lower()]:
+            if name in self.qubits:
+                return self.qubits[name]
+        return None
+
+    def find_coupler(self, coupling_line_name):
+        """
+        Row of the coupler table, None if there is none.
+        """
+        if coupling_line_name in self.couplers:
+            return self.couplers[coupling_line_name]
+        return None
+
+    def change_qubit_options(self, qubit_name, value):
+        """
+        Modify the capacitance of a qubit.
+
+        Input:
+            qubit_name: String, name of the qubit.
+            value: Float, new capacitance in fF.
+
+        Output:
+            None
+        """
+        index = self.find_element('C', f'C{qubit_name.lower()}')
+        if index is None:
+            print(f"No corresponding row for {qubit_name.lower()} was found.")
+            return
+        self.set_element_value(index, round(float(value) * 10 ** -15, 17))
+        row = self.find_qubit(qubit_name)
+        if row is not None:
+            row['C'] = value
+            row['Ec'] = charging_energy(value)
+        print(f"The capacitance value of {qubit_name.lower()} has been successfully updated.")
+        return
+
+    def change_coupling_options(self, coupling_line_name, op_name, op_value):
+        """
+        Modify the capacitance ('c') or the inductance ('l') of a coupler.
+
+        Input:
+            coupling_line_name: String, name of the coupler.
+            op_name: String, name of the parameter to modify.
+            op_value: Float, new value in fF or nH.
+
+        Output:
+            None
+        """
+        if op_name.lower() == 'c':
+            element_type, value, column, quantity = 'C', round(float(op_value) * 10 ** -15, 17), 'C', 'capacitance'
+        elif op_name.lower() == 'l':
+            element_type, value, column, quantity = 'L', round(float(op_value) * 10 ** -9, 11), 'L', 'inductance'
+        else:
+            return
+        index = self.find_element(element_type, f'{element_type}{coupling_line_name}')
+        if index is None:
+            print(f"No corresponding row for {coupling_line_name} was found.")
+            return
+        self.set_element_value(index, value)
+        row = self.find_coupler(coupling_line_name)
+        if row is not None:
+            row[column] = op_value
+        print(f"The {quantity} value of {coupling_line_name} has been successfully updated.")
+        return
+
+    def find_qubit_options(self, qubit_name):
+        """
+        Capacitance of a qubit in fF, None if not found.
+        """
+        row = self.find_qubit(qubit_name)
+        return None if row is None else float(row['C'])
+
+    def find_coupling_options(self, coupling_line_name, op_name):
+        """
+        Capacitance ('c', fF) or inductance ('l', nH) of a coupler, None if not found.
+        """
+        row = self.find_coupler(coupling_line_name)
+        if row is not None and op_name in ['c', 'l']:
+            return float(row[op_name.upper()])
+        print("No coupling component named \"{}\" was found. The list of coupling components is:".format(coupling_line_name))
+        for name in self.couplers:
+            print(name)
+        return None
+
+    def network(self, backend='symbolic'):
+        """
+        Build the qucat Network of the equivalent circuit, without going through a file.
+
+        Input:
+            backend: String, 'symbolic' or 'numeric', see qucat.Qcircuit.
+
+        Output:
+            Network object.
+        """
+        netlist = [string_to_component(element_type, node_minus, node_plus, value, label)
+                   for element_type, node_minus, node_plus, value, label in self.elements]
+        return Network(netlist, backend=backend)
+
+    def to_txt(self):
+        """
+        Lines of the equivalent circuit txt file (the qucat GUI format).
+        """
+        return [f"{element_type};{node_minus};{node_plus};{'' if value is None else value};{'' if label is None else label}\n"
+                for element_type, node_minus, node_plus, value, label in self.elements]
+
+    def save(self, txt_path=None, qcsv_path=None, rcsv_path=None):
+        """
+        Write the txt file and the csv files, each one is skipped if its path is None.
+
+        Input:
+            txt_path: String, path to the txt file.
+            qcsv_path: String, path to the qubit csv file.
+            rcsv_path: String, path to the coupler csv file.
+
+        Output:
+            None
+        """
+        if txt_path is not None:
+            toolbox.jg_and_create_path(txt_path)
+            with open(txt_path, 'w') as file:
+                file.writelines(self.to_txt())
+        for path, table, columns in [(qcsv_path, self.qubits, self.qubit_columns),
+                                     (rcsv_path, self.couplers, self.coupler_columns)]:
+            if path is None:
+                continue
+            toolbox.jg_and_create_path(path)
+            with open(path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerows([row[column] for column in columns] for row in table.values())
+        return
+
+    @classmethod
+    def load(cls, txt_path=None, qcsv_path=None, rcsv_path=None):
+        """
+        Read an equivalent circuit from its txt file and csv files, each one is skipped if its path is None.
+
+        Output:
+            EquivalentCircuitNetlist object.
+        """
+        netlist = cls()
+        if txt_path is not None:
+            with open(txt_path, 'r') as file:
+                lines = file.read().splitlines()
+            elements = netlist.elements
+            for line in lines:
+                fields = line.strip().split(';')
+                if len(fields) < 5:
+                    continue
+                element_type, node_minus, node_plus, value, label = fields[:5]
+                elements.append([element_type, node_minus, node_plus, float(value) if value else None, label or None])
+                if label:
+                    netlist._element_index.setdefault((element_type, label), len(elements) - 1)
+        for path, table, columns in [(qcsv_path, netlist.qubits, cls.qubit_columns),
+                                     (rcsv_path, netlist.couplers, cls.coupler_columns)]:
+            if path is None:
+                continue
+            with open(path, newline='') as file:
+                for row in csv.reader(file):
+                    if len(row) > 0:
+                        table[row[0]] = dict(zip(columns, row))
+        return netlist
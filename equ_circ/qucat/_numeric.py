@@ -0,0 +1,157 @@
+#########################################################################
+# File Name: _numeric.py
+# Description: Numeric backend of Qcircuit.
+#              Assembles the R, L and C matrices of the network with component values and solves the
+#              (quadratic) generalized eigenvalue problem det(L + i w R - w^2 C) = 0 directly, instead of
+#              expanding the characteristic polynomial symbolically.
+#########################################################################
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+
+
+def rlc_matrices(elements, nodes):
+    """
+    Assembles the R, L and C matrices of the network, grounded at the node with the most coefficients
+    (the node _Network.compute_RLC_matrices removes).
+
+    Input:
+        elements: List of (matrix, node_minus, node_plus, coefficient) tuples, matrix being 'R', 'L' or 'C'
+                  and coefficient the numeric value 1/R, 1/L or C of a component.
+        nodes: List of the node indices of the network.
+
+    Output:
+        matrices: Dict with the grounded 'R', 'L' and 'C' arrays, and 'index', the row of each node
+                  (None for the ground node).
+    """
+    nodes = sorted(nodes)
+    position = {node: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+    stamps = {k: ([], [], []) for k in ['R', 'L', 'C']}
+    for kind, node_minus, node_plus, value in elements:
+        i, j = position[node_minus], position[node_plus]
+        rows, cols, data = stamps[kind]
+        rows += [i, j, i, j]
+        cols += [i, j, j, i]
+        data += [value, value, -value, -value]
+
+    full = {k: scipy.sparse.coo_matrix((data, (rows, cols)), shape=(n, n)).toarray()
+            for k, (rows, cols, data) in stamps.items()}
+
+    # Ground the node with the most non-zero coefficients, as the symbolic backend does
+    number_coefficients = sum(np.count_nonzero(full[k], axis=1) for k in full)
+    ground = int(np.argmax(number_coefficients))
+    keep = [i for i in range(n) if i != ground]
+    matrices = {k: full[k][np.ix_(keep, keep)] for k in full}
+    matrices['index'] = {node: (None if position[node] == ground else keep.index(position[node])) for node in nodes}
+    return matrices
+
+
+def normal_modes(matrices, is_lossy):
+    """
+    Solves det(L + i w R - w^2 C) = 0.
+
+    Input:
+        matrices: Dict returned by rlc_matrices.
+        is_lossy: Boolean, True if the circuit has resistors.
+
+    Output:
+        solutions: Array of the solutions (w^2 if not is_lossy, the complex angular frequencies w otherwise).
+        vectors: Array whose columns are the node flux vectors of each solution.
+    """
+    R, L, C = matrices['R'], matrices['L'], matrices['C']
+    n = L.shape[0]
+
+    # Scale the angular frequency by w0 so that L and w0^2 C have the same magnitude
+    w0 = np.sqrt(np.max(np.abs(L))/np.max(np.abs(C)))
+    Cs = C*w0**2
+
+    if not is_lossy:
+        try:
+            # Symmetric-definite problem, real eigenvectors
+            s2, vectors = scipy.linalg.eigh(L, Cs)
+        except np.linalg.LinAlgError:
+            s2, vectors = scipy.linalg.eig(L, Cs)
+        finite = np.isfinite(s2)
+        return np.real(s2[finite])*w0**2, vectors[:, finite]
+
+    # Linearization of the quadratic problem with x = [v, s v], balanced with K = |L| I:
+    # [[0, K], [L, i Rs]] x = s [[K, 0], [0, Cs]] x
+    Rs = R*w0
+    K = np.eye(n)*np.max(np.abs(L))
+    zeros = np.zeros((n, n))
+    A = np.block([[zeros, K], [L, 1j*Rs]])
+    B = np.block([[K, zeros], [zeros, Cs]])
+    s, vectors = scipy.linalg.eig(A, B)
+    finite = np.isfinite(s)
+    s, vectors = s[finite], vectors[:n, finite]
+
+    # Refine the physical solutions (positive frequency and dissipation) by
+    # nonlinear inverse iteration on T(s) = L + i s Rs - s^2 Cs
+    for k in np.flatnonzero(np.logical_and(np.real(s) > 0, np.imag(s) > -1e-6*np.abs(s))):
+        s[k], vectors[:, k] = refine_mode(L, Rs, Cs, s[k], vectors[:, k])
+    return s*w0, vectors
+
+
+def refine_mode(L, R, C, s, v, maxiter=5, rtol=1e-15):
+    """
+    Newton iterations on the solution s of det(L + i s R - s^2 C) = 0, with eigenvector v.
+    """
+    c = np.conj(v)
+    for _ in range(maxiter):
+        if s == 0:
+            break
+        T = L + 1j*s*R - s**2*C
+        dT = 1j*R - 2*s*C
+        try:
+            u = np.linalg.solve(T, dT @ v)
+        except (np.linalg.LinAlgError, ValueError):
+            break
+        if not np.all(np.isfinite(u)) or c @ u == 0:
+            break
+        step = (c @ v)/(c @ u)
+        s, v = s - step, u/(c @ u)
+        if np.abs(step) < rtol*np.abs(s):
+            break
+    return s, v
+
+
+def port_vector(matrices, node_minus, node_plus):
+    """
+    Returns the vector e such that e.v is the flux across (node_minus, node_plus), e.v = v_plus - v_minus.
+    """
+    e = np.zeros(matrices['L'].shape[0])
+    if matrices['index'][node_plus] is not None:
+        e[matrices['index'][node_plus]] += 1.
+    if matrices['index'][node_minus] is not None:
+        e[matrices['index'][node_minus]] -= 1.
+    return e
+
+
+def admittance_derivative_numerator(matrices, vector, w):
+    """
+    Numerator v.Y'(w).v of admittance_derivative, common to all the ports of a normal mode.
+    """
+    dY_matrix = 1j*matrices['C'] + 1j*matrices['L']/w**2
+    return vector @ dY_matrix @ vector
+
+
+def admittance_derivative(numerator, vector, e):
+    """
+    Derivative dY/dw, at a normal mode w, of the admittance of the network seen from the port e.
+
+    At a normal mode the admittance matrix Y(w) = i w C + R + L/(i w) is singular with null vector v,
+    and the port admittance Y = 1/(e.Y^-1.e) has the derivative v.Y'(w).v/(e.v)^2.
+    """
+    projection = e @ vector
+    if projection == 0:
+        return complex(np.inf, np.inf)  # The element does not take part in the mode
+    return numerator/projection**2
+
+
+def transfer(matrices, vector, e_left, e_right):
+    """
+    Voltage transfer function V_right/V_left at a normal mode, the ratio of the mode fluxes across both ports.
+    """
+    return (e_right @ vector)/(e_left @ vector)
@@ -7,6 +7,7 @@
 from math import floor
 import numpy as np
 import functools
+from collections import OrderedDict
 from warnings import warn
 import sys
 from scipy.optimize import root_scalar
@@ -225,6 +226,31 @@ def vectorize_kwargs(func_to_evaluate=None, *, exclude=[]):
     return _decorate
 
 
+class LRUCache(OrderedDict):
+    """
+    Dictionary keeping its most recently used entries.
+
+    Input:
+        maxsize: Maximum number of entries.
+    """
+
+    def __init__(self, maxsize=128):
+        super(LRUCache, self).__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
 def get_exponent_3(value):
     """
     Computes the exponent part of a value, making it a multiple of 3.
@@ -17,15 +17,20 @@ from subprocess import run
 import inspect
 import matplotlib.pyplot as plt
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from scipy.optimize import linear_sum_assignment
 from warnings import warn
 try:
     from equ_circ.qucat._constants import *
     from equ_circ.qucat._utility import *
+    from equ_circ.qucat import _numeric
     from equ_circ.qucat.plotting_settings import plotting_parameters_show,plotting_parameters_normal_modes
 except ImportError:
     # When running from source without pip installation
     from _constants import *
     from _utility import *
+    import _numeric
     from plotting_settings import plotting_parameters_show,plotting_parameters_normal_modes
 
 PROFILING = False
@@ -75,6 +80,38 @@ def string_to_component(s, *arg, **kwarg):
     elif s == 'G':
         return G(*arg, **kwarg)
 
+_sweep_circuit = None  # Qcircuit swept by the worker processes of Qcircuit.sweep
+
+
+def _sweep_axis(index):
+    '''
+    Axis along which a point of a sweep is reached: the last axis with a non-zero index.
+    '''
+    for axis in range(len(index)-1, -1, -1):
+        if index[axis] > 0:
+            return axis
+    return None
+
+
+def _previous_sweep_point(index, shape, axis=None):
+    '''
+    Flat index of the point preceding ``index`` along ``axis`` (by default the axis of _sweep_axis), 
+    None for the first point of the sweep.
+    '''
+    if axis is None:
+        axis = _sweep_axis(index)
+    if axis is None or index[axis] == 0:
+        return None
+    previous = list(index)
+    previous[axis] -= 1
+    return int(np.ravel_multi_index(previous, shape))
+
+
+def _sweep_chunk(arguments):
+    quantities, chunk = arguments
+    return [_sweep_circuit._sweep_point(point, char_poly_values, quantities) for point, char_poly_values in chunk]
+
+
 class Qcircuit(object):
     """A class representing a quantum circuit.
 
@@ -89,9 +126,16 @@ class Qcircuit(object):
         netlist (list): List of all components present in the circuit
         ref_elt (J or L): list of junction or inductor component used as a reference for the calculation 
                         of zero-point fluctations, each index of the list corresponds to a different mode
+        backend (str): 'symbolic' to compute the eigenfrequencies from the symbolic characteristic polynomial,
+                        'numeric' to solve the generalized eigenvalue problem of the R, L and C matrices
+                        with the component values of each call
     """
 
-    def __init__(self, netlist):
+    def __init__(self, netlist, backend='symbolic'):
+        if backend not in ['symbolic', 'numeric']:
+            raise ValueError("backend should be 'symbolic' or 'numeric', not %s" % backend)
+        self.backend = backend
+
         self.Q_min = 1 # Modes with have a quality factor below Q_min will not ignored
 
         self.warn_discarded_mode = True # If this is set to True, the user will be notified when a mode is discarded.
@@ -102,6 +146,11 @@ class Qcircuit(object):
         self.root_max_iterations = 1e4 
         self.root_relative_tolerance = 1e-12
 
+        # Normal modes of the most recently used component values,
+        # and the parameters of the most recently swept points
+        self._zeta_cache = LRUCache(maxsize=128)
+        self._sweep_cache = LRUCache(maxsize=10000)
+
         self._plotting_normal_mode = False # Used to keep track of which imported plotting_settings to use 
                                             # only set to true when show_normal_mode is called
         self.plotting_parameters_normal_modes = plotting_parameters_normal_modes
@@ -152,7 +201,10 @@ class Qcircuit(object):
         # define the function which returns the inverse of dY
         # where Y is the admittance at the nodes of an inductive element
         for inductive_element in self.inductors+self.junctions:
-            inductive_element._compute_flux_zpf_r()
+            if self.backend == 'numeric':
+                inductive_element._compute_numeric_flux_zpf_r()
+            else:
+                inductive_element._compute_flux_zpf_r()
 
         # Initialize the flux transformation dictionary,
         # where _flux_transformation_dict[ref_node_minus,ref_node_plus,node_minus,node_plus] 
@@ -165,8 +217,10 @@ class Qcircuit(object):
 
         # define the functions which returns the components of the characteristic polynomial
         # (the roots of which are the eigen-frequencies)
-        self._char_poly_coeffs = [lambdify(self._no_value_components, c, 'numpy') 
-            for c in self._network.compute_char_poly_coeffs(is_lossy = (len(self.resistors)>0))]
+        # The numeric backend skips this symbolic step, which scales badly with the number of nodes
+        if self.backend == 'symbolic':
+            self._char_poly_coeffs = [lambdify(self._no_value_components, c, 'numpy') 
+                for c in self._network.compute_char_poly_coeffs(is_lossy = (len(self.resistors)>0))]
 
     @property
     def _pp(self):
@@ -215,14 +269,20 @@ class Qcircuit(object):
                 raise ValueError(
                     'The value of %s should be specified with the keyword argument %s=... ' % (label, label))
 
+    # Attributes set by _set_zeta for given component values
+    _zeta_state = ['zeta', 'ref_elt', '_RLC_values', '_mode_vectors', '_mode_dY_numerators']
+
     @timeit
-    def _set_zeta(self, **kwargs):
+    def _set_zeta(self, _char_poly_values=None, **kwargs):
         '''
         Sets the Qcircuit.zeta to the circuit eigenfrequencies
         (including the imaginary part due to losses).
 
         Parameters
         ----------
+        _char_poly_values:
+                    Values of the characteristic polynomial coefficients for the kwargs,
+                    if already evaluated (see Qcircuit.sweep).
         kwargs:     
                     Values for un-specified circuit components, 
                     ex: ``L=1e-9``.
@@ -238,13 +298,28 @@ class Qcircuit(object):
                 return
         except AttributeError:
             pass
+
+        # Restore the normal modes of recently used component values
+        cache_key = (self.Q_min, tuple(sorted(kwargs.items())))
+        state = self._zeta_cache.get(cache_key)
+        if state is not None:
+            for attribute, value in state.items():
+                setattr(self, attribute, value)
+            self._kwargs_previous = kwargs
+            return
         self._kwargs_previous = kwargs
 
-        if len(self.resistors) == 0:
+        if _char_poly_values is None and self.backend == 'symbolic':
+            _char_poly_values = [coeff(**kwargs) for coeff in self._char_poly_coeffs]
+
+        if self.backend == 'numeric':
+            zeta = self._numeric_zeta(**kwargs)
+
+        elif len(self.resistors) == 0:
 
             # Compute the coefficients of the characteristic polynomial.
             # The roots of this polynomial will provide the complex eigenfrequencies
-            char_poly = npPoly([np.real(coeff(**kwargs)) for coeff in self._char_poly_coeffs])
+            char_poly = npPoly([np.real(coeff) for coeff in _char_poly_values])
             
             # char_poly = remove_multiplicity(char_poly)
         
@@ -277,7 +352,7 @@ class Qcircuit(object):
 
             # Compute the coefficients of the characteristic polynomial.
             # The roots of this polynomial will provide the complex eigenfrequencies
-            char_poly = npPoly([complex(coeff(**kwargs)) for coeff in self._char_poly_coeffs])
+            char_poly = npPoly([complex(coeff) for coeff in _char_poly_values])
             # char_poly = remove_multiplicity(char_poly)
 
             zeta = char_poly.roots()
@@ -353,6 +428,68 @@ class Qcircuit(object):
 
         self.zeta = zeta
         self.ref_elt = ref_elt
+        self._zeta_cache.put(cache_key, {attribute: getattr(self, attribute)
+                                         for attribute in self._zeta_state if hasattr(self, attribute)})
+
+    def _numeric_zeta(self, **kwargs):
+        '''
+        Computes the eigenfrequencies with the numeric backend,
+        from the generalized eigenvalue problem of the R, L and C matrices.
+        The eigenvectors are stored in Qcircuit._mode_vectors, indexed by eigenfrequency,
+        and the numerators of the admittance derivatives in Qcircuit._mode_dY_numerators.
+
+        Parameters
+        ----------
+        kwargs:     
+                    Values for un-specified circuit components, 
+                    ex: ``L=1e-9``.
+        '''
+        self._RLC_values = self._network.compute_numeric_RLC_matrices(**kwargs)
+        is_lossy = len(self.resistors) > 0
+        solutions, vectors = _numeric.normal_modes(self._RLC_values, is_lossy)
+
+        # Solutions at zero frequency (nodes without inductive path to ground) 
+        # only differ from 0 by the numerical precision of the largest solution
+        scale = np.max(np.abs(solutions)) if len(solutions) > 0 else 0
+        relevant = np.abs(solutions) > 1e3*np.finfo(float).eps*scale
+        solutions, vectors = solutions[relevant], vectors[:, relevant]
+
+        if not is_lossy:
+            # The variable of the eigenvalue problem is \omega^2
+            w2 = np.real(solutions)
+            for w2_single in w2:
+                if w2_single < 0 and self.warn_discarded_mode:
+                    error_message = "Imaginary frequency mode f = 1j %f Hz mode found (and discarded).\n"%(np.sqrt(-w2_single)/2/np.pi)
+                    warn(error_message)
+            positive = w2 >= 0.
+            zeta, vectors = np.sqrt(w2[positive]), vectors[:, positive]
+            rtol = np.sqrt(self.root_relative_tolerance)
+            tolerance_variable = zeta**2
+        else:
+            # Solutions with a negligible imaginary part are made real, as polish_roots does
+            solutions = np.where(np.absolute(np.imag(solutions)) < np.absolute(self.root_relative_tolerance*np.real(solutions)),
+                                 np.real(solutions), solutions)
+            # Negative modes and their unphysical complex conjugates are discarded
+            physical = np.logical_and(np.real(solutions) >= 0., np.imag(solutions) >= 0.)
+            zeta, vectors = solutions[physical], vectors[:, physical]
+            rtol = self.root_relative_tolerance
+            tolerance_variable = zeta
+
+        # Sort solutions with increasing frequency
+        order = np.argsort(np.real(zeta))
+        zeta, vectors, tolerance_variable = zeta[order], vectors[:, order], tolerance_variable[order]
+
+        # Degenerate solutions are kept once, as the polynomial root finder of the symbolic backend does
+        kept = []
+        for i, r in enumerate(tolerance_variable):
+            if not True in np.isclose(r, tolerance_variable[kept], rtol=rtol):
+                kept.append(i)
+        zeta, vectors = zeta[kept], vectors[:, kept]
+
+        self._mode_vectors = {w: vectors[:, i] for i, w in enumerate(zeta)}
+        self._mode_dY_numerators = {w: _numeric.admittance_derivative_numerator(self._RLC_values, vectors[:, i], w)
+                                    for i, w in enumerate(zeta)}
+        return zeta
 
     def _anharmonicities_per_junction(self, **kwargs):
         '''
@@ -685,6 +822,151 @@ class Qcircuit(object):
 
         return to_return
 
+    def sweep(self, quantities=('f', 'k', 'A', 'chi'), processes=1, track_modes=True, **kwargs):
+        r'''Returns the eigenfrequencies, loss-rates, anharmonicities and Kerr parameters
+        over arrays of component values.
+
+        Compared to passing arrays to :meth:`qucat.Qcircuit.f_k_A_chi`,
+        the coefficients of the characteristic polynomial are evaluated for all points at once,
+        the points can be distributed over processes, repeated points are cached and the 
+        modes are tracked from one point to the next.
+
+        Parameters
+        ----------
+        quantities: tuple of str, optional
+                    Quantities to compute among 'f' (eigenfrequencies), 'k' (loss-rates),
+                    'A' (anharmonicities) and 'chi' (Kerr parameters).
+        processes:  int, optional
+                    Number of worker processes, 1 (default) to evaluate the points in this process.
+                    Worker processes require the 'fork' start method (not available on Windows), 
+                    otherwise the points are evaluated in this process.
+        track_modes: Boolean, optional
+                    If True (default), the mode ``m`` of every point is the mode whose frequency 
+                    continues the frequency of mode ``m`` at the previous point of the sweep 
+                    (along the last varying axis), such that crossing modes keep their index.
+                    If False, the modes are ordered with increasing frequency at every point.
+        kwargs:     
+                    Values for un-specified circuit components, 
+                    arrays (broadcast together) or single values, ex: ``L_J=np.linspace(8e-9,12e-9,101)``.
+
+        Returns
+        -------
+        numpy structured array
+            Array with the broadcast shape of the kwargs, with a field for each component of the kwargs 
+            and for each quantity: 'f', 'k' and 'A' of shape ``(N_modes,)`` and 'chi' of shape ``(N_modes,N_modes)``,
+            in Hertz. Modes which are missing at a point (discarded or tracked to another index) are NaN.
+
+        Examples
+        --------
+        >>> sweep = circuit.sweep(L_J=np.linspace(8e-9,12e-9,101))
+        >>> sweep['f'][:,0] # Frequency of the first mode as a function of L_J
+        '''
+        for quantity in quantities:
+            if quantity not in ['f', 'k', 'A', 'chi']:
+                raise ValueError("Unknown quantity %s, choose among 'f', 'k', 'A' and 'chi'" % quantity)
+        quantities = tuple(quantities)
+
+        labels = list(kwargs)
+        values = np.broadcast_arrays(*[np.asarray(kwargs[label], dtype=float) for label in labels])
+        for label, value in zip(labels, values):
+            if np.any(value == 0):
+                raise ValueError("Cannot set value of element %s to zero" % label)
+        shape = values[0].shape if len(labels) > 0 else ()
+        points = [{label: float(value[index]) for label, value in zip(labels, values)} for index in np.ndindex(shape)]
+        if len(points) > 0:
+            self._parse_kwargs(**points[0])
+
+        # Evaluate the coefficients of the characteristic polynomial over all points at once
+        if self.backend == 'symbolic':
+            flat_values = {label: value.ravel() for label, value in zip(labels, values)}
+            char_poly_values = np.array([np.broadcast_to(coeff(**flat_values), (len(points),)) 
+                                         for coeff in self._char_poly_coeffs]).T
+        else:
+            char_poly_values = [None]*len(points)
+
+        # Evaluate the points absent from the cache
+        keys = [(quantities, self.Q_min, tuple(sorted(point.items()))) for point in points]
+        to_evaluate = {}
+        for i, key in enumerate(keys):
+            if self._sweep_cache.get(key) is None and key not in to_evaluate:
+                to_evaluate[key] = i
+        tasks = [(points[i], char_poly_values[i]) for i in to_evaluate.values()]
+        if processes > 1 and len(tasks) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            global _sweep_circuit
+            _sweep_circuit = self
+            chunk_size = -(-len(tasks) // processes)
+            chunks = [(quantities, tasks[i:i+chunk_size]) for i in range(0, len(tasks), chunk_size)]
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('fork')) as pool:
+                results = [result for chunk_results in pool.map(_sweep_chunk, chunks) for result in chunk_results]
+            _sweep_circuit = None
+        else:
+            if processes > 1 and len(tasks) > 1:
+                warn("Worker processes require the 'fork' start method, the sweep runs in this process.")
+            results = [self._sweep_point(point, values_single, quantities) for point, values_single in tasks]
+        for key, result in zip(to_evaluate, results):
+            self._sweep_cache.put(key, result)
+        results = [self._sweep_cache.get(key) for key in keys]
+
+        # Assign the modes of each point to the output indices
+        N_modes = max([len(result['f']) for result in results]+[0])
+        frequencies = np.full((len(points), N_modes), np.nan)
+        slots = []
+        for i, index in enumerate(np.ndindex(shape)):
+            f = results[i]['f']
+            previous = _previous_sweep_point(index, shape)
+            if not track_modes or previous is None:
+                slot = np.arange(len(f))
+            else:
+                predicted = frequencies[previous]
+                before_previous = _previous_sweep_point(np.unravel_index(previous, shape), shape, axis=_sweep_axis(index))
+                if before_previous is not None:
+                    # Linear extrapolation from the two previous points
+                    extrapolated = 2*predicted - frequencies[before_previous]
+                    predicted = np.where(np.isnan(extrapolated), predicted, extrapolated)
+                cost = np.abs(predicted[:, None]-f[None, :])
+                cost[np.isnan(cost)] = 10*np.nanmax(np.append(cost, 1.))
+                slot = np.zeros(len(f), dtype=int)
+                rows, columns = linear_sum_assignment(cost)
+                slot[columns] = rows
+            frequencies[i, slot] = f
+            slots.append(slot)
+
+        # Structured array of the results
+        dtype = [(label, float) for label in labels]
+        dtype += [(quantity, float, (N_modes,)) for quantity in ['f', 'k', 'A'] if quantity in quantities]
+        if 'chi' in quantities:
+            dtype.append(('chi', float, (N_modes, N_modes)))
+        to_return = np.zeros(shape, dtype=dtype)
+        for label, value in zip(labels, values):
+            to_return[label] = value
+        for i, index in enumerate(np.ndindex(shape)):
+            slot = slots[i]
+            for quantity in quantities:
+                if quantity == 'chi':
+                    chi = np.full((N_modes, N_modes), np.nan)
+                    chi[np.ix_(slot, slot)] = results[i]['chi']
+                    to_return[index]['chi'] = chi
+                else:
+                    quantity_values = np.full(N_modes, np.nan)
+                    quantity_values[slot] = results[i][quantity]
+                    to_return[index][quantity] = quantity_values
+        return to_return
+
+    def _sweep_point(self, point, char_poly_values, quantities):
+        '''
+        Returns a dictionary of the quantities of Qcircuit.sweep for the component values ``point``.
+        '''
+        self._set_zeta(_char_poly_values=char_poly_values, **point)
+        result = {
+            'f': np.real(self.zeta)/2./pi,
+            'k': 2*np.imag(self.zeta)/2./pi
+        }
+        if 'A' in quantities or 'chi' in quantities:
+            Ks = self.kerr(**point)
+            result['A'] = np.diag(Ks).copy()
+            result['chi'] = Ks
+        return result
+
     @refuse_vectorize_kwargs(exclude = ['modes','taylor','excitations','return_ops'])
     def hamiltonian(self, modes='all', taylor=4, excitations=6, return_ops = False, **kwargs):
         r'''Returns the circuits Hamiltonian for further analysis with QuTiP.
@@ -1216,6 +1498,11 @@ class Network(Qcircuit):
     ----------
     netlist:    list of :class:`qucat.Component`
                 See examples
+    backend:    'symbolic' (default) or 'numeric'
+                The symbolic backend computes the characteristic polynomial 
+                of the circuit once, upon initialization. The numeric backend
+                solves the generalized eigenvalue problem of the R, L and C matrices
+                each time component values change, which scales to much larger circuits.
                 
     Returns
     -------
@@ -1260,8 +1547,8 @@ class Network(Qcircuit):
 
     '''
 
-    def __init__(self, netlist):
-        super(Network, self).__init__(netlist)
+    def __init__(self, netlist, backend='symbolic'):
+        super(Network, self).__init__(netlist, backend=backend)
 
 class GUI(Qcircuit):
     r'''Opens a graphical user interface to constructs a circuit.
@@ -1694,6 +1981,26 @@ class _Network(object):
             self.RLC_matrices[k].row_del(ground_node)
             self.RLC_matrices[k].col_del(ground_node)
 
+    def compute_numeric_RLC_matrices(self, **kwargs):
+        '''
+        Returns the R, L and C matrices with numeric component values, see _numeric.rlc_matrices.
+
+        Parameters
+        ----------
+        kwargs:     
+                    Values for un-specified circuit components, 
+                    ex: ``L=1e-9``.
+        '''
+        elements = []
+        for el in self.netlist:
+            if isinstance(el, C):
+                elements.append(('C', el.node_minus, el.node_plus, float(el._get_value(**kwargs))))
+            elif isinstance(el, L):
+                elements.append(('L', el.node_minus, el.node_plus, 1/float(el._get_value(**kwargs))))
+            elif isinstance(el, R):
+                elements.append(('R', el.node_minus, el.node_plus, 1/float(el._get_value(**kwargs))))
+        return _numeric.rlc_matrices(elements, self.nodes)
+
     def connect(self, element, node_minus, node_plus):
         '''
         Modifies the ``net_dict`` variable such that ``node_minus``
@@ -2125,6 +2432,14 @@ class Component(Circuit):
     def _flux_zpf(self, mode, **kwargs):
         self._circuit._set_zeta(**kwargs)
         w = self._circuit.zeta[mode]
+        if self._circuit.backend == 'numeric':
+            # Ratio of the mode fluxes across this component and across the reference element
+            ref = self._circuit.ref_elt[mode]
+            network = self._circuit._RLC_values
+            tr = _numeric.transfer(network, self._circuit._mode_vectors[w],
+                                   _numeric.port_vector(network, ref.node_minus, ref.node_plus),
+                                   _numeric.port_vector(network, self.node_minus, self.node_plus))
+            return tr*ref._flux_zpf_r(w, **kwargs)
         try:
             tr = self._circuit._flux_transformation_dict[
                                         self._circuit.ref_elt[mode].node_minus,
@@ -2453,6 +2768,22 @@ class L(Component):
 
         self._flux_zpf_r = _flux_zpf_r
 
+    def _compute_numeric_flux_zpf_r(self):
+        '''
+        Generate the L._flux_zpf_r function of the numeric backend,
+        where the derivative of the admittance evaluated at the nodes of the inductor 
+        is computed from the eigenvector of the mode, stored by Qcircuit._set_zeta.
+        '''
+        def _flux_zpf_r(z,**kwargs):
+            network = self._circuit._RLC_values
+            e = _numeric.port_vector(network, self.node_minus, self.node_plus)
+            dY = _numeric.admittance_derivative(self._circuit._mode_dY_numerators[z], self._circuit._mode_vectors[z], e)
+            # Elements barely taking part in the mode can give ImdY<0 (nan), they are not chosen as reference
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.sqrt(hbar/np.real(z)/np.imag(dY))
+
+        self._flux_zpf_r = _flux_zpf_r
+
 
 class J(L):
     """A class representing a junction
@@ -0,0 +1,48 @@
+#########################################################################
+# File Name: test_numeric_backend.py
+# Description: Cross-check of the numeric backend of Qcircuit against the symbolic one on small circuits.
+#              Run with: python -m pytest equ_circ/qucat/test_numeric_backend.py
+#########################################################################
+
+import warnings
+import numpy as np
+import pytest
+from equ_circ.qucat import Network, L, C, J, R
+
+
+def lc_circuit():
+    """
+    Lossless transmon: junction and inductor in parallel with a capacitor.
+    """
+    return [C(0, 1, 100e-15), J(0, 1, 'Lj'), L(0, 1, 20e-9)], dict(Lj=10e-9)
+
+
+def lossy_transmon_resonator():
+    """
+    Transmon capacitively coupled to an LC resonator, itself coupled to a 50 Ohm load.
+    """
+    return [C(0, 1, 100e-15), J(0, 1, 'Lj'), C(1, 2, 1e-15), C(2, 0, 100e-15), L(2, 0, 10e-9),
+            C(2, 3, 5e-15), R(3, 0, 50)], dict(Lj=10e-9)
+
+
+def floating_transmon():
+    """
+    Transmon whose two pads are not grounded, coupled to an LC resonator.
+    """
+    return [C(1, 2, 100e-15), J(1, 2, 'Lj'), C(0, 1, 20e-15), C(0, 2, 30e-15), C(2, 3, 2e-15),
+            C(3, 0, 80e-15), L(3, 0, 12e-9)], dict(Lj=9e-9)
+
+
+@pytest.mark.parametrize("circuit", [lc_circuit, lossy_transmon_resonator, floating_transmon])
+def test_numeric_backend_matches_symbolic(circuit):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        netlist, kwargs = circuit()
+        symbolic = Network(netlist).f_k_A_chi(**kwargs)
+        netlist, kwargs = circuit()
+        numeric = Network(netlist, backend='numeric').f_k_A_chi(**kwargs)
+
+    for name, expected, result in zip(['f', 'k', 'A', 'chi'], symbolic, numeric):
+        expected, result = np.atleast_1d(expected), np.atleast_1d(result)
+        assert expected.shape == result.shape, name
+        assert np.allclose(result, expected, rtol=1e-8, atol=1e-9 * np.max(np.abs(expected))), name
@@ -38,5 +38,18 @@ def auto_generate_air_bridges_ops2(gds_ops,
                                                              width=width, 
                                                              air_bridge_type=air_bridge_type)
 
-def optimize_air_bridges_layout(gds_ops):
-    return optimize_air_bridges_layout_code.optimize_air_bridges_layout(gds_ops)
\ No newline at end of file
+def auto_generate_air_bridges_ops_all(gds_ops, 
+                                      line_types=("control_lines", "transmission_lines"), 
+                                      spacing=120, 
+                                      chip_name=None, 
+                                      width=10, 
+                                      air_bridge_type="AirbridgeNb"):
+    return air_bridge_lzh.auto_generate_air_bridges_ops_all(gds_ops=gds_ops, 
+                                                            line_types=line_types, 
+                                                            spacing=spacing, 
+                                                            chip_name=chip_name, 
+                                                            width=width, 
+                                                            air_bridge_type=air_bridge_type)
+
+def optimize_air_bridges_layout(gds_ops, priority=None):
+    return optimize_air_bridges_layout_code.optimize_air_bridges_layout(gds_ops, priority=priority)
\ No newline at end of file
@@ -4,6 +4,7 @@
 
 from func_modules.air_bridges import air_bridge_yxh
 from func_modules.air_bridges import generate_air_bridges
+from addict import Dict
 import copy
 
 def auto_generate_air_bridges_ops_lzh(gds_ops, line_type, line_name, spacing=120, chip_name="chip3", width=10, air_bridge_type="AirBridge"):
@@ -104,4 +105,47 @@ def auto_generate_air_bridges_ops_lzh2(gds_ops, line_type, line_name, spacing=12
                                                    chip_type=chip_type,
                                                    width=width,
                                                    air_bridge_type=air_bridge_type)
-    return ops
\ No newline at end of file
+    return ops
+
+def auto_generate_air_bridges_ops_all(gds_ops, line_types=("control_lines", "transmission_lines"), spacing=120, chip_name=None, width=10, air_bridge_type="AirbridgeNb"):
+    """
+    Automatically generate air bridges for every line of the given types in one call.
+
+    Input:
+        gds_ops: dict, parameters for the GDS layout.
+        line_types: tuple or list, the types of lines to bridge.
+        spacing: int or float, the spacing of the air bridge.
+        chip_name: str, the name of the chip where the air bridges are located, the chip of each line if None.
+        width: int or float, the width of the air bridge.
+        air_bridge_type: str, the type of air bridge.
+
+    Output:
+        ops: dict, the generated air bridge parameters, named "{line_name}_{air bridge name}".
+        skipped: list, the names of the lines without a routed path (pos or path) or corner radius, not bridged.
+    """
+    ops = Dict()
+    skipped = []
+    for line_type in line_types:
+        for line_name, line_ops in gds_ops[line_type].items():
+            # Lines without a routed path or corner radius are skipped
+            if "pos" in line_ops.keys():
+                path = line_ops.pos
+            elif "path" in line_ops.keys():
+                path = line_ops.path
+            else:
+                skipped.append(line_name)
+                continue
+            if "corner_radius" not in line_ops.keys() or len(path) < 2:
+                skipped.append(line_name)
+                continue
+            line_chip_name = line_ops.chip if chip_name is None else chip_name
+            line_ab_ops = generate_air_bridges.add_air_bridges_czy(pos=path,
+                                                                   bend_radius=line_ops.corner_radius,
+                                                                   spacing=spacing,
+                                                                   chip_type=line_chip_name,
+                                                                   width=width,
+                                                                   air_bridge_type=air_bridge_type)
+            for ab_ops in line_ab_ops.values():
+                ab_ops.name = "{}_{}".format(line_name, ab_ops.name)
+                ops[ab_ops.name] = ab_ops
+    return ops, skipped
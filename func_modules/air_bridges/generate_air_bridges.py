@@ -1,3 +1,6 @@
+from func_modules.air_bridges import path_index
+
+
 def add_air_bridges_czy(pos, bend_radius, spacing=120, chip_type="chip3", width=10, air_bridge_type="AirbriageNb"):
     """
     Add air bridges to ensure they are within the valid range of the path, considering both the curved and straight segments of the path.
@@ -16,7 +19,7 @@ def add_air_bridges_czy(pos, bend_radius, spacing=120, chip_type="chip3", width=
     Functions:
         1. Add air bridges to the middle and corner sections of the path, ensuring they are within the path range.
         2. Use `gdspy.FlexPath` and polygon checking tools to implement precise geometric calculations.
-        3. Check if the air bridge positions are within the path range using `is_point_in_flexpath`.
+        3. Check if the air bridge positions are within the path range using `path_index.PathIndex`.
         4. Calculate the center position and rotation angle of the air bridges.
     """
     from addict import Dict
@@ -24,53 +27,6 @@ def add_air_bridges_czy(pos, bend_radius, spacing=120, chip_type="chip3", width=
     import numpy as np
     import gdspy
 
-    def find_nearest_segment_center(polygons, curr_point, line_width):
-        """
-        Search for the center point of the line segment nearest to curr_point and adjust the center position according to the line width.
-        """
-        path_points = np.concatenate(polygons)  # Expand the polygon point set into continuous path points
-        curr_x, curr_y = curr_point
-
-        # Initialize minimum distance and nearest center point
-        min_distance = float('inf')
-        nearest_center = None
-
-        # Traverse each segment of the path
-        for i in range(len(path_points) - 1):
-            # Calculate the endpoints of the line segment
-            x1, y1 = path_points[i]
-            x2, y2 = path_points[i + 1]
-
-            # Calculate the direction vector and length of the line segment
-            dx, dy = x2 - x1, y2 - y1
-            length = math.sqrt(dx**2 + dy**2)
-
-            # Unit directional vector
-            direction_x = dx / length
-            direction_y = dy / length
-
-            # Orthogonal directional vector (Normal vector)
-            normal_x = -direction_y
-            normal_y = direction_x
-
-            # Calculate the center point of the line segment
-            center_x = (x1 + x2) / 2
-            center_y = (y1 + y2) / 2
-
-            # Adjust the center point according to the line width
-            adjusted_center_x = center_x + normal_x * (line_width / 2)
-            adjusted_center_y = center_y + normal_y * (line_width / 2)
-
-            # Calculate the distance from adjusted center point to curr_point
-            distance = np.sqrt((adjusted_center_x - curr_x)**2 + (adjusted_center_y - curr_y)**2)
-
-            # Update the nearest center point
-            if distance < min_distance:
-                min_distance = distance
-                nearest_center = (adjusted_center_x, adjusted_center_y)
-
-        return nearest_center
-
     def adjust_air_bridge_position_for_bend(prev_point, curr_point, next_point, bend_radius, width):
         """
         Optimize the offset of the air bridge, accurately calculate the contact points between rounded corners and paths, and dynamically adjust correction factors.
@@ -83,7 +39,7 @@ def add_air_bridges_czy(pos, bend_radius, spacing=120, chip_type="chip3", width=
             bend_radius=bend_radius
         )
         polygons = path.to_polygonset().polygons  # Extract polygon point set
-        gds_pos = find_nearest_segment_center(polygons, curr_point, width)
+        gds_pos = path_index.nearest_segment_center(polygons, curr_point, width)
 
         # Vector computation
         v1x, v1y = prev_point[0] - curr_point[0], prev_point[1] - curr_point[1]
@@ -107,38 +63,6 @@ def add_air_bridges_czy(pos, bend_radius, spacing=120, chip_type="chip3", width=
 
         return gds_pos, rotation_angle + math.pi / 2  # Clockwise rotation by 90 degrees
 
-    def is_point_in_flexpath(point, polygons, tolerance):
-        """
-        Check if the checkpoint is within the polygon range of the path, allowing for a certain tolerance.
-        """
-        px, py = point
-
-        # Determine whether the point is within the polygon (strict condition)
-        for poly in polygons:
-            if gdspy.inside([point], [poly], short_circuit=True)[0]:
-                return True
-
-            # Determine the shortest distance from a point to the polygon boundary
-            for i in range(len(poly)):
-                x1, y1 = poly[i - 1]
-                x2, y2 = poly[i]
-
-                # Calculate the shortest distance from a point to a line segment
-                dx, dy = x2 - x1, y2 - y1
-                length_squared = dx**2 + dy**2
-                if length_squared == 0:
-                    distance = math.sqrt((px - x1)**2 + (py - y1)**2)
-                else:
-                    t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / length_squared))
-                    proj_x = x1 + t * dx
-                    proj_y = y1 + t * dy
-                    distance = math.sqrt((px - proj_x)**2 + (py - proj_y)**2)
-
-                if distance <= tolerance:
-                    return True
-
-        return False
-    
     def do_lines_intersect(p1, p2, q1, q2):
         """
         Determine if two line segments (p1, p2) and (q1, q2) intersect.
@@ -375,90 +299,78 @@ def add_air_bridges_czy(pos, bend_radius, spacing=120, chip_type="chip3", width=
     # Create FlexPath and extract polygons
     path = gdspy.FlexPath(pos, width=width, corners="circular bend", bend_radius=bend_radius)
     polygons = path.to_polygonset().polygons
+    index = path_index.PathIndex(polygons)
+    tolerance = width / 2 + 5  # Add 5 unit tolerance
 
-    bridge_num_map = dict()
-    first_bridge_num_map = dict()
-    last_num_bridges = 0 
+    # Names of the air bridges kept on each straight segment, in order
+    line_bridges = dict()
     last_path_vector = 0
     path_vector = 0
     # Add air bridge in the middle of the path
-    num_bridges = 0
-    # Add air bridge in the middle of the path
     for i in range(len(pos) - 1):
         start, end = pos[i], pos[i + 1]
         last_path_vector = path_vector
+        line_bridges[i] = []
         # Calculate segment length (consider adjusting the line width)
         path_vector = np.array([end[0] - start[0], end[1] - start[1]])
 
         path_length = np.linalg.norm(path_vector) - bend_radius * 2  # Subtract the rounded corners at both ends
-        flag = False
         # Calculate the number of air bridges within the effective path length
         if path_length > 0:
-            last_num_bridges = num_bridges
             num_bridges = max(1, math.ceil(path_length / spacing))
-            bridge_num_map[i] = num_bridges
+            # Interpolation calculation of the center positions of the air bridges
+            center_list = []
             for j in range(1, num_bridges + 1):
-                # Interpolation calculation of the center position of the air bridge
                 t = j / (num_bridges + 1)
-                center_x = (1 - t) * start[0] + t * end[0]
-                center_y = (1 - t) * start[1] + t * end[1]
-
-                gds_pos = (center_x, center_y)
-
-                if i > 0 and j == 1:
-                    last_point = options['air_bridge_line_{}_{}'.format(i-1, last_num_bridges)]
-                    if is_point_in_flexpath(gds_pos, polygons, width / 2 + 5):  # Add 5 unit tolerance
-                        if is_point_intersect(gds_pos, path_vector, last_point.gds_pos, last_path_vector):
-                            print('line {}, num {} intersect'.format(i, j))
-                            del options[last_point.name]
-                            last_point = options['air_bridge_line_{}_{}'.format(i-1, last_num_bridges-1)]
-                            bridge_num_map[i-1] = last_num_bridges-1
-                        else:
-                            angle = math.atan2(path_vector[1], path_vector[0])
-                            if flag == False:
-                                first_bridge_num_map[i] = j
-                                flag = True
-                            option = Dict(
-                                name=f"air_bridge_line_{i}_{j}",
-                                type="AirbridgeNb",
-                                chip=chip_type,
-                                gds_pos=gds_pos,
-                                rotation=angle
-                            )
-                            options[option.name] = option
-                else:
-                    # Check if the center point meets the range conditions
-                    if is_point_in_flexpath(gds_pos, polygons, width / 2 + 5):  # Add 5 unit tolerance
-                        angle = math.atan2(path_vector[1], path_vector[0])
-                        if flag == False:
-                            first_bridge_num_map[i] = j
-                            flag = True                       
-                        option = Dict(
-                            name=f"air_bridge_line_{i}_{j}",
-                            type="AirbridgeNb",
-                            chip=chip_type,
-                            gds_pos=gds_pos,
-                            rotation=angle
-                        )
-                        options[option.name] = option
+                center_list.append(((1 - t) * start[0] + t * end[0], (1 - t) * start[1] + t * end[1]))
+            center_inside = index.contains(center_list, tolerance)
+
+            for j in range(1, num_bridges + 1):
+                gds_pos = center_list[j - 1]
+
+                # Check if the center point meets the range conditions
+                if not center_inside[j - 1]:
+                    continue
+                if i > 0 and j == 1 and line_bridges[i - 1]:
+                    # The first air bridge of a segment must not intersect the last one of the previous segment
+                    last_point = options[line_bridges[i - 1][-1]]
+                    if is_point_intersect(gds_pos, path_vector, last_point.gds_pos, last_path_vector):
+                        print('line {}, num {} intersect'.format(i, j))
+                        del options[last_point.name]
+                        line_bridges[i - 1].pop()
+                        continue
+                angle = math.atan2(path_vector[1], path_vector[0])
+                option = Dict(
+                    name=f"air_bridge_line_{i}_{j}",
+                    type="AirbridgeNb",
+                    chip=chip_type,
+                    gds_pos=gds_pos,
+                    rotation=angle
+                )
+                options[option.name] = option
+                line_bridges[i].append(option.name)
+
+    # Adjust the corner positions and rotation angles, and check them against the path in one batch
+    corner_list = [adjust_air_bridge_position_for_bend(pos[i - 1], pos[i], pos[i + 1], bend_radius, width)
+                   for i in range(1, len(pos) - 1)]
+    corner_inside = index.contains([adjusted_pos for adjusted_pos, _ in corner_list], tolerance)
 
     # Add air bridge at the corner of the path
     for i in range(1, len(pos) - 1):
-        prev_point, curr_point, next_point = pos[i - 1], pos[i], pos[i + 1]
-
-        # Adjust the corner position and rotation angle
-        adjusted_pos, rotation_angle = adjust_air_bridge_position_for_bend(
-            prev_point, curr_point, next_point, bend_radius, width
-        )
+        adjusted_pos, rotation_angle = corner_list[i - 1]
 
-        last_point = options['air_bridge_line_{}_{}'.format(i-1, bridge_num_map[i-1])]
-        next_point1 = options['air_bridge_line_{}_{}'.format(i, first_bridge_num_map[i])]
         # Check if the center point meets the range conditions (this logic needs further improvement)
-        if is_point_in_flexpath(adjusted_pos, polygons, width / 2 + 5):  # Add 5 unit tolerance
+        if corner_inside[i - 1]:
             path_vector_now = angle_to_path_vector(rotation_angle, 1)
-            last_path_vector = angle_to_path_vector(last_point.rotation, 1)
-            next_path_vector = angle_to_path_vector(next_point1.rotation, 1)
-            if not (is_point_intersect_for_bend(adjusted_pos, path_vector_now, last_point.gds_pos, last_path_vector)) and not (is_point_intersect_for_bend(adjusted_pos, path_vector_now, next_point1.gds_pos, next_path_vector)):
+            # The corner air bridge must not intersect the last air bridge before it and the first one after it,
+            # segments without air bridges (e.g. shorter than the two bends) have nothing to check
+            neighbours = []
+            if line_bridges[i - 1]:
+                neighbours.append(options[line_bridges[i - 1][-1]])
+            if line_bridges[i]:
+                neighbours.append(options[line_bridges[i][0]])
+            if not any(is_point_intersect_for_bend(adjusted_pos, path_vector_now, point.gds_pos,
+                                                   angle_to_path_vector(point.rotation, 1)) for point in neighbours):
                 option = Dict(
                     name=f"air_bridge_pos_{i}",
                     type="AirbridgeNb",
@@ -1,124 +1,208 @@
-import pyclipper
+##########################################################################################
+# Design-wide resolution of overlapping air bridges
+##########################################################################################
 
-def optimize_air_bridges_layout(gds_ops):
+from addict import Dict
+import copy
+import math
+import re
+import numpy as np
+
+# Names of the bridges at the corners and on the straight segments of a line, see add_air_bridges_czy
+CORNER_NAME = re.compile(r"^(.*)air_bridge_pos_(\d+)$")
+LINE_NAME = re.compile(r"^(.*)air_bridge_line_(\d+)_(\d+)$")
+
+
+def get_air_bridge_footprint(ab_ops):
+    """
+    Returns the footprint of an air bridge as a list of shapely polygons.
+
+    Input:
+        ab_ops: Dict, the parameters of the air bridge. The outline of AirbridgeNb lists the two
+                corners of the bounding box of each of its polygons, the footprint is the two pads
+                (outline[6:10]), the span between them is not checked. AirBridge has no outline and is
+                built from center_pos, width, height and rotation.
+
+    Output:
+        pieces: list, shapely polygons, empty if the footprint is unknown.
+    """
+    import shapely
+
+    outline = ab_ops.get("outline", [])
+    if outline is not None and len(outline) >= 10:
+        outline = outline[6:10]  # The two pads of AirbridgeNb
+    if outline is not None and len(outline) >= 2 and len(outline) % 2 == 0:
+        corners = np.asarray(outline, dtype=float).reshape(-1, 2, 2)
+        return list(shapely.box(corners[:, 0, 0], corners[:, 0, 1], corners[:, 1, 0], corners[:, 1, 1]))
+    if "center_pos" in ab_ops.keys() and "width" in ab_ops.keys() and "height" in ab_ops.keys():
+        x, y = ab_ops.center_pos
+        cos, sin = math.cos(ab_ops.get("rotation", 0)), math.sin(ab_ops.get("rotation", 0))
+        points = []
+        for dx, dy in [(-1, -1), (1, -1), (1, 1), (-1, 1)]:
+            dx, dy = dx * ab_ops.width / 2, dy * ab_ops.height / 2
+            points.append((x + dx * cos - dy * sin, y + dx * sin + dy * cos))
+        return [shapely.Polygon(points)]
+    return []
+
+
+def find_overlapping_air_bridges(ab_ops_dict):
+    """
+    Finds all pairs of overlapping air bridges on the same chip in one pass over an STR-tree (R-tree)
+    of their footprints. Footprints that only touch do not overlap.
+
+    Input:
+        ab_ops_dict: dict, the parameters of the air bridges, keyed by name.
+
+    Output:
+        pairs: list, sorted (index_a, index_b) pairs with index_a < index_b, indices in the order of ab_ops_dict.
     """
-    
+    import shapely
+
+    pieces = []
+    owners = []
+    chips = []
+    for i, ab_ops in enumerate(ab_ops_dict.values()):
+        footprint = get_air_bridge_footprint(ab_ops)
+        pieces.extend(footprint)
+        owners.extend([i] * len(footprint))
+        chips.append(ab_ops.get("chip"))
+    if not pieces:
+        return []
+    pieces = np.array(pieces, dtype=object)
+    owners = np.array(owners)
+
+    tree = shapely.STRtree(pieces)
+    a, b = tree.query(pieces, predicate="intersects")
+    keep = owners[a] < owners[b]
+    a, b = a[keep], b[keep]
+    same_chip = np.array([chips[i] == chips[j] for i, j in zip(owners[a], owners[b])], dtype=bool)
+    a, b = a[same_chip], b[same_chip]
+    if len(a) == 0:
+        return []
+    overlap = shapely.area(shapely.intersection(pieces[a], pieces[b])) > 0
+    pairs = np.unique(np.stack([owners[a[overlap]], owners[b[overlap]]], axis=1), axis=0)
+    return [tuple(pair) for pair in pairs.tolist()]
+
+
+def default_air_bridge_priority(index, ab_name, ab_ops):
     """
+    Default priority of an air bridge, lower values are kept first: the order of the options.
+    """
+    return index
+
+
+def resolve_corner_overlaps(names, overlaps):
+    """
+    Resolves the overlaps around the corners of each line as the layout always did: at a corner bridge
+    ("air_bridge_pos_i"), if the last bridge of the segment before it and the first bridge of the segment
+    after it ("air_bridge_line_i-1_*" and "air_bridge_line_i_*") overlap, both are removed and the corner
+    bridge is kept, otherwise the corner bridge is removed if it overlaps one of them.
+
+    Input:
+        names: list, the names of the air bridges.
+        overlaps: set, the overlapping (index_a, index_b) pairs, index_a < index_b.
 
-    # uncoupling
-    import copy
-    gds_ops = copy.deepcopy(gds_ops)
-    new_gds_ops = copy.deepcopy(gds_ops)
-
-    # your code
-    print("to be continued...")
-
-    print("to be continued...")
-    #print(new_gds_ops)
-
-    airbridge_dict = new_gds_ops['air_bridges']
-    #print(airbridge_dict)
-
-    def get_rectangle_corners_x(polygon):
-        """
-        get four points for a rectangle
-        
-        :param p1: first points (x1, y1)
-        :param p2: second points (x2, y2)
-        :return: four points
-        """
-
-        #rotation += np.pi / 2
-        p1 = polygon[6]
-        p2 = polygon[7]
-
-        
-
-        p3 = polygon[8]
-        p4 = polygon[9]
-        x1, y1 = p1
-        x2, y2 = p2
-
-        # 计算其他两个点
-        corners1 = [
-            [x1, y1],  # 左下角
-            [x2, y1],  # 右下角
-            [x2, y2],  # 右上角
-            [x1, y2]   # 左上角
-        ]
-
-        corners1.append([x1,y1])
-        x3, y3 = p3
-        x4, y4 = p4
-
-        # 计算其他两个点
-        corners2 = [
-            [x3, y3],  # 左下角
-            [x4, y3],  # 右下角
-            [x4, y4],  # 右上角
-            [x3, y4]   # 左上角
-        ]
-        corners2.append([x3,y3])
-        return corners1 + corners2
-
-    i = 1
-    
-    del_flag = False
-    while True:
-        target = 'air_bridge_pos_{}'.format(i)
-        if target in airbridge_dict:
-            print(i)
-            if del_flag == True:
-                j = 2
-            else :
-                j = 1
-            last = ''
-            tmp1 = 'air_bridge_line_{}_{}'.format(i-1 , j)
-            while tmp1 in airbridge_dict :
-                last = tmp1
-                j += 1
-                tmp1 = 'air_bridge_line_{}_{}'.format(i-1 , j)
-            next = 'air_bridge_line_{}_{}'.format(i , 1)
-            polygon_A = airbridge_dict[last]['outline']
-            polygon_B = airbridge_dict[target]['outline']
-            polygon_C = airbridge_dict[next]['outline']
-
-            # first judge outside
-            polygon_A1 = get_rectangle_corners_x(polygon_A)
-            polygon_B1 = get_rectangle_corners_x(polygon_B)
-            polygon_C1 = get_rectangle_corners_x(polygon_C)
-            #print('polygon_a:' , polygon_A1)
-            #print('polygon_c:' , polygon_C1)
-            #print('polygon_b:' , polygon_B1)
-            pc = pyclipper.Pyclipper()
-            pc.AddPath(polygon_A1, pyclipper.PT_SUBJECT, True)
-            pc.AddPath(polygon_C1, pyclipper.PT_CLIP, True)
-            solution = pc.Execute(pyclipper.CT_INTERSECTION, pyclipper.PFT_EVENODD, pyclipper.PFT_EVENODD)
-            if len(solution) > 0:
-                print('del two ends')
-                del airbridge_dict[last]
-                del airbridge_dict[next]
-                del_flag = True
-            else :
-                # outside intersect is none :
-                print('prepare del for bend')
-                del_flag = False
-                pc1 = pyclipper.Pyclipper()
-                pc1.AddPath(polygon_A1, pyclipper.PT_SUBJECT, True)
-                pc1.AddPath(polygon_B1, pyclipper.PT_CLIP, True)
-                solution1 = pc1.Execute(pyclipper.CT_INTERSECTION, pyclipper.PFT_EVENODD, pyclipper.PFT_EVENODD)
-                pc2 = pyclipper.Pyclipper()
-                pc2.AddPath(polygon_B1, pyclipper.PT_SUBJECT, True)
-                pc2.AddPath(polygon_C1, pyclipper.PT_CLIP, True)
-                solution2 = pc2.Execute(pyclipper.CT_INTERSECTION, pyclipper.PFT_EVENODD, pyclipper.PFT_EVENODD)
-                if (len(solution1) > 0) or (len(solution2) > 0):
-                    print('del bend')
-                    del airbridge_dict[target]
-            i += 1
-        else :
-            break
-
-    new_gds_ops['air_bridges'] = airbridge_dict
-    print(new_gds_ops)
-    return new_gds_ops
-    return new_gds_ops
\ No newline at end of file
+    Output:
+        removed: dict, for each removed air bridge index, the indices of the air bridges it overlapped.
+    """
+    corners = {}
+    segments = {}
+    for i, name in enumerate(names):
+        match = CORNER_NAME.match(name)
+        if match:
+            corners[(match.group(1), int(match.group(2)))] = i
+            continue
+        match = LINE_NAME.match(name)
+        if match:
+            segments.setdefault((match.group(1), int(match.group(2))), []).append((int(match.group(3)), i))
+
+    def overlap(i, j):
+        return (min(i, j), max(i, j)) in overlaps
+
+    removed = {}
+    for (line, k), corner in sorted(corners.items()):
+        before = [i for _, i in sorted(segments.get((line, k - 1), [])) if i not in removed]
+        after = [i for _, i in sorted(segments.get((line, k), [])) if i not in removed]
+        if not before or not after:
+            continue
+        last, first = before[-1], after[0]
+        if overlap(last, first):
+            removed[last] = [first]
+            removed[first] = [last]
+        elif overlap(last, corner) or overlap(corner, first):
+            removed[corner] = [i for i in [last, first] if overlap(i, corner)]
+    return removed
+
+
+def resolve_air_bridge_overlaps(ab_ops_dict, priority=None):
+    """
+    Removes overlapping air bridges across the whole design.
+
+    Without a priority, the overlaps around the corners of each line are first resolved with
+    resolve_corner_overlaps. The remaining bridges are then visited in order of priority, and a bridge
+    is removed if it overlaps a bridge kept before it, which resolves the overlaps between lines and chips.
+
+    Input:
+        ab_ops_dict: dict, the parameters of the air bridges, keyed by name.
+        priority: callable or None, priority(index, name, ops) returning a sortable key, lower values are kept first.
+                  If None, the corner rule and then default_air_bridge_priority.
+
+    Output:
+        kept_ops: Dict, the parameters of the remaining air bridges, in their original order.
+        report: Dict, with
+            overlap_num: int, the number of overlapping pairs found.
+            removed: list, the names of the removed air bridges.
+            conflicts: Dict, for each removed air bridge, the names of the air bridges it overlapped.
+    """
+    names = list(ab_ops_dict.keys())
+    pairs = find_overlapping_air_bridges(ab_ops_dict)
+
+    removed = {}
+    if priority is None:
+        priority = default_air_bridge_priority
+        removed = resolve_corner_overlaps(names, set(pairs))
+
+    neighbours = [[] for _ in names]
+    for i, j in pairs:
+        neighbours[i].append(j)
+        neighbours[j].append(i)
+
+    order = sorted(range(len(names)), key=lambda i: priority(i, names[i], ab_ops_dict[names[i]]))
+    kept = np.zeros(len(names), dtype=bool)
+    for i in order:
+        if i in removed:
+            continue
+        conflicts = [j for j in neighbours[i] if kept[j]]
+        if conflicts:
+            removed[i] = conflicts
+        else:
+            kept[i] = True
+
+    report = Dict(overlap_num=len(pairs), removed=[], conflicts=Dict())
+    for i in sorted(removed):
+        report.removed.append(names[i])
+        report.conflicts[names[i]] = [names[j] for j in sorted(removed[i])]
+
+    kept_ops = Dict()
+    for i, name in enumerate(names):
+        if kept[i]:
+            kept_ops[name] = ab_ops_dict[name]
+    return kept_ops, report
+
+
+def optimize_air_bridges_layout(gds_ops, priority=None):
+    """
+    Removes overlapping air bridges from the layout parameters, see resolve_air_bridge_overlaps.
+
+    Input:
+        gds_ops: dict, parameters for the GDS layout.
+        priority: callable or None, the priority of the air bridges, see resolve_air_bridge_overlaps.
+
+    Output:
+        new_gds_ops: Dict, the layout parameters without the removed air bridges.
+        report: Dict, the removed air bridges, see resolve_air_bridge_overlaps.
+    """
+    new_gds_ops = copy.copy(gds_ops)  # Only the air bridges change
+    kept_ops, report = resolve_air_bridge_overlaps(gds_ops["air_bridges"], priority=priority)
+    new_gds_ops["air_bridges"] = copy.deepcopy(kept_ops)
+    return new_gds_ops, report
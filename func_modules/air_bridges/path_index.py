@@ -0,0 +1,182 @@
+##########################################################################################
+# Segment index of a line's polygons, used to check candidate air bridge positions in batches
+##########################################################################################
+
+import numpy as np
+
+
+def nearest_segment_center(polygons, curr_point, line_width):
+    """
+    Find the center of the path segment closest to curr_point, shifted by half the line width along the segment normal.
+    The polygon point sets are joined into one continuous path, as the previous per-segment loop did.
+
+    Input:
+        polygons: list, a list of polygons that make up the path, where each polygon is a 2D array of points.
+        curr_point: tuple, the coordinates (x, y) of the current point.
+        line_width: float, the width of the path.
+
+    Output:
+        nearest_center: tuple, the coordinates (x, y) of the adjusted center of the nearest segment, None if there is none.
+    """
+    path_points = np.concatenate(polygons)
+    p1, p2 = path_points[:-1], path_points[1:]
+    d = p2 - p1
+    length = np.sqrt(d[:, 0]**2 + d[:, 1]**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normal_x = -(d[:, 1] / length)
+        normal_y = d[:, 0] / length
+    center_x = (p1[:, 0] + p2[:, 0]) / 2 + normal_x * (line_width / 2)
+    center_y = (p1[:, 1] + p2[:, 1]) / 2 + normal_y * (line_width / 2)
+    distance = np.sqrt((center_x - curr_point[0])**2 + (center_y - curr_point[1])**2)
+    distance[np.isnan(distance)] = np.inf  # Degenerate segments are skipped
+    if len(distance) == 0 or np.isinf(distance.min()):
+        return None
+    i = np.argmin(distance)  # The first of equally close segments
+    return (center_x[i], center_y[i])
+
+
+class PathIndex:
+    """
+    Uniform grid index over the boundary segments of the polygons of a line (e.g. a FlexPath).
+
+    `contains` tells for a batch of points whether each one is inside a polygon or within a tolerance
+    of its boundary, only testing the segments registered in the grid cells near the point.
+    """
+
+    def __init__(self, polygons, cell_size: float = None):
+        """
+        Builds the index.
+
+        Input:
+            polygons: list, a list of polygons, each a 2D array of points.
+            cell_size: float, the size of the grid cells, chosen from the extent of the polygons if None.
+
+        Output:
+            None
+        """
+        polygons = [np.asarray(poly, dtype=float) for poly in polygons if len(poly) > 0]
+        if polygons:
+            # Segment i of a polygon goes from vertex i - 1 to vertex i, the closing segment comes first
+            self.p1 = np.concatenate([np.roll(poly, 1, axis=0) for poly in polygons])
+            self.p2 = np.concatenate(polygons)
+            self.polygon_id = np.concatenate([np.full(len(poly), k) for k, poly in enumerate(polygons)])
+        else:
+            self.p1 = self.p2 = np.zeros((0, 2))
+            self.polygon_id = np.zeros(0, dtype=int)
+        self.polygon_num = len(polygons)
+
+        lower = np.minimum(self.p1, self.p2)
+        upper = np.maximum(self.p1, self.p2)
+        if cell_size is None:
+            extent = (upper.max(axis=0) - lower.min(axis=0)).max() if len(lower) else 1
+            cell_size = max(extent / 64, float(np.median(upper - lower)) if len(lower) else 0, 1e-6)
+        self.cell_size = cell_size
+
+        # Register each segment in the cells its bounding box covers, and in the rows its y range covers
+        self.cell_Dict = {}
+        self.row_Dict = {}
+        cell_lower = np.floor(lower / cell_size).astype(int)
+        cell_upper = np.floor(upper / cell_size).astype(int)
+        for i, ((ix0, iy0), (ix1, iy1)) in enumerate(zip(cell_lower, cell_upper)):
+            for iy in range(iy0, iy1 + 1):
+                self.row_Dict.setdefault(iy, []).append(i)
+                for ix in range(ix0, ix1 + 1):
+                    self.cell_Dict.setdefault((ix, iy), []).append(i)
+        self.cell_Dict = {k: np.array(v) for k, v in self.cell_Dict.items()}
+        self.row_Dict = {k: np.array(v) for k, v in self.row_Dict.items()}
+
+        # The same cells as sorted keys, the segments of cell_key[k] are cell_segments[cell_offset[k]:cell_offset[k + 1]]
+        cells = sorted((self.cell_id(ix, iy), segments) for (ix, iy), segments in self.cell_Dict.items())
+        self.cell_key = np.array([key for key, _ in cells], dtype=np.int64)
+        self.cell_offset = np.concatenate([[0], np.cumsum([len(segments) for _, segments in cells])]).astype(int)
+        self.cell_segments = np.concatenate([segments for _, segments in cells]) if cells else np.zeros(0, dtype=int)
+        return
+
+    @staticmethod
+    def cell_id(ix, iy):
+        """
+        Integer key of the grid cell (ix, iy), increasing with ix then iy (|iy| < 2**31).
+        """
+        return ix * 2**32 + iy
+
+    def near_boundary(self, points, tolerance):
+        """
+        Checks whether points are within tolerance of a segment, using the same arithmetic as the point-to-segment
+        distance of the per-edge loop it replaces. All the (point, segment) pairs of the grid cells within tolerance
+        of the points are gathered and measured at once.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        result = np.zeros(len(points), dtype=bool)
+        if len(points) == 0 or len(self.cell_key) == 0:
+            return result
+
+        # Grid cells covered by the square of half side tolerance around each point
+        lower = np.floor((points - tolerance) / self.cell_size).astype(np.int64)
+        upper = np.floor((points + tolerance) / self.cell_size).astype(np.int64)
+        nx, ny = upper[:, 0] - lower[:, 0] + 1, upper[:, 1] - lower[:, 1] + 1
+        point_id = np.repeat(np.arange(len(points)), nx * ny)
+        k = np.arange(len(point_id)) - np.repeat(np.cumsum(nx * ny) - nx * ny, nx * ny)
+        keys = self.cell_id(lower[point_id, 0] + k // ny[point_id], lower[point_id, 1] + k % ny[point_id])
+
+        # Segments registered in these cells
+        cell = np.minimum(np.searchsorted(self.cell_key, keys), len(self.cell_key) - 1)
+        found = self.cell_key[cell] == keys
+        point_id, cell = point_id[found], cell[found]
+        count = self.cell_offset[cell + 1] - self.cell_offset[cell]
+        point_id = np.repeat(point_id, count)
+        k = np.arange(len(point_id)) - np.repeat(np.cumsum(count) - count, count)
+        segments = self.cell_segments[np.repeat(self.cell_offset[cell], count) + k]
+
+        x1, y1 = self.p1[segments, 0], self.p1[segments, 1]
+        x2, y2 = self.p2[segments, 0], self.p2[segments, 1]
+        px, py = points[point_id, 0], points[point_id, 1]
+        dx, dy = x2 - x1, y2 - y1
+        length_squared = dx**2 + dy**2
+        degenerate = length_squared == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(((px - x1) * dx + (py - y1) * dy) / length_squared, 0, 1)
+        t[degenerate] = 0
+        distance = np.sqrt((px - (x1 + t * dx))**2 + (py - (y1 + t * dy))**2)
+        result[point_id[distance <= tolerance]] = True
+        return result
+
+    def inside(self, points):
+        """
+        Checks whether points are inside any polygon (even-odd rule per polygon), points on the boundary are undecided.
+        """
+        result = np.zeros(len(points), dtype=bool)
+        rows = np.floor(points[:, 1] / self.cell_size).astype(int)
+        for row in np.unique(rows):
+            if row not in self.row_Dict:
+                continue
+            segments = self.row_Dict[row]
+            k = np.nonzero(rows == row)[0]
+            px, py = points[k, 0][:, None], points[k, 1][:, None]
+            x1, y1 = self.p1[segments, 0][None, :], self.p1[segments, 1][None, :]
+            x2, y2 = self.p2[segments, 0][None, :], self.p2[segments, 1][None, :]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                crossing = ((y1 < py) != (y2 < py)) & (x1 + (py - y1) * (x2 - x1) / (y2 - y1) > px)
+            # Number of crossed edges of each polygon
+            owner = np.zeros((len(segments), self.polygon_num), dtype=int)
+            owner[np.arange(len(segments)), self.polygon_id[segments]] = 1
+            counts = crossing.astype(int) @ owner
+            result[k] = np.any(counts % 2 == 1, axis=1)
+        return result
+
+    def contains(self, points, tolerance):
+        """
+        Checks whether points are inside the polygons or within tolerance of their boundary.
+
+        Input:
+            points: list, the (x, y) coordinates of the points.
+            tolerance: float, the allowed distance from the boundary.
+
+        Output:
+            result: numpy array of bool, one value per point.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(points) == 0 or self.polygon_num == 0:
+            return np.zeros(len(points), dtype=bool)
+        result = self.inside(points)
+        result[~result] = self.near_boundary(points[~result], tolerance)
+        return result
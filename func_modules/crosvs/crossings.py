@@ -0,0 +1,138 @@
+############################################################################################
+# Crossings between the paths of lines, found over all lines at once
+############################################################################################
+
+from addict import Dict
+import numpy as np
+import toolbox
+
+
+def get_line_path(line_ops):
+    """Get the center path of a line
+
+    input：
+        line_ops: Line parameters
+
+    output：
+        path: List of path points, None if the line has no path
+    """
+    if line_ops.get("type") == "CouplingLineStraight":
+        return [line_ops.start_pos, line_ops.end_pos]
+    for key in ["pos", "path"]:
+        if key in line_ops.keys() and len(line_ops[key]) >= 2:
+            return line_ops[key]
+    return None
+
+
+class SegmentGrid:
+    """
+    Uniform grid of line segments. A segment is registered in every cell its bounding box covers,
+    so two segments whose bounding boxes overlap share at least one cell.
+    """
+
+    def __init__(self, segments, cell_size: float = None):
+        """
+        input：
+            segments: Array of segments with shape (N, 2, 2)
+            cell_size: Size of the grid cells, chosen from the segments if None
+        """
+        segments = np.asarray(segments, dtype=float).reshape(-1, 2, 2)
+        self.lower = segments.min(axis=1)
+        self.upper = segments.max(axis=1)
+        if cell_size is None:
+            if len(segments):
+                extent = (self.upper.max(axis=0) - self.lower.min(axis=0)).max()
+                cell_size = max(float(np.median((self.upper - self.lower).max(axis=1))), extent / 1024)
+            cell_size = max(cell_size or 0, 1e-6)
+        self.cell_size = cell_size
+
+        self.cell_Dict = {}
+        cell_lower = np.floor(self.lower / cell_size).astype(np.int64)
+        cell_upper = np.floor(self.upper / cell_size).astype(np.int64)
+        for i, ((ix0, iy0), (ix1, iy1)) in enumerate(zip(cell_lower.tolist(), cell_upper.tolist())):
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    self.cell_Dict.setdefault((ix, iy), []).append(i)
+        return
+
+    def candidate_pairs(self, group):
+        """Pairs of segments of different groups whose bounding boxes overlap
+
+        input：
+            group: Group index of each segment, segments of the same group are not paired
+
+        output：
+            pairs: Array of (i, j) segment index pairs with i < j, sorted
+        """
+        group = np.asarray(group)
+        found = []
+        for cell in self.cell_Dict.values():
+            if len(cell) < 2:
+                continue
+            cell = np.array(cell)
+            i, j = np.triu_indices(len(cell), 1)
+            i, j = cell[i], cell[j]
+            keep = group[i] != group[j]
+            found.append(np.stack([i[keep], j[keep]], axis=1))
+        if not found:
+            return np.zeros((0, 2), dtype=int)
+        pairs = np.unique(np.concatenate(found), axis=0)
+        # Bounding boxes of both segments must overlap
+        i, j = pairs[:, 0], pairs[:, 1]
+        overlap = np.all((self.lower[i] <= self.upper[j]) & (self.lower[j] <= self.upper[i]), axis=1)
+        return pairs[overlap]
+
+
+def find_line_crossings(lines_ops_list):
+    """Find the crossings between lines of different groups
+
+    The segments of all lines are bucketed in one grid, only segments sharing a grid cell are intersected
+    (with toolbox.intersect_segments). The crossings are ordered as the nested loops over the groups, the lines of each
+    group and their segments would find them.
+
+    input：
+        lines_ops_list: List of (group name, line parameters) pairs, e.g. [("coupling_lines", cpls_ops), ...]
+
+    output：
+        crossings: List of crossings, each a Dict with
+            pos: Crossing point [x, y]
+            lines: The two crossing lines as (group name, line name), the line of the earlier group first
+            segments: Indices of the crossing segments in the paths of the two lines
+    """
+    segments = []
+    owners = []  # (group index, line index, segment index) of each segment
+    line_names = []
+    for group_idx, (group_name, lines_ops) in enumerate(lines_ops_list):
+        line_names.append([])
+        for line_name, line_ops in lines_ops.items():
+            line_idx = len(line_names[group_idx])
+            line_names[group_idx].append(line_name)
+            path = get_line_path(line_ops)
+            if path is None:
+                continue
+            for seg_idx in range(len(path) - 1):
+                segments.append([path[seg_idx], path[seg_idx + 1]])
+                owners.append((group_idx, line_idx, seg_idx))
+    if not segments:
+        return []
+
+    owners = np.array(owners)
+    segments = np.array([[p[:2] for p in seg] for seg in segments], dtype=float)
+    grid = SegmentGrid(segments)
+    pairs = grid.candidate_pairs(owners[:, 0])
+    # Order as the nested loops: groups, lines of the earlier group, lines of the later group, then segments
+    first = np.where(owners[pairs[:, 0], 0] <= owners[pairs[:, 1], 0], pairs[:, 0], pairs[:, 1])
+    second = np.where(owners[pairs[:, 0], 0] <= owners[pairs[:, 1], 0], pairs[:, 1], pairs[:, 0])
+    order = np.lexsort((owners[second, 2], owners[first, 2], owners[second, 1], owners[first, 1],
+                        owners[second, 0], owners[first, 0]))
+
+    points, first, second = toolbox.intersect_segments(segments, segments, pairs=(first[order], second[order]))
+
+    crossings = []
+    for itsct, i, j in zip(points.tolist(), first.tolist(), second.tolist()):
+        crossings.append(Dict(
+            pos=itsct,
+            lines=[(lines_ops_list[owners[k, 0]][0], line_names[owners[k, 0]][owners[k, 1]]) for k in (i, j)],
+            segments=[int(owners[i, 2]), int(owners[j, 2])]
+        ))
+    return crossings
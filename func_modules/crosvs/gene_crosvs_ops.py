@@ -12,7 +12,6 @@ class GeneCrosvsOps(BranchBase):
         super().__init__(**branch_options)
 
     def cpls_ops__tmls_ops(self, branch_options):
-        branch_options = copy.deepcopy(branch_options)
         cpls_ops = copy.deepcopy(branch_options.cpls_ops)
         tmls_ops = copy.deepcopy(branch_options.tmls_ops)
         crosvs_type = "InsulatingSheet"
@@ -23,7 +22,6 @@ class GeneCrosvsOps(BranchBase):
         return copy.deepcopy(crosvs_ops)
     
     def chip_name__cpls_ops__tmls_ops(self, branch_options):
-        branch_options = copy.deepcopy(branch_options)
         cpls_ops = copy.deepcopy(branch_options.cpls_ops)
         tmls_ops = copy.deepcopy(branch_options.tmls_ops)
         crosvs_type = "InsulatingSheet"
@@ -31,4 +29,19 @@ class GeneCrosvsOps(BranchBase):
 
         crosvs_ops = primitives.generate_crosvs_ops_from_cpls_ops_and_tmls_ops(cpls_ops, tmls_ops, crosvs_type, chip_name)
 
-        return copy.deepcopy(crosvs_ops)
\ No newline at end of file
+        return copy.deepcopy(crosvs_ops)
+    
+    def cpls_ops__ctls_ops__tmls_ops(self, branch_options):
+        branch_options.chip_name = "chip0"
+        return self.chip_name__cpls_ops__ctls_ops__tmls_ops(branch_options)
+
+    def chip_name__cpls_ops__ctls_ops__tmls_ops(self, branch_options):
+        lines_ops_list = [("coupling_lines", branch_options.cpls_ops),
+                          ("transmission_lines", branch_options.tmls_ops),
+                          ("control_lines", branch_options.ctls_ops)]
+        crosvs_type = "InsulatingSheet"
+        chip_name = branch_options.chip_name
+
+        crosvs_ops = primitives.generate_crosvs_ops_from_lines_ops(lines_ops_list, crosvs_type, chip_name)
+
+        return copy.deepcopy(crosvs_ops)
@@ -6,6 +6,7 @@ from addict import Dict
 import toolbox
 import copy
 from components import cross_overs
+from func_modules.crosvs import crossings as crossings_engine
 
 def generate_ins_sheets(cpls_ops, tmls_ops):
     """Generate insulation pads based on coupling lines and transmission lines
@@ -25,21 +26,30 @@ def generate_ins_sheets(cpls_ops, tmls_ops):
 
     # Generate insulation pad
     ins_sheets = Dict()
-    idx = 0
-
-    for cpl_name, cpl_ops in cpls_ops.items():
-        for tml_name, tml_ops in tmls_ops.items():
-            path1 = [cpl_ops.start_pos, cpl_ops.end_pos]
-            path2 = tml_ops.pos
-            itscts = toolbox.calc_itscts(path1, path2)
-            for itsct in itscts:
-                ins_sheets["ins_sheet{}".format(idx)].name = "ins_sheet{}".format(idx)
-                ins_sheets["ins_sheet{}".format(idx)].pos = itsct
-                ins_sheets["ins_sheet{}".format(idx)].type = "InsulatingSheet"
-                idx += 1
+    crossings = crossings_engine.find_line_crossings([("coupling_lines", as_straight_cpls(cpls_ops)),
+                                                      ("transmission_lines", tmls_ops)])
+    for idx, crossing in enumerate(crossings):
+        ins_sheets["ins_sheet{}".format(idx)].name = "ins_sheet{}".format(idx)
+        ins_sheets["ins_sheet{}".format(idx)].pos = crossing.pos
+        ins_sheets["ins_sheet{}".format(idx)].type = "InsulatingSheet"
 
     return copy.deepcopy(ins_sheets)
 
+def as_straight_cpls(cpls_ops):
+    """Treat coupling lines as straight lines from start_pos to end_pos
+
+    input：
+        cpls_ops: Coupling line parameters
+
+    output：
+        cpls_ops: Parameters with the type of every coupling line set to CouplingLineStraight
+    """
+    straight_cpls_ops = Dict()
+    for cpl_name, cpl_ops in cpls_ops.items():
+        straight_cpls_ops[cpl_name] = Dict(type="CouplingLineStraight", start_pos=cpl_ops.start_pos,
+                                           end_pos=cpl_ops.end_pos)
+    return straight_cpls_ops
+
 def soak_cross_overs(cross_overs_ops):
     """Complete cross line parameters based on class
 
@@ -100,23 +110,43 @@ def generate_crosvs_ops_from_cpls_ops_and_tmls_ops(cpls_ops, tmls_ops, crosvs_ty
     crosvs_type = crosvs_type
     chip_name = chip_name
 
-    # Generate insulation pad
-    ins_sheets = Dict()
-    idx = 0
+    return generate_crosvs_ops_from_lines_ops([("coupling_lines", cpls_ops), ("transmission_lines", tmls_ops)],
+                                              crosvs_type, chip_name)
 
-    for cpl_name, cpl_ops in cpls_ops.items():
-        for tml_name, tml_ops in tmls_ops.items():
+def generate_crosvs_ops_from_lines_ops(lines_ops_list, crosvs_type, chip_name):
+    """Generate insulation pads at every crossing of lines of different groups
+
+    input：
+        lines_ops_list: List of (group name, line parameters) pairs, e.g. [("coupling_lines", cpls_ops), ("transmission_lines", tmls_ops), ("control_lines", ctls_ops)]
+        crosvs_type: Type of the insulation pads
+        chip_name: Chip of the insulation pads
+
+    output：
+        ins_sheets: Insulation pad parameters, in the order of crossings.find_line_crossings
+    
+    """
+
+    # interface
+    lines_ops_list = [(group_name, Dict(lines_ops)) for group_name, lines_ops in lines_ops_list]
+
+    # Only straight coupling lines can be crossed, as soon as there is a line of another group to cross
+    for group_idx, (group_name, lines_ops) in enumerate(lines_ops_list):
+        if group_name != "coupling_lines":
+            continue
+        others = [other_ops for other_name, other_ops in lines_ops_list if other_name != group_name]
+        if not any(len(other_ops) > 0 for other_ops in others):
+            continue
+        for cpl_name, cpl_ops in lines_ops.items():
             if cpl_ops.type != "CouplingLineStraight":
                 raise ValueError("The automatic generation of crossover currently only supports the coupling type of CouplingLineStraight, and the type of {} is {}!".format(cpl_name, cpl_ops.type))
-            
-            path1 = [cpl_ops.start_pos, cpl_ops.end_pos]
-            path2 = tml_ops.pos
-            itscts = toolbox.calc_itscts(path1, path2)
-            for itsct in itscts:
-                ins_sheets["ins_sheet{}".format(idx)].name = "ins_sheet{}".format(idx)
-                ins_sheets["ins_sheet{}".format(idx)].chip = chip_name
-                ins_sheets["ins_sheet{}".format(idx)].pos = itsct
-                ins_sheets["ins_sheet{}".format(idx)].type = crosvs_type
-                idx += 1
+
+    # Generate insulation pad
+    ins_sheets = Dict()
+    crossings = crossings_engine.find_line_crossings(lines_ops_list)
+    for idx, crossing in enumerate(crossings):
+        ins_sheets["ins_sheet{}".format(idx)].name = "ins_sheet{}".format(idx)
+        ins_sheets["ins_sheet{}".format(idx)].chip = chip_name
+        ins_sheets["ins_sheet{}".format(idx)].pos = crossing.pos
+        ins_sheets["ins_sheet{}".format(idx)].type = crosvs_type
 
     return copy.deepcopy(ins_sheets)
\ No newline at end of file
@@ -38,6 +38,24 @@ class GeneDesignOps(BranchBase):
         ops = Dict()
         ops.topology = topo_module.generate_topology(qasm_path=qasm_path)
         return copy.deepcopy(ops)
+
+    def gats__qasm_path(self, gene_ops):
+        """
+        Generate operational parameters based on the QASM file path, with the parameters of the GATS search.
+
+        Input:
+            gene_ops: dict, containing the following parameters:
+                - qasm_path: str, the path to the QASM file.
+                - gats: dict, GATS parameters (pop_size, n_generations, tournament_size, ts_length, seed,
+                  time_budget, patience, checkpoint_path, resume, processes, write_artifacts).
+
+        Output:
+            ops: dict, the generated operational parameters.
+        """
+        qasm_path = gene_ops.qasm_path
+        ops = Dict()
+        ops.topology = topo_module.generate_topology(qasm_path=qasm_path, gats=gene_ops.gats)
+        return copy.deepcopy(ops)
     
     def topo_col__topo_row(self, gene_ops):
         """
@@ -0,0 +1,185 @@
+#######################################################################
+# Placement engine for indium bumps: rasterized keep-out mask and incremental spatial hash
+#######################################################################
+
+import math
+import numpy as np
+import pyclipper
+
+
+def expand_polygons(elements, margin):
+    """
+    Expand polygons by a margin using pyclipper.
+
+    Input:
+        elements: list, a list of polygon point arrays.
+        margin: float, the distance to expand.
+
+    Output:
+        expanded_polygons: list, a list of expanded polygons (integer point lists).
+    """
+    expanded_polygons = []
+    pco = pyclipper.PyclipperOffset()
+    for element in elements:
+        pco.Clear()
+        pco.AddPath(np.asarray(element).tolist(), pyclipper.JT_ROUND, pyclipper.ET_CLOSEDPOLYGON)
+        expanded_polygons.extend(pco.Execute(margin))
+    return expanded_polygons
+
+
+def points_in_polygon(px, py, polygon):
+    """
+    Vectorized point-in-polygon test with the same rules as pyclipper.PointInPolygon,
+    points on the boundary count as inside.
+
+    Input:
+        px: numpy array, x coordinates of the points.
+        py: numpy array, y coordinates of the points.
+        polygon: list, the polygon points.
+
+    Output:
+        inside: numpy array of bool, True for points inside or on the boundary of the polygon.
+    """
+    if len(polygon) < 3:
+        return np.zeros(len(px), dtype=bool)
+    vertices = np.asarray(polygon, dtype=float)
+    x0, y0 = vertices[:, 0][None, :], vertices[:, 1][None, :]  # Edge start
+    x1, y1 = np.roll(x0, -1, axis=1), np.roll(y0, -1, axis=1)  # Edge end
+    px, py = px[:, None], py[:, None]
+
+    on_boundary = (y1 == py) & ((x1 == px) | ((y0 == py) & ((x1 > px) == (x0 < px))))
+    crossing = (y0 < py) != (y1 < py)
+    toggle = crossing & (x0 >= px) & (x1 > px)
+    # Edges passing the point on an undecided side need the orientation of the point
+    undecided = crossing & ((x0 >= px) != (x1 > px))
+    d = (x0 - px) * (y1 - py) - (x1 - px) * (y0 - py)
+    on_boundary |= undecided & (d == 0)
+    toggle |= undecided & (d != 0) & ((d > 0) == (y1 > y0))
+
+    return on_boundary.any(axis=1) | (np.count_nonzero(toggle, axis=1) % 2 == 1)
+
+
+def keep_out_mask(grid_x, grid_y, expanded_polygons):
+    """
+    Rasterize the expanded polygons on the candidate grid.
+
+    Each polygon is only tested against the grid points inside its bounding box, and points already
+    excluded by another polygon are skipped.
+
+    Input:
+        grid_x: numpy array, sorted x coordinates of the grid.
+        grid_y: numpy array, sorted y coordinates of the grid.
+        expanded_polygons: list, a list of expanded polygons.
+
+    Output:
+        mask: numpy array of bool with shape (len(grid_x), len(grid_y)), True where a bump is not allowed.
+    """
+    mask = np.zeros((len(grid_x), len(grid_y)), dtype=bool)
+    # Grid coordinates as pyclipper sees them
+    clipper_x = np.trunc(grid_x)
+    clipper_y = np.trunc(grid_y)
+    for polygon in expanded_polygons:
+        if len(polygon) < 3:
+            continue
+        vertices = np.asarray(polygon)
+        (x_min, y_min), (x_max, y_max) = vertices.min(axis=0), vertices.max(axis=0)
+        ix0, ix1 = np.searchsorted(clipper_x, x_min, "left"), np.searchsorted(clipper_x, x_max, "right")
+        iy0, iy1 = np.searchsorted(clipper_y, y_min, "left"), np.searchsorted(clipper_y, y_max, "right")
+        if ix0 >= ix1 or iy0 >= iy1:
+            continue
+        sub_mask = mask[ix0:ix1, iy0:iy1]
+        ix, iy = np.nonzero(~sub_mask)
+        if len(ix) == 0:
+            continue
+        inside = points_in_polygon(clipper_x[ix0 + ix], clipper_y[iy0 + iy], polygon)
+        sub_mask[ix[inside], iy[inside]] = True
+    return mask
+
+
+class SpatialHash:
+    """
+    Incremental spatial hash of placed points, answering "is there a point closer than min_distance".
+
+    The bucket size equals min_distance, so only the 3x3 neighbouring buckets need to be checked.
+    """
+
+    def __init__(self, min_distance):
+        """
+        Input:
+            min_distance: float, the minimum allowed distance between points.
+        """
+        self.min_distance = min_distance
+        self.min_distance_2 = min_distance ** 2
+        self.bucket_Dict = {}
+        return
+
+    def key(self, point):
+        return (math.floor(point[0] / self.min_distance), math.floor(point[1] / self.min_distance))
+
+    def is_far(self, point):
+        """
+        Checks that no stored point is closer than min_distance.
+
+        Input:
+            point: tuple, the point to check.
+
+        Output:
+            bool, True if all stored points are at least min_distance away.
+        """
+        if self.min_distance <= 0:
+            return True
+        kx, ky = self.key(point)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in self.bucket_Dict.get((kx + dx, ky + dy), ()):
+                    if (point[0] - other[0]) ** 2 + (point[1] - other[1]) ** 2 < self.min_distance_2:
+                        return False
+        return True
+
+    def add(self, point):
+        """
+        Stores a point.
+
+        Input:
+            point: tuple, the point to store.
+        """
+        if self.min_distance > 0:
+            self.bucket_Dict.setdefault(self.key(point), []).append(point)
+        return
+
+
+def place_indium_bumps(elements, coord1, coord2, step=100, min_distance_points=200, min_distance_polygons=20):
+    """
+    Arrange indium bumps on a grid within an area, greedily in grid order (x, then y).
+
+    A grid point is accepted if it is outside all polygons expanded by min_distance_polygons and
+    at least min_distance_points away from the bumps accepted before it.
+
+    Input:
+        elements: list, a list of polygon point arrays.
+        coord1: tuple, the starting coordinates of the area.
+        coord2: tuple, the ending coordinates of the area.
+        step: float, the spacing of the point grid.
+        min_distance_points: float, the minimum distance between indium bumps.
+        min_distance_polygons: float, the minimum distance between indium bumps and polygons.
+
+    Output:
+        indium_points: list, a list of positions where indium bumps are arranged.
+    """
+    x_min, y_min = min(coord1[0], coord2[0]), min(coord1[1], coord2[1])
+    x_max, y_max = max(coord1[0], coord2[0]), max(coord1[1], coord2[1])
+
+    grid_x = np.arange(x_min, x_max, step)
+    grid_y = np.arange(y_min, y_max, step)
+
+    expanded_polygons = expand_polygons(elements, min_distance_polygons)
+    mask = keep_out_mask(grid_x, grid_y, expanded_polygons)
+
+    indium_points = []
+    placed = SpatialHash(min_distance_points)
+    for ix, iy in zip(*np.nonzero(~mask)):  # Row-major order, the order of the grid scan
+        point = (grid_x[ix], grid_y[iy])
+        if placed.is_far(point):
+            indium_points.append(point)
+            placed.add(point)
+    return indium_points
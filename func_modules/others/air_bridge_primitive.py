@@ -2,6 +2,9 @@
 # Add air bridges for a specified path, supporting the arrangement of air bridges at path corners and middle sections, ensuring geometric conditions are met
 #######################################################################
 
+from func_modules.air_bridges import path_index
+
+
 def add_air_bridges(pos, bend_radius, spacing=120, chip_name="chip3"):
     """
     Add air bridges, supporting the arrangement at path corners and middle sections.
@@ -129,63 +132,6 @@ def add_air_bridges2(pos, bend_radius, spacing=120, chip_type="chip3", width=10,
     import numpy as np
     import math
     
-    def find_nearest_segment_center(polygons, curr_point, line_width):
-        """
-        Find the center of the segment closest to curr_point and adjust the center position according to the line width.
-
-        Input:
-            polygons: list, a list of polygon points for the path.
-            curr_point: tuple, the coordinates of the current reference point.
-            line_width: float, the width of the path.
-
-        Output:
-            nearest_center: tuple, the coordinates of the center of the nearest segment.
-        """
-        path_points = np.concatenate(polygons)  # Concatenate polygon point sets into a continuous path point array
-        curr_x, curr_y = curr_point
-
-        # Initialize minimum distance and nearest center point
-        min_distance = float('inf')
-        nearest_center = None
-
-        # Iterate over each segment of the path
-        for i in range(len(path_points) - 1):
-            # Calculate the endpoints of the segment
-            x1, y1 = path_points[i]
-            x2, y2 = path_points[i + 1]
-
-            # Calculate the direction vector and length of the segment
-            dx, dy = x2 - x1, y2 - y1
-            length = math.sqrt(dx**2 + dy**2)
-
-            # Unit direction vector
-            direction_x = dx / length
-            direction_y = dy / length
-
-            # Orthogonal direction vector (normal vector)
-            normal_x = -direction_y
-            normal_y = direction_x
-
-            # Calculate the center of the segment
-            center_x = (x1 + x2) / 2
-            center_y = (y1 + y2) / 2
-
-            # Adjust the center point according to the line width
-            adjusted_center_x = center_x + normal_x * (line_width / 2)
-            adjusted_center_y = center_y + normal_y * (line_width / 2)
-
-            # Calculate the distance from the adjusted center point to curr_point
-            distance = np.sqrt((adjusted_center_x - curr_x)**2 + (adjusted_center_y - curr_y)**2)
-
-            # Update the nearest center point
-            if distance < min_distance:
-                min_distance = distance
-                nearest_center = (adjusted_center_x, adjusted_center_y)
-
-        return nearest_center
-
-
-
     def adjust_air_bridge_position_for_bend(prev_point, curr_point, next_point, bend_radius, width):
         """
         Optimize the offset of the air bridge, accurately calculate the contact point between the rounded corner and the path, and dynamically adjust the correction factor.
@@ -210,7 +156,7 @@ def add_air_bridges2(pos, bend_radius, spacing=120, chip_type="chip3", width=10,
             bend_radius=bend_radius
         )
         polygons = path.to_polygonset().polygons  # Extract the polygon set
-        center_pos = find_nearest_segment_center(polygons, curr_point, width)
+        center_pos = path_index.nearest_segment_center(polygons, curr_point, width)
 
         # Vector calculation
         v1x, v1y = prev_point[0] - curr_point[0], prev_point[1] - curr_point[1]
@@ -234,46 +180,6 @@ def add_air_bridges2(pos, bend_radius, spacing=120, chip_type="chip3", width=10,
 
         return center_pos, rotation_angle + math.pi / 2  # Rotate 90 degrees clockwise
 
-    def is_point_in_flexpath(point, polygons, tolerance):
-        """
-        Check if a point is within the polygon range of the path, allowing a certain tolerance.
-
-        Input:
-            point: tuple, the coordinates of the point to check.
-            polygons: list, the polygon set of the path.
-            tolerance: float, the tolerance range.
-
-        Output:
-            bool, whether the point meets the range condition.
-        """
-        px, py = point
-
-        # Check if the point is strictly inside the polygon
-        for poly in polygons:
-            if gdspy.inside([point], [poly], short_circuit=True)[0]:
-                return True
-
-            # Check the shortest distance from the point to the polygon boundary
-            for i in range(len(poly)):
-                x1, y1 = poly[i - 1]
-                x2, y2 = poly[i]
-
-                # Calculate the shortest distance from the point to the segment
-                dx, dy = x2 - x1, y2 - y1
-                length_squared = dx**2 + dy**2
-                if length_squared == 0:
-                    distance = math.sqrt((px - x1)**2 + (py - y1)**2)
-                else:
-                    t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / length_squared))
-                    proj_x = x1 + t * dx
-                    proj_y = y1 + t * dy
-                    distance = math.sqrt((px - proj_x)**2 + (py - proj_y)**2)
-
-                if distance <= tolerance:
-                    return True
-
-        return False
-
     from addict import Dict
     options = Dict()
 
@@ -281,18 +187,20 @@ def add_air_bridges2(pos, bend_radius, spacing=120, chip_type="chip3", width=10,
     import gdspy
     path = gdspy.FlexPath(pos, width=width, corners="circular bend", bend_radius=bend_radius)
     polygons = path.to_polygonset().polygons
+    index = path_index.PathIndex(polygons)
+    tolerance = width / 2 + 5  # Add a 5-unit tolerance
+
+    # Adjust corner positions and rotation angles, and check them against the path in one batch
+    corner_list = [adjust_air_bridge_position_for_bend(pos[i - 1], pos[i], pos[i + 1], bend_radius, width)
+                   for i in range(1, len(pos) - 1)]
+    corner_inside = index.contains([adjusted_pos for adjusted_pos, _ in corner_list], tolerance)
 
     # Add air bridges at path corners
     for i in range(1, len(pos) - 1):
-        prev_point, curr_point, next_point = pos[i - 1], pos[i], pos[i + 1]
-
-        # Adjust corner position and rotation angle
-        adjusted_pos, rotation_angle = adjust_air_bridge_position_for_bend(
-            prev_point, curr_point, next_point, bend_radius, width
-        )
+        adjusted_pos, rotation_angle = corner_list[i - 1]
 
         # Check if the center point meets the range condition
-        if is_point_in_flexpath(adjusted_pos, polygons, width / 2 + 5):  # Add a 5-unit tolerance
+        if corner_inside[i - 1]:
             option = Dict(
                 name=f"air_bridge_pos_{i}",
                 type=air_bridge_type,
@@ -314,16 +222,18 @@ def add_air_bridges2(pos, bend_radius, spacing=120, chip_type="chip3", width=10,
         if path_length > 0:
             num_bridges = max(1, math.ceil(path_length / spacing))
 
+            # Interpolate to calculate the center positions of the air bridges
+            center_list = []
             for j in range(1, num_bridges + 1):
-                # Interpolate to calculate the center position of the air bridge
                 t = j / (num_bridges + 1)
-                center_x = (1 - t) * start[0] + t * end[0]
-                center_y = (1 - t) * start[1] + t * end[1]
+                center_list.append(((1 - t) * start[0] + t * end[0], (1 - t) * start[1] + t * end[1]))
+            center_inside = index.contains(center_list, tolerance)
 
-                center_pos = (center_x, center_y)
+            for j in range(1, num_bridges + 1):
+                center_pos = center_list[j - 1]
 
                 # Check if the center point meets the range condition
-                if is_point_in_flexpath(center_pos, polygons, width / 2 + 5):  # Add a 5-unit tolerance
+                if center_inside[j - 1]:
                     angle = math.atan2(path_vector[1], path_vector[0])
 
                     option = Dict(
@@ -153,6 +153,42 @@ class GeneTopoOps(BranchBase):
                              final_topo_path)
 
         return copy.deepcopy(topo_ops)
+
+    # qasm with GATS parameters (gats: Dict, see qasm_to_topo.GATS_OPS)
+    def gats__qasm_path(self, gene_ops):
+        return self._qasm_gats(gene_ops, None, None)
+
+    def gats__qasm_path__row(self, gene_ops):
+        return self._qasm_gats(gene_ops, gene_ops.row, None)
+
+    def col__gats__qasm_path(self, gene_ops):
+        return self._qasm_gats(gene_ops, None, gene_ops.col)
+
+    def col__gats__qasm_path__row(self, gene_ops):
+        return self._qasm_gats(gene_ops, gene_ops.row, gene_ops.col)
+
+    def col__files_path__gats__qasm_path__row(self, gene_ops):
+        return self._qasm_gats(gene_ops, gene_ops.row, gene_ops.col, gene_ops.files_path)
+
+    def _qasm_gats(self, gene_ops, row, col, files_path=None):
+        if files_path is None:
+            files_path = Dict(matrix_path="./qasm_relevant_files/matrix.png",
+                              topo_convergence_path="./qasm_relevant_files/topo_convergence.png",
+                              qubit_layout_path="./qasm_relevant_files/qubit_layout.png",
+                              topo_pruning_path="./qasm_relevant_files/topo_pruning.png",
+                              final_topo_path="./qasm_relevant_files/final_topo.png")
+
+        topo_ops = qasm.qasm(gene_ops.qasm_path,
+                             row,
+                             col,
+                             files_path.matrix_path,
+                             files_path.topo_convergence_path,
+                             files_path.qubit_layout_path,
+                             files_path.topo_pruning_path,
+                             files_path.final_topo_path,
+                             gene_ops.gats)
+
+        return copy.deepcopy(topo_ops)
     
     def num__shape(self, gene_ops):
         shape = gene_ops.shape
@@ -10,7 +10,8 @@ def qasm(qasm_path,
          topo_convergence_path,
          qubit_layout_path,
          topo_pruning_path,
-         final_topo_path):
+         final_topo_path,
+         gats_ops=None):
     
     topo_ops = qasm_to_topo.qasm_to_topo(qasm_path,
                                          row,
@@ -19,6 +20,7 @@ def qasm(qasm_path,
                                          topo_convergence_path,
                                          qubit_layout_path,
                                          topo_pruning_path,
-                                         final_topo_path)
+                                         final_topo_path,
+                                         gats_ops)
 
-    return copy.deepcopy(topo_ops)
\ No newline at end of file
+    return copy.deepcopy(topo_ops)
@@ -0,0 +1,223 @@
+import numpy as np
+import networkx as nx
+import os
+from concurrent.futures import ProcessPoolExecutor
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
+
+DISCONNECTED_FITNESS = 150000  # fitness of individuals whose layout or architecture is not connected
+
+_worker_engine = None  # FitnessEngine of a pool worker process
+
+
+def _init_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _evaluate_in_worker(individuals):
+    return [_worker_engine.individual_fitness(individual) for individual in individuals]
+
+
+class FitnessEngine:
+    """
+    Fitness evaluation of GATS individuals on a row x column grid.
+
+    The grid adjacency is built once; the distances between qubits are kept in an all-pairs matrix, computed with
+    scipy.sparse.csgraph and updated in place when the modification step adds edges. Fitness values are cached per
+    individual, and large batches of new individuals are evaluated in a process pool.
+    """
+
+    def __init__(self, M, row, column, processes=1, parallel_threshold=200):
+        """
+        Args:
+            M: Coupling Degree Matrix.
+            row: Number of rows of the grid.
+            column: Number of columns of the grid.
+            processes: Number of worker processes, 1 (default) to evaluate serially, None for the number of CPUs.
+            parallel_threshold: Minimum number of qubit pairs times new individuals to use the process pool.
+        """
+        self.M = np.asarray(M)
+        self.row = row
+        self.column = column
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.parallel_threshold = parallel_threshold
+        self.cache = dict()
+        self._pool = None
+
+        # Grid cell index = y*column + x, the index of the cell in the standard coordinates list.
+        # Neighbours keep the order of nx.grid_graph so the added shortest paths match networkx.
+        grid = nx.grid_graph(dim=[row, column], periodic=False)
+        self.neighbors = [None]*(row*column)
+        for (x, y), adj in grid.adjacency():
+            self.neighbors[y*column+x] = [v*column+u for u, v in adj]
+        self.cell_x = np.arange(row*column) % column
+        self.cell_y = np.arange(row*column) // column
+
+        # Coupled qubit pairs (i > j), in the order of the modification step
+        self.pair_i, self.pair_j = np.nonzero(np.tril(self.M != 0, k=-1))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['cache'] = dict()
+        state['_pool'] = None
+        return state
+
+    def close(self):
+        """
+        Shut down the process pool.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def grid_connected(self, cells, occupant):
+        """
+        Whether the grid cells used by the individual are connected.
+        """
+        seen = {cells[0]}
+        fringe = [cells[0]]
+        while fringe:
+            v = fringe.pop()
+            for w in self.neighbors[v]:
+                if occupant[w] >= 0 and w not in seen:
+                    seen.add(w)
+                    fringe.append(w)
+        return len(seen) == len(set(cells))
+
+    def grid_path(self, source, target, occupant):
+        """
+        Shortest path between two used grid cells through used cells, the path nx.shortest_path finds.
+        """
+        if source == target:
+            return [source]
+        pred = {source: None}
+        succ = {target: None}
+        forward_fringe = [source]
+        reverse_fringe = [target]
+        meet = None
+        while forward_fringe and reverse_fringe and meet is None:
+            if len(forward_fringe) <= len(reverse_fringe):
+                this_level, forward_fringe = forward_fringe, []
+                for v in this_level:
+                    for w in self.neighbors[v]:
+                        if occupant[w] < 0:
+                            continue
+                        if w not in pred:
+                            forward_fringe.append(w)
+                            pred[w] = v
+                        if w in succ:
+                            meet = w
+                            break
+                    if meet is not None:
+                        break
+            else:
+                this_level, reverse_fringe = reverse_fringe, []
+                for v in this_level:
+                    for w in self.neighbors[v]:
+                        if occupant[w] < 0:
+                            continue
+                        if w not in succ:
+                            succ[w] = v
+                            reverse_fringe.append(w)
+                        if w in pred:
+                            meet = w
+                            break
+                    if meet is not None:
+                        break
+        if meet is None:
+            return None
+        path = []
+        w = meet
+        while w is not None:
+            path.append(w)
+            w = pred[w]
+        path.reverse()
+        w = succ[path[-1]]
+        while w is not None:
+            path.append(w)
+            w = succ[w]
+        return path
+
+    def individual_fitness(self, individual):
+        """
+        Fitness of one individual, see GA_steps.get_DNA_fitness.
+
+        Args:
+            individual: Grid cell index of each qubit.
+
+        Return:
+            fitness: sum(dij*Mij) over the qubit pairs with dij > 1.
+        """
+        cells = [int(cell) for cell in individual]
+        q_num = len(cells)
+        occupant = np.full(self.row*self.column, -1, dtype=int)
+        occupant[cells] = np.arange(q_num)
+        if not self.grid_connected(cells, occupant):
+            return DISCONNECTED_FITNESS
+
+        x = self.cell_x[cells]
+        y = self.cell_y[cells]
+        manhattan = np.abs(x[:, None]-x[None, :]) + np.abs(y[:, None]-y[None, :])
+
+        # Pruning: coupled qubits on adjacent cells
+        pair_manhattan = manhattan[self.pair_i, self.pair_j]
+        adjacent = pair_manhattan == 1
+        adjacency = csr_matrix((np.ones(np.count_nonzero(adjacent)),
+                                (self.pair_i[adjacent], self.pair_j[adjacent])), shape=(q_num, q_num))
+        D = shortest_path(adjacency, directed=False, unweighted=True)
+
+        # Modify: add a grid shortest path for coupled qubits not at their Manhattan distance
+        start = 0
+        while start < len(self.pair_i):
+            mismatch = np.flatnonzero(D[self.pair_i[start:], self.pair_j[start:]] != pair_manhattan[start:])
+            if len(mismatch) == 0:
+                break
+            k = start + mismatch[0]
+            path = self.grid_path(cells[self.pair_i[k]], cells[self.pair_j[k]], occupant) or []
+            for a, b in zip(path[:-1], path[1:]):
+                qa, qb = occupant[a], occupant[b]
+                if D[qa, qb] != 1:
+                    D = np.minimum(D, np.minimum(D[:, [qa]] + 1 + D[[qb], :], D[:, [qb]] + 1 + D[[qa], :]))
+            start = k + 1
+
+        lower = np.tril_indices(q_num, k=-1)
+        d = D[lower]
+        if np.isinf(d).any():
+            return DISCONNECTED_FITNESS
+        far = d > 1
+        return int(np.sum(self.M[lower][far]*d[far].astype(np.int64)))
+
+    def population_fitness(self, pop):
+        """
+        Fitness of a population.
+
+        Args:
+            pop: population, grid cell indices of each individual.
+
+        Return:
+            fit: population fitness value, array of shape (len(pop), 1).
+        """
+        keys = [tuple(int(cell) for cell in individual) for individual in pop]
+        new_keys = list(dict.fromkeys(key for key in keys if key not in self.cache))
+        if new_keys:
+            if self.processes > 1 and len(new_keys)*len(self.pair_i) >= self.parallel_threshold:
+                values = self._evaluate_parallel(new_keys)
+            else:
+                values = [self.individual_fitness(key) for key in new_keys]
+            self.cache.update(zip(new_keys, values))
+        fit = np.zeros((len(pop), 1))
+        for i, key in enumerate(keys):
+            fit[i][0] = self.cache[key]
+        return fit
+
+    def _evaluate_parallel(self, keys):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                             initargs=(self,))
+        chunk_size = -(-len(keys) // self.processes)
+        chunks = [keys[i:i+chunk_size] for i in range(0, len(keys), chunk_size)]
+        values = []
+        for chunk_values in self._pool.map(_evaluate_in_worker, chunks):
+            values.extend(chunk_values)
+        return values
@@ -1,15 +1,16 @@
 from addict import Dict
 from qiskit import QuantumCircuit
-import os, xlrd, xlwt, math, itertools, random, toolbox, copy
+import os, xlrd, xlwt, math, itertools, random, toolbox, copy, pickle, time
 import numpy as np, networkx as nx, matplotlib.pyplot as plt, seaborn as sns
 from func_modules.topo.gene_topo_ops.qasm import GA_steps
 
-def generate_individual(Q_NUM,row,column):
+def generate_individual(Q_NUM,row,column,rng=random):
     """
         Generate individual.
 
         Args:
             Q_NUM(int): Qubit Number.
+            rng: random number generator (random.Random or the random module).
 
         Return:
             individual
@@ -19,7 +20,7 @@ def generate_individual(Q_NUM,row,column):
         print("Too few qubits number!")
         return
     else:
-        individual = random.sample(range(0,row*column),Q_NUM)
+        individual = rng.sample(range(0,row*column),Q_NUM)
     return individual
 
 def export_to_excel(best_pop_list,min_fitness_list,filepath):
@@ -116,13 +117,14 @@ def convert_format(pos, edge):
 
     return copy.deepcopy(new_pos1), copy.deepcopy(new_edge2)
 
-def get_coupling_degree_matrix(circuit,qp_name:str, matrix_path:str):
+def get_coupling_degree_matrix(circuit,qp_name:str, matrix_path:str, draw: bool = True):
     """
     Get coupling degree matrix M.
 
     Args:
         circuit(QuantumCircuit): Quantum circuit of the quantum program.
         qp_name(str): Name of the quantum program. 
+        draw(bool): Whether to save the heatmap of M to matrix_path.
 
     Return:
         Coupling Degree Matrix M
@@ -142,6 +144,8 @@ def get_coupling_degree_matrix(circuit,qp_name:str, matrix_path:str):
             x2 = item[1]
             M[x1][x2]=M[x1][x2]+1
             M[x2][x1]=M[x2][x1]+1
+    if not draw:
+        return M
     dpi =300
     fig = plt.figure(dpi=dpi,figsize=(25.6, 14.4))
     # Show coupling degree matrix M.
@@ -208,7 +212,175 @@ def processor_architecture_draw(processor_architecture_path,pos,edges):
     except:
         print("..")
 
-def PAD_GATS(topo_convergence_path,qp_name:str,M,path, row: int = None, col: int = None):
+# Default GATS parameters
+GATS_OPS = Dict(
+    pop_size=100,          # population size
+    n_generations=15,      # iterations
+    tournament_size=3,     # tournament selection
+    ts_length=None,        # tabu length, Q_NUM*(Q_NUM-1)/2 if None
+    seed=None,             # seed of the random number generator, the global random module if None
+    time_budget=None,      # stop after this many seconds, no limit if None
+    patience=None,         # stop after this many generations without improvement, no early stopping if None
+    checkpoint_path=None,  # file the search state is saved to after each generation
+    resume=False,          # continue from checkpoint_path if it exists
+    processes=1,           # worker processes of the fitness evaluation, 1 to evaluate serially, None for the number of CPUs
+    write_artifacts=True   # write the iteration results (.xls) and the figures
+)
+
+def save_checkpoint(checkpoint_path,state):
+    """
+       Save the search state, replacing the previous checkpoint only once the new one is written.
+    """
+    toolbox.jg_and_create_path(checkpoint_path)
+    tmp_path = checkpoint_path+".tmp"
+    with open(tmp_path,"wb") as f:
+        pickle.dump(state.to_dict(),f)
+    os.replace(tmp_path,checkpoint_path)
+    return
+
+def load_checkpoint(checkpoint_path,Q_NUM,row,column,pop_size):
+    """
+       Load a search state saved by save_checkpoint.
+    """
+    with open(checkpoint_path,"rb") as f:
+        state = Dict(pickle.load(f))
+    if (state.q_num,state.row,state.column,state.pop_size) != (Q_NUM,row,column,pop_size):
+        raise ValueError("Checkpoint {} was saved for {} qubits on a {}x{} grid with population {}, "
+                         "not {} qubits on a {}x{} grid with population {}!".format(
+                             checkpoint_path,state.q_num,state.row,state.column,state.pop_size,
+                             Q_NUM,row,column,pop_size))
+    return state
+
+def GATS_search(M,row,column,**gats_ops):
+    """
+    Search the qubit layout with the genetic algorithm and tabu search (GATS).
+
+    Args:
+        M: Coupling Degree Matrix.
+        row: Number of rows of the grid.
+        column: Number of columns of the grid.
+        gats_ops: GATS parameters, see GATS_OPS.
+
+    Return:
+        result: Dict with
+            best_pop: best individual, grid cell index of each qubit.
+            best_fit_list, best_pop_list: best fitness and individual after each generation.
+            generations: number of generations run, including those of a resumed checkpoint.
+            stop_reason: "generations", "patience" or "time_budget".
+    """
+    unknown = set(gats_ops.keys())-set(GATS_OPS.keys())
+    if unknown:
+        raise ValueError("Unknown GATS parameters {}!".format(sorted(unknown)))
+    ops = Dict(GATS_OPS)
+    ops.update(gats_ops)
+    start_time = time.time()
+    Q_NUM = len(M) # Qubit Number
+    POP_SIZE = ops.pop_size
+    TOURNAMENT_SIZE = ops.tournament_size
+    rng = random if ops.seed is None else random.Random(ops.seed)
+
+    # Tabu Search(TS) parameters
+    ts_length = Q_NUM*(Q_NUM-1)/2 if ops.ts_length is None else ops.ts_length # tabu length
+
+    standard_coordinate = generate_standard_coordinate(row,column)
+    # population fitness value, evaluated with a cache (and a process pool if ops.processes != 1) shared by all generations
+    engine = GA_steps.fitness.FitnessEngine(M,row,column,processes=ops.processes)
+    try:
+        if ops.resume and ops.checkpoint_path is not None and os.path.exists(ops.checkpoint_path):
+            state = load_checkpoint(ops.checkpoint_path,Q_NUM,row,column,POP_SIZE)
+            rng.setstate(state.rng_state)
+        else:
+            # Initialize population
+            pop = np.zeros((POP_SIZE,Q_NUM),dtype=int).tolist()
+            for i in range(POP_SIZE):
+                flag = True
+                while flag:
+                    temp_individual = generate_individual(Q_NUM,row,column,rng)
+                    if temp_individual not in pop:
+                        for j in range(Q_NUM):
+                            pop[i][j] = temp_individual[j]
+                        flag = False
+
+            fitness = GA_steps.get_fitness(pop,M,standard_coordinate,row,column,engine).tolist()
+
+            # Keep current optimal
+            best_fit = min(fitness)
+            best_pop = pop[fitness.index(best_fit)].copy()
+
+            state = Dict(q_num=Q_NUM, row=row, column=column, pop_size=POP_SIZE, population=pop, fitness=fitness,
+                         best_fit=best_fit, best_pop=best_pop,
+                         ts_list=[best_pop], ts_time=[ts_length], # Tabu
+                         best_fit_list=[best_fit[0]], best_pop_list=[best_pop],
+                         generations=1, stale=0)
+        pop, fitness = state.population, state.fitness
+        best_fit, best_pop = state.best_fit, state.best_pop
+        ts_list, ts_time = state.ts_list, state.ts_time
+
+        stop_reason = "generations"
+        while state.generations < ops.n_generations:
+            if ops.patience is not None and state.stale >= ops.patience:
+                stop_reason = "patience"
+                break
+            if ops.time_budget is not None and time.time()-start_time >= ops.time_budget:
+                stop_reason = "time_budget"
+                break
+
+            # select
+            pop1 = GA_steps.tournament_select(pop,POP_SIZE,fitness,TOURNAMENT_SIZE,rng)
+            pop2 = GA_steps.tournament_select(pop,POP_SIZE,fitness,TOURNAMENT_SIZE,rng)
+
+            # crossover
+            child_pops = GA_steps.crossover_GATS(POP_SIZE,pop1,pop2,ts_list,row,column,rng)
+            # mutate
+            child_pops = GA_steps.mutate_GATS(child_pops,ts_list,pop,row,column,rng)
+
+            child_fits = GA_steps.get_fitness(child_pops,M,standard_coordinate,row,column,engine)
+
+            # compete
+            for i in range(POP_SIZE):
+                if fitness[i] > child_fits[i]:
+                    fitness[i] = child_fits[i]
+                    pop[i] = child_pops[i].copy()
+
+            # update tabu list
+            ts_time = [x-1 for x in ts_time]
+            if 0 in ts_time:
+                ts_list.remove(ts_list[ts_time.index(0)])
+                ts_time.remove(0)
+
+            # update optimal
+            state.stale += 1
+            if best_fit>=min(fitness):
+                if best_fit>min(fitness):
+                    state.stale = 0
+                best_fit = min(fitness)
+                best_pop = pop[fitness.index(best_fit)]
+
+            # add tabu
+            ts_list.append(best_pop)
+            ts_time.append(ts_length)
+
+            state.best_fit_list.append(best_fit[0])
+            state.best_pop_list.append(best_pop)
+            state.generations += 1
+            # print('%d:optimal value %.1f' % (state.generations, best_fit[0]))
+
+            if ops.checkpoint_path is not None:
+                state.update(population=pop, fitness=fitness, best_fit=best_fit, best_pop=best_pop,
+                             ts_list=ts_list, ts_time=ts_time, rng_state=rng.getstate())
+                save_checkpoint(ops.checkpoint_path,state)
+    finally:
+        engine.close()
+
+    result = Dict()
+    result.best_pop = best_pop
+    result.best_fit_list = state.best_fit_list
+    result.best_pop_list = state.best_pop_list
+    result.generations = state.generations
+    result.stop_reason = stop_reason
+    return result
+
+def PAD_GATS(topo_convergence_path,qp_name:str,M,path, row: int = None, col: int = None, gats_ops=None):
     """
     Use GATS to get processor architecture.
 
@@ -216,32 +388,22 @@ def PAD_GATS(topo_convergence_path,qp_name:str,M,path, row: int = None, col: int
         qp_name(str): Name of the quantum program. 
         M: Coupling Degree Matrix.
         path: Store path of iteration results.
+        gats_ops: GATS parameters, see GATS_OPS.
 
     Return:
-        path: Path of processor architecture.
+        path: Path of processor architecture, None if the artifacts are not written.
+        row, column: Size of the grid.
+        standard_coordinate: Standard coordinates list.
+        best_pop: Best individual.
     """
 
     print("Genetic algorithm iteration...")
+    gats_ops = Dict() if gats_ops is None else Dict(gats_ops)
+    write_artifacts = gats_ops.get("write_artifacts", GATS_OPS.write_artifacts)
 
-    path = path+qp_name+'_GATS'+'.xls'
     Q_NUM=len(M) # Qubit Number
 
-    '''
-    # Create the activity adjacency matrix.
-    edge_matrix = M.copy()
-    '''
-
-    # Genetic Algorithm(GA) parameters
-    POP_SIZE = 100           # population size 
-    N_GENERATIONS = 15      # iterations
-    TOURNAMENT_SIZE = 3      # tournament selection
-
-    # Tabu Search(TS) parameters
-    ts_length = Q_NUM*(Q_NUM-1)/2  # tabu length
-    ts_list = []                   # tabu list
-    ts_time = []                   # tabu time
-
-    # Initialize population
+    # Grid size
     row = row
     column = col
     if row is None and col is None:
@@ -255,78 +417,20 @@ def PAD_GATS(topo_convergence_path,qp_name:str,M,path, row: int = None, col: int
         column = math.ceil(Q_NUM/row)
         print("The calculated number of rows is {}, and the number of columns is {}".format(row, column))
 
+    result = GATS_search(M,row,column,**gats_ops)
     standard_coordinate = generate_standard_coordinate(row,column)
-    pop = np.zeros((POP_SIZE,Q_NUM),dtype=int).tolist()
-    for i in range(POP_SIZE):
-        flag = True
-        while flag:
-            temp_individual = generate_individual(Q_NUM,row,column)
-            if temp_individual not in pop:
-                for j in range(Q_NUM):
-                    pop[i][j] = temp_individual[j]
-                flag = False
-
-    # population fitness value
-    fitness = np.zeros((POP_SIZE,1),dtype=float)
-    fitness = GA_steps.get_fitness(pop,M,standard_coordinate,row,column).tolist()
-
-    # Keep current optimal
-    best_fit = min(fitness)
-    best_pop = pop[fitness.index(best_fit)].copy()
-
-    # Tabu
-    ts_list.append(best_pop)
-    ts_time.append(ts_length)
-
-    best_fit_list = list()
-    best_fit_list.append(best_fit[0])
-
-    best_pop_list = list()
-    best_pop_list.append(best_pop)
-
-    for iteration in range(N_GENERATIONS-1):
-        # select
-        pop1 = GA_steps.tournament_select(pop,POP_SIZE,fitness,TOURNAMENT_SIZE)
-        pop2 = GA_steps.tournament_select(pop,POP_SIZE,fitness,TOURNAMENT_SIZE)
-
-        # crossover
-        child_pops = GA_steps.crossover_GATS(POP_SIZE,pop1,pop2,ts_list,row,column)
-        # mutate
-        child_pops = GA_steps.mutate_GATS(child_pops,ts_list,pop,row,column)
-
-        child_fits = [None]*POP_SIZE
-        child_fits = GA_steps.get_fitness(child_pops,M,standard_coordinate,row,column)
-
-        # compete
-        for i in range(POP_SIZE):
-            if fitness[i] > child_fits[i]:
-                fitness[i] = child_fits[i]
-                pop[i] = child_pops[i].copy()
-
-        # update tabu list
-        ts_time = [x-1 for x in ts_time]
-        if 0 in ts_time:
-            ts_list.remove(ts_list[ts_time.index(0)])
-            ts_time.remove(0)
-
-        # update optimal
-        if best_fit>=min(fitness):
-            best_fit = min(fitness)
-            best_pop = pop[fitness.index(best_fit)]
+    if result.stop_reason != "generations":
+        print("GATS stopped after {} generations ({})".format(result.generations, result.stop_reason))
 
-        # add tabu
-        ts_list.append(best_pop)
-        ts_time.append(ts_length)
+    if not write_artifacts:
+        return None,row,column,standard_coordinate,result.best_pop
 
-        best_fit_list.append(best_fit[0])
-        best_pop_list.append(best_pop)
-        # print('%d:optimal value %.1f' % (iteration+2, best_fit[0]))
-
-    export_to_excel(best_pop_list,best_fit_list,path)
+    path = path+qp_name+'_GATS'+'.xls'
+    export_to_excel(result.best_pop_list,result.best_fit_list,path)
 
     # show convergence
-    abscissa = np.arange(1,N_GENERATIONS+1)
-    l1,= plt.plot(abscissa,best_fit_list,color='r',marker='o')
+    abscissa = np.arange(1,len(result.best_fit_list)+1)
+    l1,= plt.plot(abscissa,result.best_fit_list,color='r',marker='o')
     plt.xlabel("number of iterations")
     plt.ylabel("fitness")
     plt.legend(handles=[l1,],labels=['GATS',],loc=1)
@@ -336,7 +440,7 @@ def PAD_GATS(topo_convergence_path,qp_name:str,M,path, row: int = None, col: int
     plt.clf()
     print("The convergence result of fitness is saved in {}".format(topo_convergence_path))
 
-    return path,row,column,standard_coordinate 
+    return path,row,column,standard_coordinate,result.best_pop
 
 def qasm_to_topo(qasm_path,
                  row,
@@ -345,10 +449,15 @@ def qasm_to_topo(qasm_path,
                  topo_convergence_path,
                  qubit_layout_path,
                  topo_pruning_path,
-                 final_topo_path):
+                 final_topo_path,
+                 gats_ops=None):
     """
     Get processor architecture.
 
+    Args:
+        gats_ops: GATS parameters, see GATS_OPS. The figures and the iteration results are not written if
+                  gats_ops.write_artifacts is False.
+
     Return:
         pos, actual_edge2: layout and connections of processor architecture.
     """
@@ -361,23 +470,17 @@ def qasm_to_topo(qasm_path,
     # Using qiskit to construct quantum circuit.
     circuit=QuantumCircuit.from_qasm_str(code)
     file_name, file_extension = toolbox.get_file_name_from_path(qasm_path)
+    gats_ops = Dict() if gats_ops is None else Dict(gats_ops)
+    write_artifacts = gats_ops.get("write_artifacts", GATS_OPS.write_artifacts)
     # Build coupling degree matrix M.
-    M = get_coupling_degree_matrix(circuit, file_name, matrix_path)
+    M = get_coupling_degree_matrix(circuit, file_name, matrix_path, write_artifacts)
     # Store path of iteration results
-    if not os.path.exists('./excel'):
-        os.makedirs('./excel')
     path_excel='./excel/'
+    if write_artifacts and not os.path.exists('./excel'):
+        os.makedirs('./excel')
 
     # Processor Architecture Design
-    path_of_architecture_result,row,col,standard_coordinate  = PAD_GATS(topo_convergence_path,file_name,M,path_excel, row, col)
-
-    # show processor architecture
-    workbook = xlrd.open_workbook(path_of_architecture_result)
-    sheet1 = workbook.sheet_by_index(0)
-    num=sheet1.nrows-1
-    example=sheet1.cell(num,0).value
-    # position = [int(example[i]) for i in range(len(example)) if example[i] not in ['[', ']', ',', ' ']]
-    position=eval(example)
+    path_of_architecture_result,row,col,standard_coordinate,position = PAD_GATS(topo_convergence_path,file_name,M,path_excel, row, col, gats_ops)
     Q_NUM = len(M)
     DNA = np.zeros((Q_NUM*2),dtype=int)
     for i in range(len(position)):
@@ -432,14 +535,15 @@ def qasm_to_topo(qasm_path,
                         actual_edge2[pos_q[a_path[k]]][pos_q[a_path[k+1]]]=1
                         actual_edge2[pos_q[a_path[k+1]]][pos_q[a_path[k]]]=1
 
-    processor_architecture_qubits_pos_draw(qubit_layout_path,q_pos)
-    plt.clf()
+    if write_artifacts:
+        processor_architecture_qubits_pos_draw(qubit_layout_path,q_pos)
+        plt.clf()
 
-    processor_architecture_draw(topo_pruning_path,q_pos,actual_edge1)
-    plt.clf()
+        processor_architecture_draw(topo_pruning_path,q_pos,actual_edge1)
+        plt.clf()
 
-    processor_architecture_draw(final_topo_path,q_pos,actual_edge2)
-    plt.clf()
+        processor_architecture_draw(final_topo_path,q_pos,actual_edge2)
+        plt.clf()
 
     # Interface with the new architecture
 
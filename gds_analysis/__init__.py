@@ -17,7 +17,7 @@ def read_single_component(filepath: str, location: str):
 
     # Create class content
     class_definition = f"""
-import gdspy, copy
+import gdspy, copy, toolbox
 from addict import Dict
 import math as mt
 from base.library_base import LibraryBase
@@ -59,20 +59,11 @@ class {class_name}(LibraryBase):
             self.cell.add(gdspy.Polygon(polygon_points, layer=layer))
 
     def _calculate_bounding_box(self):
-        min_x, min_y = float("inf"), float("inf")
-        max_x, max_y = float("-inf"), float("-inf")
-
-        for polygon in self.cell.polygons:
-            bbox = polygon.get_bounding_box()
-            if bbox is not None:
-                min_x = min(min_x, bbox[0][0])
-                min_y = min(min_y, bbox[0][1])
-                max_x = max(max_x, bbox[1][0])
-                max_y = max(max_y, bbox[1][1])
-
-        if min_x == float("inf") or min_y == float("inf"):
+        bbox = toolbox.get_polygons_bounding_box(self.cell.polygons)
+        if bbox is None:
             raise ValueError("No valid polygons found in the cell.")
 
+        (min_x, min_y), (max_x, max_y) = bbox
         return min_x, min_y, max_x, max_y
 
     def _transform_polygons(self, dx, dy, rotation, center):
@@ -19,7 +19,7 @@ def generate_python_class_from_gds(filepath: str, location: str):
 
     # Create class content
     class_definition = f"""
-import gdspy, copy
+import gdspy, copy, toolbox
 from addict import Dict
 import math as mt
 from base.library_base import LibraryBase
@@ -67,20 +67,11 @@ class {class_name}(LibraryBase):
 
 
     def _calculate_bounding_box(self):
-        min_x, min_y = float("inf"), float("inf")
-        max_x, max_y = float("-inf"), float("-inf")
-
-        for polygon in self.cell.polygons:
-            bbox = polygon.get_bounding_box()
-            if bbox is not None:
-                min_x = min(min_x, bbox[0][0])
-                min_y = min(min_y, bbox[0][1])
-                max_x = max(max_x, bbox[1][0])
-                max_y = max(max_y, bbox[1][1])
-
-        if min_x == float("inf") or min_y == float("inf"):
+        bbox = toolbox.get_polygons_bounding_box(self.cell.polygons)
+        if bbox is None:
             raise ValueError("No valid polygons found in the cell.")
 
+        (min_x, min_y), (max_x, max_y) = bbox
         return min_x, min_y, max_x, max_y
 
     def _transform_polygons(self, dx, dy, rotation, center):
@@ -308,7 +299,7 @@ def generate_python_class_from_layout(arr, location: str, name: str):
 
     # Create class content
     class_definition = f"""
-import gdspy, copy
+import gdspy, copy, toolbox
 from addict import Dict
 import math as mt
 from base.library_base import LibraryBase
@@ -344,20 +335,11 @@ class {class_name}(LibraryBase):
 
 
     def _calculate_bounding_box(self):
-        min_x, min_y = float("inf"), float("inf")
-        max_x, max_y = float("-inf"), float("-inf")
-
-        for polygon in self.cell.polygons:
-            bbox = polygon.get_bounding_box()
-            if bbox is not None:
-                min_x = min(min_x, bbox[0][0])
-                min_y = min(min_y, bbox[0][1])
-                max_x = max(max_x, bbox[1][0])
-                max_y = max(max_y, bbox[1][1])
-
-        if min_x == float("inf") or min_y == float("inf"):
+        bbox = toolbox.get_polygons_bounding_box(self.cell.polygons)
+        if bbox is None:
             raise ValueError("No valid polygons found in the cell.")
 
+        (min_x, min_y), (max_x, max_y) = bbox
         return min_x, min_y, max_x, max_y
 
     def _transform_polygons(self, dx, dy, rotation, center):
@@ -28,6 +28,10 @@ class AirBridge(LibraryBase):
         rotation=0
     )
 
+    # Geometry is translated by center_pos and rotated by rotation, so identical instances can share a master cell
+    instance_pos_key = "center_pos"
+    instance_rotation_key = "rotation"
+
     def __init__(self, options: Dict = None):
         """
         Initializes the AirBridge class.
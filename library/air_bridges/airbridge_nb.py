@@ -2,7 +2,7 @@
 # File Name: airbridge_nb.py
 # Description: This file primarily contains the construction code for the AirbridgeNb (air bridge without base).
 ############################################################################################
-import gdspy, copy
+import gdspy, copy, toolbox
 from addict import Dict
 import math as mt
 from base.library_base import LibraryBase
@@ -24,6 +24,10 @@ class AirbridgeNb(LibraryBase):
         rotation=0
     )
 
+    # Geometry is translated by gds_pos and rotated by rotation, so identical instances can share a master cell
+    instance_pos_key = "gds_pos"
+    instance_rotation_key = "rotation"
+
     def __init__(self, options: Dict=None):
         """
         Initializes the AirbridgeNb class.
@@ -64,20 +68,11 @@ class AirbridgeNb(LibraryBase):
         Output:
             Coordinates of the bounding box (min_x, min_y, max_x, max_y).
         """
-        min_x, min_y = float("inf"), float("inf")
-        max_x, max_y = float("-inf"), float("-inf")
-
-        for polygon in self.cell.polygons:
-            bbox = polygon.get_bounding_box()
-            if bbox is not None:
-                min_x = min(min_x, bbox[0][0])
-                min_y = min(min_y, bbox[0][1])
-                max_x = max(max_x, bbox[1][0])
-                max_y = max(max_y, bbox[1][1])
-
-        if min_x == float("inf") or min_y == float("inf"):
+        bbox = toolbox.get_polygons_bounding_box(self.cell.polygons)
+        if bbox is None:
             raise ValueError("No valid polygons found in the cell.")
 
+        (min_x, min_y), (max_x, max_y) = bbox
         return min_x, min_y, max_x, max_y
 
     def _transform_polygons(self, dx, dy, rotation, center):
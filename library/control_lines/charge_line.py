@@ -70,10 +70,12 @@ class ChargeLine(LibraryBase):
         control_L_out = gdspy.FlexPath(self.pos, self.width + self.gap * 2, corners="circular bend", bend_radius=corner_radius).to_polygonset()
         self.cell_extract.add(control_L_out)
 
-        d = math.sqrt((self.pos[-1][1] - self.pos[-2][1])**2 + (self.pos[-1][0] - self.pos[-2][0])**2)
-        self.pos[-1] = (self.pos[-1][0] - (self.pad_height / d) * (self.pos[-1][0] - self.pos[-2][0]), self.pos[-1][1] - (self.pad_height / d) * (self.pos[-1][1] - self.pos[-2][1]))
+        # Shorten a local copy of the path so that the pos parameter is not modified by drawing
+        pos = list(self.pos)
+        d = math.sqrt((pos[-1][1] - pos[-2][1])**2 + (pos[-1][0] - pos[-2][0])**2)
+        pos[-1] = (pos[-1][0] - (self.pad_height / d) * (pos[-1][0] - pos[-2][0]), pos[-1][1] - (self.pad_height / d) * (pos[-1][1] - pos[-2][1]))
 
-        control_L_inner = gdspy.FlexPath(self.pos, self.width, corners="circular bend", bend_radius=corner_radius).to_polygonset()
+        control_L_inner = gdspy.FlexPath(pos, self.width, corners="circular bend", bend_radius=corner_radius).to_polygonset()
         self.cell_subtract.add(control_L_inner)
 
         pad = gdspy.boolean(self.cell_extract, self.cell_subtract, "not")
@@ -21,6 +21,9 @@ class IndiumBump(LibraryBase):
         radius=10
     )
 
+    # Geometry is translated by center_pos, so identical instances can share a master cell
+    instance_pos_key = "center_pos"
+
     def __init__(self, options: Dict = None):
         """
         Initializes an instance of the IndiumBump class.
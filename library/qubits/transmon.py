@@ -36,6 +36,9 @@ class Transmon(LibraryBase):
         subtract_height = 600
     )
 
+    # Geometry is translated by gds_pos, so identical instances can share a master cell
+    instance_pos_key = "gds_pos"
+
     def __init__(self, options):
         """
         Initializes the Transmon class.
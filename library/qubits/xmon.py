@@ -31,6 +31,9 @@ class Xmon(LibraryBase):
         claw_width = 10,
         claw_gap = 6
     )
+
+    # Geometry is translated by gds_pos, so identical instances can share a master cell
+    instance_pos_key = "gds_pos"
     
     def __init__(self, options = Dict()):
         """
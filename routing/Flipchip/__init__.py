@@ -9,6 +9,8 @@ from routing.Flipchip import control_lines
 from routing.Flipchip import pins
 from routing.Flipchip import transmission_lines
 from routing.Flipchip import calc_chip_size
+from routing.Flipchip import routing_context
+from routing.Flipchip.routing_context import RoutingContext
 import copy
 import toolbox
 import func_modules
@@ -34,25 +36,30 @@ def flipchip_routing(qubits_ops, rdls_ops, chip_ops, pins_type, tmls_type, ctls_
         ctls_ops: Dictionary containing control line operation parameters.
         new_chip_ops: Dictionary containing updated chip operation parameters.
     """
+    # Convert the qubits and index the readout lines once for all generators
+    context = RoutingContext(convert_qubits_ops_format(qubits_ops, rdls_ops), copy.deepcopy(rdls_ops))
     # Generate pin operation parameters and update chip operation parameters
     pins_ops, new_chip_ops = generate_pins(qubits_ops=qubits_ops,
                                            rdls_ops=rdls_ops,
                                            chip_ops=chip_ops,
                                            pins_type=pins_type,
-                                           pins_geometric_ops=pins_geometric_ops)
+                                           pins_geometric_ops=pins_geometric_ops,
+                                           context=context)
     # Generate transmission line operation parameters
     tmls_ops = generate_transmission_lines(qubits_ops=qubits_ops,
                                            rdls_ops=rdls_ops,
                                            chip_ops=new_chip_ops,
                                            pins_ops=pins_ops,
-                                           tmls_type=tmls_type)
+                                           tmls_type=tmls_type,
+                                           context=context)
     # Generate control line operation parameters
     ctls_ops = generate_control_lines(qubits_ops=qubits_ops,
                                       rdls_ops=rdls_ops,
                                       chip_ops=new_chip_ops,
                                       pins_ops=pins_ops,
-                                      ctls_type=ctls_type)
-    return copy.deepcopy(pins_ops), copy.deepcopy(tmls_ops), copy.deepcopy(ctls_ops), copy.deepcopy(new_chip_ops)
+                                      ctls_type=ctls_type,
+                                      context=context)
+    return pins_ops, tmls_ops, ctls_ops, new_chip_ops  # New options from the generators, not copied again
 
 
 def calculate_chip_size(qubits_ops, rdls_ops, pins_geometric_ops):
@@ -72,7 +79,7 @@ def calculate_chip_size(qubits_ops, rdls_ops, pins_geometric_ops):
     return copy.deepcopy(start_pos), copy.deepcopy(end_pos)
 
 
-def generate_pins(qubits_ops, rdls_ops, chip_ops, pins_type, pins_geometric_ops):
+def generate_pins(qubits_ops, rdls_ops, chip_ops, pins_type, pins_geometric_ops, context=None):
     """
     Function to generate pin operation parameters.
 
@@ -82,28 +89,31 @@ def generate_pins(qubits_ops, rdls_ops, chip_ops, pins_type, pins_geometric_ops)
         chip_ops: Dictionary describing chip operation parameters.
         pins_type: String specifying the type of pins.
         pins_geometric_ops: Dictionary describing geometric operation parameters for pins.
+        context: RoutingContext built from the converted qubits_ops and rdls_ops, shared by the generators. Built here if None.
 
     Returns:
         pins_ops: Dictionary containing pin operation parameters.
         chip_ops: Dictionary containing updated chip operation parameters.
     """
-    qubits_ops = copy.deepcopy(qubits_ops)
-    rdls_ops = copy.deepcopy(rdls_ops)
     chip_ops = copy.deepcopy(chip_ops)
     pins_geometric_ops = copy.deepcopy(pins_geometric_ops)
 
-    qubits_ops = convert_qubits_ops_format(qubits_ops, rdls_ops)
+    if context is None:
+        context = RoutingContext(convert_qubits_ops_format(qubits_ops, rdls_ops), copy.deepcopy(rdls_ops))
+    qubits_ops = context.qubits
+    rdls_ops = context.readout_lines
 
     pins_ops, chip_ops = pins.generate_pins(qubits=qubits_ops,
                                             readout_lines=rdls_ops,
                                             chip=chip_ops,
-                                            pins_geometric_ops=pins_geometric_ops)
+                                            pins_geometric_ops=pins_geometric_ops,
+                                            context=context)
     pins_ops = func_modules.pins.set_types(pins_ops, pins_type=pins_type)
     pins_ops = func_modules.pins.set_chips(pins_ops, chip_name=chip_ops.name)
     return copy.deepcopy(pins_ops), copy.deepcopy(chip_ops)
 
 
-def generate_control_lines(qubits_ops, rdls_ops, pins_ops, chip_ops, ctls_type):
+def generate_control_lines(qubits_ops, rdls_ops, pins_ops, chip_ops, ctls_type, context=None):
     """
     Function to generate control line operation parameters.
 
@@ -113,27 +123,30 @@ def generate_control_lines(qubits_ops, rdls_ops, pins_ops, chip_ops, ctls_type):
         pins_ops: Dictionary containing pin operation parameters.
         chip_ops: Dictionary describing chip operation parameters.
         ctls_type: String specifying the type of control lines.
+        context: RoutingContext built from the converted qubits_ops and rdls_ops, shared by the generators. Built here if None.
 
     Returns:
         ctls_ops: Dictionary containing control line operation parameters.
     """
-    qubits_ops = copy.deepcopy(qubits_ops)
-    rdls_ops = copy.deepcopy(rdls_ops)
     pins_ops = copy.deepcopy(pins_ops)
     chip_ops = copy.deepcopy(chip_ops)
 
-    qubits_ops = convert_qubits_ops_format(qubits_ops, rdls_ops)
+    if context is None:
+        context = RoutingContext(convert_qubits_ops_format(qubits_ops, rdls_ops), copy.deepcopy(rdls_ops))
+    qubits_ops = context.qubits
+    rdls_ops = context.readout_lines
 
     ctls_ops = control_lines.generate_control_lines(qubits=qubits_ops,
                                                     readout_lines=rdls_ops,
                                                     pins=pins_ops,
-                                                    chip=chip_ops)
+                                                    chip=chip_ops,
+                                                    context=context)
     ctls_ops = func_modules.ctls.set_types(ctls_ops=ctls_ops, ctls_type=ctls_type)
     ctls_ops = func_modules.ctls.set_chips(ctls_ops=ctls_ops, chip_name=chip_ops.name)
     return copy.deepcopy(ctls_ops)
 
 
-def generate_transmission_lines(qubits_ops, rdls_ops, chip_ops, pins_ops, tmls_type):
+def generate_transmission_lines(qubits_ops, rdls_ops, chip_ops, pins_ops, tmls_type, context=None):
     """
     Function to generate transmission line operation parameters.
 
@@ -143,21 +156,24 @@ def generate_transmission_lines(qubits_ops, rdls_ops, chip_ops, pins_ops, tmls_t
         chip_ops: Dictionary describing chip operation parameters.
         pins_ops: Dictionary containing pin operation parameters.
         tmls_type: String specifying the type of transmission lines.
+        context: RoutingContext built from the converted qubits_ops and rdls_ops, shared by the generators. Built here if None.
 
     Returns:
         tmls_ops: Dictionary containing transmission line operation parameters.
     """
-    qubits_ops = copy.deepcopy(qubits_ops)
-    rdls_ops = copy.deepcopy(rdls_ops)
     chip_ops = copy.deepcopy(chip_ops)
     pins_ops = copy.deepcopy(pins_ops)
 
-    qubits_ops = convert_qubits_ops_format(qubits_ops, rdls_ops)
+    if context is None:
+        context = RoutingContext(convert_qubits_ops_format(qubits_ops, rdls_ops), copy.deepcopy(rdls_ops))
+    qubits_ops = context.qubits
+    rdls_ops = context.readout_lines
 
     tmls_ops = transmission_lines.generate_transmission_lines(qubits=qubits_ops,
                                                               readout_lines=rdls_ops,
                                                               pins=pins_ops,
-                                                              chip=chip_ops)
+                                                              chip=chip_ops,
+                                                              context=context)
     tmls_ops = func_modules.tmls.set_types(tmls_ops=tmls_ops, tmls_type=tmls_type)
     tmls_ops = func_modules.tmls.set_chips(tmls_ops=tmls_ops, chip_name=chip_ops.name)
     return copy.deepcopy(tmls_ops)
@@ -175,6 +191,7 @@ def convert_qubits_ops_format(qubits_ops, rdls_ops):
         qubits_ops: Dictionary containing converted qubit operation parameters.
     """
     qubits_ops = copy.deepcopy(qubits_ops)
+    rdl_names = routing_context.map_rdl_names(qubits_ops, rdls_ops)
     for q_name, q_ops in qubits_ops.items():
         coupling_pins = Dict()
         coupling_pins.top = toolbox.find_topmost_coordinate(list(q_ops.control_pins))
@@ -183,7 +200,7 @@ def convert_qubits_ops_format(qubits_ops, rdls_ops):
         coupling_pins.right = toolbox.find_rightmost_coordinate(list(q_ops.control_pins))
         control_pins = [q_ops.control_pins[0]]
 
-        readout_line = func_modules.rdls.find_rdl_name(rdls_ops, q_ops)
+        readout_line = rdl_names[q_name]
 
         coupling_qubits = Dict()
         coupling_qubits.top = None
@@ -10,12 +10,13 @@ import math
 import re
 import copy
 import func_modules
+from routing.Flipchip.routing_context import RoutingContext
 
 gap = 100
 
 
 # Return the maximum and minimum y-coordinates of the end_pos of the readout lines in the i-th row
-def boundary_readout_line_pos(i, readout_lines, qubits):
+def boundary_readout_line_pos(i, readout_lines, qubits, context=None):
     """
     Return the maximum and minimum y-coordinates of the end_pos of the readout lines in the i-th row.
 
@@ -23,42 +24,19 @@ def boundary_readout_line_pos(i, readout_lines, qubits):
         i: Integer, row number.
         readout_lines: Dictionary describing readout line operation parameters.
         qubits: Dictionary describing qubit operation parameters.
+        context: RoutingContext describing shared lookups of the routing, built from qubits and readout_lines if None.
 
     Returns:
         max_y: Float, maximum y-coordinate value.
         min_y: Float, minimum y-coordinate value.
     """
-    # Initialize a dictionary to store the readout lines in the i-th row
-    line_in_row = {}
-
-    # Iterate through readout_lines to determine which readout lines are in the i-th row
-    for line_name, line_info in readout_lines.items():
-        qubit_name = func_modules.qubits.find_qname_from_rdl_ops(rdl_ops=line_info, qubits_ops=qubits)
-        qubit_info = qubits.get(qubit_name)
-
-        # Ensure qubit_info is not empty and its topo_pos row coordinate matches i
-        if qubit_info and qubit_info['topo_pos'][1] == i:
-            line_in_row[line_name] = line_info
-
-    # Check if there are any readout lines in the i-th row
-    if not line_in_row:
-        return None
-
-    # Initialize maximum and minimum y-coordinate values
-    max_y = float('-inf')
-    min_y = float('inf')
-
-    # Iterate through the readout lines in the i-th row and update the maximum and minimum y-coordinate values
-    for line_name, line_info in line_in_row.items():
-        end_pos_y = line_info['end_pos'][1]
-        max_y = max(max_y, end_pos_y)
-        min_y = min(min_y, end_pos_y)
-
-    return max_y, min_y
+    if context is None:
+        context = RoutingContext(qubits, readout_lines)
+    return context.readout_line_pos(i)
 
 
 # Return the maximum and minimum space values of the readout lines in the i-th row
-def boundary_readout_line_space(i, readout_lines, qubits):
+def boundary_readout_line_space(i, readout_lines, qubits, context=None):
     """
     Return the maximum and minimum space values of the readout lines in the i-th row.
 
@@ -66,47 +44,25 @@ def boundary_readout_line_space(i, readout_lines, qubits):
         i: Integer, row number.
         readout_lines: Dictionary describing readout line operation parameters.
         qubits: Dictionary describing qubit operation parameters.
+        context: RoutingContext describing shared lookups of the routing, built from qubits and readout_lines if None.
 
     Returns:
         max_space: Float, maximum space value.
         min_space: Float, minimum space value.
     """
-    # Initialize a dictionary to store the readout lines in the i-th row
-    line_in_row = {}
-
-    # Iterate through readout_lines to determine which readout lines are in the i-th row
-    for line_name, line_info in readout_lines.items():
-        qubit_name = func_modules.qubits.find_qname_from_rdl_ops(rdl_ops=line_info, qubits_ops=qubits)
-        qubit_info = qubits.get(qubit_name)
-
-        # Ensure qubit_info is not empty and its topo_pos row coordinate matches i
-        if qubit_info and qubit_info['topo_pos'][1] == i:
-            line_in_row[line_name] = line_info
-
-    # Check if there are any readout lines in the i-th row
-    if not line_in_row:
-        return None
-
-    # Initialize maximum and minimum space values
-    max_space = float('-inf')
-    min_space = float('inf')
-
-    # Iterate through the readout lines in the i-th row and update the maximum and minimum space values
-    for line_name, line_info in line_in_row.items():
-        space = line_info['space']
-        max_space = max(max_space, space)
-        min_space = min(min_space, space)
-
-    return max_space, min_space
+    if context is None:
+        context = RoutingContext(qubits, readout_lines)
+    return context.readout_line_space(i)
 
 
 # Return the coordinates of the outermost qubits on the top, bottom, left, and right
-def boundary_qubit_pos(qubits):
+def boundary_qubit_pos(qubits, context=None):
     """
     Return the coordinates of the outermost qubits on the top, bottom, left, and right.
 
     Args:
         qubits: Dictionary describing qubit operation parameters.
+        context: RoutingContext describing shared lookups of the routing, built from qubits if None.
 
     Returns:
         x_left: Float, x-coordinate of the leftmost qubit.
@@ -114,43 +70,28 @@ def boundary_qubit_pos(qubits):
         y_upper: Float, y-coordinate of the topmost qubit.
         y_lower: Float, y-coordinate of the bottommost qubit.
     """
-    qubits = copy.deepcopy(qubits)
-    gds_positions = [qubit["gds_pos"] for qubit in qubits.values()]
-    x_left, x_right = min([x for x, y in gds_positions]), max([x for x, y in gds_positions])
-    y_upper, y_lower = max([y for x, y in gds_positions]), min([y for x, y in gds_positions])
-    return x_left, x_right, y_upper, y_lower
+    if context is None:
+        context = RoutingContext(qubits, Dict())
+    return context.qubit_pos()
 
 
 # Return the maximum and minimum x-coordinates of the qubit outlines in the i-th column
-def boundary_qubits_outline(i, qubits):
+def boundary_qubits_outline(i, qubits, context=None):
     """
     Return the maximum and minimum x-coordinates of the qubit outlines in the i-th column.
 
     Args:
         i: Integer, column number.
         qubits: Dictionary describing qubit operation parameters.
+        context: RoutingContext describing shared lookups of the routing, built from qubits if None.
 
     Returns:
         max_x: Float, maximum x-coordinate.
         min_x: Float, minimum x-coordinate.
     """
-    min_x = float('inf')
-    max_x = float('-inf')
-
-    for qubit in qubits.values():
-        if qubit['topo_pos'][0] == i:  # Check if it is in the i-th column
-            # Process each qubit's coupling_qubits
-            for key, coupling_qubit in qubit['coupling_pins'].items():
-                if coupling_qubit:  # Ensure coupling_qubit is not null
-                    x = coupling_qubit[0]
-                    min_x = min(min_x, x)
-                    max_x = max(max_x, x)
-
-    # Return None if no qubits are found in the i-th column
-    if min_x == float('inf') or max_x == float('-inf'):
-        return None
-
-    return max_x + 100, min_x - 100
+    if context is None:
+        context = RoutingContext(qubits, Dict())
+    return context.qubits_outline(i)
 
 
 # Create an alternating sequence
@@ -517,17 +458,21 @@ def calculate_start_straight_point_coordinates(pins, num, control_indices, direc
     return coordinates_dict
 
 
-def get_qubits_in_line(line, qubits):
+def get_qubits_in_line(line, qubits, context=None):
     """
     Get the qubits names that match the line number.
 
     Args:
         line: Integer, line number.
         qubits: Dictionary, qubit operation parameters.
+        context: RoutingContext, shared lookups of the routing, the qubits are scanned if None.
 
     Returns:
         qubits_in_line: List, qubits names that match the line number.
     """
+    if context is not None:
+        return context.qubits_in_row(line)
+
     # Store qubits names that match the line number
     qubits_in_line = []
 
@@ -812,7 +757,7 @@ def get_boundary_end_points(end_straight_points, qubits_left_x, qubits_right_x,
 
 
 # Generate control lines
-def generate_control_lines(qubits, readout_lines, pins, chip):
+def generate_control_lines(qubits, readout_lines, pins, chip, context=None):
     """
     Generate control lines.
 
@@ -821,6 +766,7 @@ def generate_control_lines(qubits, readout_lines, pins, chip):
         readout_lines: Dictionary, readout line operation parameters.
         pins: Dictionary, pin information.
         chip: Dictionary, chip information.
+        context: RoutingContext, shared lookups of the routing, built from the qubits and readout lines if None.
 
     Returns:
         control_lines: Dictionary, control line information.
@@ -829,6 +775,8 @@ def generate_control_lines(qubits, readout_lines, pins, chip):
     readout_lines = copy.deepcopy(readout_lines)
     pins = copy.deepcopy(pins)
     chip = copy.deepcopy(chip)
+    if context is None:
+        context = RoutingContext(qubits, readout_lines)
 
     # import toolbox
     # toolbox.show_options(pins)
@@ -853,19 +801,19 @@ def generate_control_lines(qubits, readout_lines, pins, chip):
         max_x = max(max_x, coords[0])
         max_y = max(max_y, coords[1])
     # Get the boundary coordinates of qubit positions
-    x_left, x_right, y_upper, y_lower = boundary_qubit_pos(qubits)
+    x_left, x_right, y_upper, y_lower = boundary_qubit_pos(qubits, context=context)
 
     # Number of pins on the top, bottom, left, and right
     upper_num, lower_num, left_num, right_num, row_distribution = pin_nums(max_y + 1, max_x + 1)
     # print('row_distribution',row_distribution)
 
     # Highest coordinate and space of the readout lines
-    readout_end_y = boundary_readout_line_pos(max_y, readout_lines, qubits)[0]
-    readout_space_y = boundary_readout_line_space(max_y, readout_lines, qubits)[0]
+    readout_end_y = boundary_readout_line_pos(max_y, readout_lines, qubits, context=context)[0]
+    readout_space_y = boundary_readout_line_space(max_y, readout_lines, qubits, context=context)[0]
 
     # Get the boundary coordinates of qubit outlines
-    qubits_left_x = boundary_qubits_outline(0, qubits)
-    qubits_right_x = boundary_qubits_outline(max_x, qubits)
+    qubits_left_x = boundary_qubits_outline(0, qubits, context=context)
+    qubits_right_x = boundary_qubits_outline(max_x, qubits, context=context)
 
     # Pins boundary coordinates
     upper_pins_y = readout_end_y + readout_space_y + math.ceil(upper_num / 2) * gap + distance_to_chip
@@ -917,13 +865,13 @@ def generate_control_lines(qubits, readout_lines, pins, chip):
         qubits_indices[d] = []
 
     for line in row_distribution['upper']:
-        qubits_indices['upper'] += get_qubits_in_line(line, qubits)
+        qubits_indices['upper'] += get_qubits_in_line(line, qubits, context=context)
 
     for line in row_distribution['lower']:
-        qubits_indices['lower'] += get_qubits_in_line(line, qubits)
+        qubits_indices['lower'] += get_qubits_in_line(line, qubits, context=context)
 
     for line in row_distribution['sides']:
-        qubits_indices['sides'] += get_qubits_in_line(line, qubits)
+        qubits_indices['sides'] += get_qubits_in_line(line, qubits, context=context)
 
     mapping_indices = create_qubits_mapping(control_indices, qubits_indices)
 
@@ -9,12 +9,13 @@ import math
 import re
 import copy
 import func_modules
+from routing.Flipchip.routing_context import RoutingContext
 
 gap = 100
 
 
 # Returns the maximum and minimum y-coordinates of the end_pos of the readout lines in the i-th row
-def boundary_readout_line_pos(i, readout_lines, qubits):
+def boundary_readout_line_pos(i, readout_lines, qubits, context=None):
     """
     Returns the maximum and minimum y-coordinates of the end_pos of the readout lines in the i-th row.
 
@@ -22,42 +23,19 @@ def boundary_readout_line_pos(i, readout_lines, qubits):
         i: Integer, row number.
         readout_lines: Dictionary, describing the operation parameters of the readout lines.
         qubits: Dictionary, describing the operation parameters of the qubits.
+        context: RoutingContext, shared lookups of the routing, built from qubits and readout_lines if None.
 
     Output:
         max_y: Float, maximum y-coordinate value.
         min_y: Float, minimum y-coordinate value.
     """
-    # Initialize a dictionary to store the readout lines in the i-th row
-    line_in_row = {}
-
-    # Iterate through readout_lines to determine which readout lines are in the i-th row
-    for line_name, line_info in readout_lines.items():
-        qubit_name = func_modules.qubits.find_qname_from_rdl_ops(line_info, qubits)
-        qubit_info = qubits.get(qubit_name)
-
-        # Confirm that qubit_info is not empty and its topo_pos row coordinate matches i
-        if qubit_info and qubit_info['topo_pos'][1] == i:
-            line_in_row[line_name] = line_info
-
-    # Check if there are any readout lines in the i-th row
-    if not line_in_row:
-        return None
-
-    # Initialize the maximum and minimum y-coordinate values
-    max_y = float('-inf')
-    min_y = float('inf')
-
-    # Iterate through the readout lines in the i-th row to update the maximum and minimum y-coordinate values
-    for line_name, line_info in line_in_row.items():
-        end_pos_y = line_info['end_pos'][1]
-        max_y = max(max_y, end_pos_y)
-        min_y = min(min_y, end_pos_y)
-
-    return max_y, min_y
+    if context is None:
+        context = RoutingContext(qubits, readout_lines)
+    return context.readout_line_pos(i)
 
 
 # Returns the maximum and minimum space values of the readout lines in the i-th row
-def boundary_readout_line_space(i, readout_lines, qubits):
+def boundary_readout_line_space(i, readout_lines, qubits, context=None):
     """
     Returns the maximum and minimum space values of the readout lines in the i-th row.
 
@@ -65,47 +43,25 @@ def boundary_readout_line_space(i, readout_lines, qubits):
         i: Integer, row number.
         readout_lines: Dictionary, describing the operation parameters of the readout lines.
         qubits: Dictionary, describing the operation parameters of the qubits.
+        context: RoutingContext, shared lookups of the routing, built from qubits and readout_lines if None.
 
     Output:
         max_space: Float, maximum space value.
         min_space: Float, minimum space value.
     """
-    # Initialize a dictionary to store the readout lines in the i-th row
-    line_in_row = {}
-
-    # Iterate through readout_lines to determine which readout lines are in the i-th row
-    for line_name, line_info in readout_lines.items():
-        qubit_name = func_modules.qubits.find_qname_from_rdl_ops(line_info, qubits)
-        qubit_info = qubits.get(qubit_name)
-
-        # Confirm that qubit_info is not empty and its topo_pos row coordinate matches i
-        if qubit_info and qubit_info['topo_pos'][1] == i:
-            line_in_row[line_name] = line_info
-
-    # Check if there are any readout lines in the i-th row
-    if not line_in_row:
-        return None
-
-    # Initialize the maximum and minimum space values
-    max_space = float('-inf')
-    min_space = float('inf')
-
-    # Iterate through the readout lines in the i-th row to update the maximum and minimum space values
-    for line_name, line_info in line_in_row.items():
-        space = line_info['space']
-        max_space = max(max_space, space)
-        min_space = min(min_space, space)
-
-    return max_space, min_space
+    if context is None:
+        context = RoutingContext(qubits, readout_lines)
+    return context.readout_line_space(i)
 
 
 # Returns the coordinates of the outermost qubits on the top, bottom, left, and right
-def boundary_qubit_pos(qubits):
+def boundary_qubit_pos(qubits, context=None):
     """
     Returns the coordinates of the outermost qubits on the top, bottom, left, and right.
 
     Input:
         qubits: Dictionary, describing the operation parameters of the qubits.
+        context: RoutingContext, shared lookups of the routing, built from qubits if None.
 
     Output:
         x_left: Float, x-coordinate of the leftmost qubit.
@@ -113,43 +69,28 @@ def boundary_qubit_pos(qubits):
         y_upper: Float, y-coordinate of the topmost qubit.
         y_lower: Float, y-coordinate of the bottommost qubit.
     """
-    qubits = copy.deepcopy(qubits)
-    gds_positions = [qubit["gds_pos"] for qubit in qubits.values()]
-    x_left, x_right = min([x for x, y in gds_positions]), max([x for x, y in gds_positions])
-    y_upper, y_lower = max([y for x, y in gds_positions]), min([y for x, y in gds_positions])
-    return x_left, x_right, y_upper, y_lower
+    if context is None:
+        context = RoutingContext(qubits, Dict())
+    return context.qubit_pos()
 
 
 # Returns the maximum and minimum outline values of the qubits in the i-th column
-def boundary_qubits_outline(i, qubits):
+def boundary_qubits_outline(i, qubits, context=None):
     """
     Returns the maximum and minimum outline values of the qubits in the i-th column.
 
     Input:
         i: Integer, column number.
         qubits: Dictionary, describing the operation parameters of the qubits.
+        context: RoutingContext, shared lookups of the routing, built from qubits if None.
 
     Output:
         max_x: Float, maximum x-coordinate.
         min_x: Float, minimum x-coordinate.
     """
-    min_x = float('inf')
-    max_x = float('-inf')
-
-    for qubit in qubits.values():
-        if qubit['topo_pos'][0] == i:  # Check if it is in the i-th column
-            # Process each qubit's coupling_qubits
-            for key, coupling_qubit in qubit['coupling_pins'].items():
-                if coupling_qubit:  # Ensure coupling_qubit is not null
-                    x = coupling_qubit[0]
-                    min_x = min(min_x, x)
-                    max_x = max(max_x, x)
-
-    # If no qubits are found in the i-th column, return None
-    if min_x == float('inf') or max_x == float('-inf'):
-        return None
-
-    return max_x + 100, min_x - 100
+    if context is None:
+        context = RoutingContext(qubits, Dict())
+    return context.qubits_outline(i)
 
 
 # Sequence for adding pins on the top and bottom
@@ -238,7 +179,7 @@ def pin_nums(m, n):
 import func_modules
 
 
-def generate_pins(qubits, readout_lines, chip, pins_geometric_ops):
+def generate_pins(qubits, readout_lines, chip, pins_geometric_ops, context=None):
     """
     Main function for generating pins.
 
@@ -247,6 +188,7 @@ def generate_pins(qubits, readout_lines, chip, pins_geometric_ops):
         readout_lines: Dictionary, describing the operation parameters of the readout lines.
         chip: Dictionary, describing the operation parameters of the chip.
         pins_geometric_ops: Dictionary, describing the geometric operation parameters of the pins.
+        context: RoutingContext, shared lookups of the routing, built from the qubits and readout lines if None.
 
     Output:
         pins: Dictionary, operation parameters of the pins.
@@ -257,6 +199,8 @@ def generate_pins(qubits, readout_lines, chip, pins_geometric_ops):
     readout_lines = copy.deepcopy(readout_lines)
     chip = copy.deepcopy(chip)
     pins_geometric_ops = copy.deepcopy(pins_geometric_ops)
+    if context is None:
+        context = RoutingContext(qubits, readout_lines)
 
     topo_poss = func_modules.topo.extract_topo_positions_from_qubits_ops(qubits)
 
@@ -284,19 +228,19 @@ def generate_pins(qubits, readout_lines, chip, pins_geometric_ops):
         max_y = max(max_y, coords[1])
 
     # Get the boundary coordinates of the qubit positions
-    x_left, x_right, y_upper, y_lower = boundary_qubit_pos(qubits)
+    x_left, x_right, y_upper, y_lower = boundary_qubit_pos(qubits, context=context)
 
     # Number of pins on the top, bottom, left, and right
     upper_num, lower_num, left_num, right_num = pin_nums(max_y + 1, max_x + 1)
     # print(upper_num,lower_num,left_num,right_num,(max_y + 1)*(max_x + 1)+(max_y+1)*2)
 
     # Highest y-coordinate and space of the readout lines
-    readout_end_y = boundary_readout_line_pos(max_y, readout_lines, qubits)[0]
-    readout_space_y = boundary_readout_line_space(max_y, readout_lines, qubits)[0]
+    readout_end_y = boundary_readout_line_pos(max_y, readout_lines, qubits, context=context)[0]
+    readout_space_y = boundary_readout_line_space(max_y, readout_lines, qubits, context=context)[0]
 
     # Get the boundary coordinates of the qubit shapes
-    qubits_left_x = boundary_qubits_outline(0, qubits)
-    qubits_right_x = boundary_qubits_outline(max_x, qubits)
+    qubits_left_x = boundary_qubits_outline(0, qubits, context=context)
+    qubits_right_x = boundary_qubits_outline(max_x, qubits, context=context)
 
     # Pins boundary coordinates
     upper_pins_y = readout_end_y + readout_space_y + math.ceil(upper_num / 2) * gap + distance_to_chip
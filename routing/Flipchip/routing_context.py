@@ -0,0 +1,217 @@
+#########################################################################
+# File Name: routing_context.py
+# Description: Shared lookup tables for Flipchip routing.
+#              Maps readout lines to their qubits and aggregates the readout lines and qubits by row and column once,
+#              so the pins, transmission lines and control lines do not rescan every qubit for every readout line.
+#########################################################################
+
+import func_modules
+
+
+def pin_key(pin):
+    """
+    Returns a hashable key of a pin position, equal for positions that compare equal with ==.
+
+    Input:
+        pin: Tuple or list, pin coordinates.
+
+    Output:
+        key: Tuple, or None if the position cannot be hashed.
+    """
+    # (1, 2) == [1, 2] is False, so lists and tuples get different keys
+    if isinstance(pin, (list, tuple)):
+        try:
+            key = (isinstance(pin, list), tuple(pin))
+            hash(key)
+            return key
+        except TypeError:
+            return None
+    return None
+
+
+def map_pins(ops_dict, pins_key):
+    """
+    Maps each pin position listed under pins_key to the name of the first options listing it.
+
+    Input:
+        ops_dict: Dictionary, operation parameters keyed by name.
+        pins_key: String, the key of the pin positions in each options.
+
+    Output:
+        pin_map: Dictionary, pin key -> name, None if a pin cannot be hashed.
+    """
+    pin_map = {}
+    for name, ops in ops_dict.items():
+        for pin in ops[pins_key]:
+            key = pin_key(pin)
+            if key is None:
+                return None
+            pin_map.setdefault(key, name)
+    return pin_map
+
+
+def map_rdl_names(qubits_ops, rdls_ops):
+    """
+    Finds the readout line of each qubit, as func_modules.rdls.find_rdl_name does: the last readout line whose
+    start position is a readout pin of the qubit.
+
+    Input:
+        qubits_ops: Dictionary, describing the operation parameters of the qubits.
+        rdls_ops: Dictionary, describing the operation parameters of the readout lines.
+
+    Output:
+        rdl_names: Dictionary, qubit name -> readout line name.
+    """
+    # Start position -> (index, name) of the last readout line starting there
+    start_map = {}
+    for index, rdl_ops in enumerate(rdls_ops.values()):
+        key = pin_key(rdl_ops.start_pos)
+        if key is None:
+            start_map = None
+            break
+        start_map[key] = (index, rdl_ops.name)
+
+    rdl_names = {}
+    for q_name, q_ops in qubits_ops.items():
+        keys = [pin_key(pin) for pin in q_ops.readout_pins]
+        if start_map is None or None in keys:
+            rdl_names[q_name] = func_modules.rdls.find_rdl_name(rdls_ops, q_ops)
+            continue
+        found = [start_map[key] for key in keys if key in start_map]
+        if not found:
+            raise ValueError(f"No readout line found corresponding to {q_ops.name}!")
+        rdl_names[q_name] = max(found)[1]
+    return rdl_names
+
+
+class RoutingContext:
+    """
+    Routing context of one Flipchip routing call.
+
+    Built once from the converted qubits (see convert_qubits_ops_format) and the readout lines, then shared by the
+    pins, transmission lines and control lines generators.
+    """
+
+    def __init__(self, qubits, readout_lines):
+        """
+        Input:
+            qubits: Dictionary, describing the operation parameters of the qubits.
+            readout_lines: Dictionary, describing the operation parameters of the readout lines.
+        """
+        self.qubits = qubits
+        self.readout_lines = readout_lines
+
+        # Readout line -> qubit, the first qubit listing the start position of the line as readout pin
+        pin_map = map_pins(qubits, "readout_pins")
+        self.rdl_qubit = {}
+        for line_name, line_info in readout_lines.items():
+            key = pin_key(line_info.start_pos)
+            if pin_map is not None and key is not None:
+                if key not in pin_map:
+                    raise ValueError(f"No qubit found corresponding to readout line {line_info.name}!")
+                self.rdl_qubit[line_name] = pin_map[key]
+            else:
+                self.rdl_qubit[line_name] = func_modules.qubits.find_qname_from_rdl_ops(line_info, qubits)
+
+        # Readout lines and qubits of each row, in their original order
+        self.row_lines = {}
+        for line_name, line_info in readout_lines.items():
+            qubit_info = qubits.get(self.rdl_qubit[line_name])
+            if qubit_info:
+                self.row_lines.setdefault(qubit_info['topo_pos'][1], []).append(line_info)
+        self.row_qubits = {}
+        for qubit_name, qubit_info in qubits.items():
+            self.row_qubits.setdefault(qubit_info['topo_pos'][1], []).append(qubit_name)
+
+        self._qubit_pos = None
+        self._qubits_outline = {}
+        return
+
+    def qname_from_rdl(self, line_name):
+        """
+        Returns the name of the qubit of a readout line.
+        """
+        return self.rdl_qubit[line_name]
+
+    def readout_line_pos(self, i):
+        """
+        Returns the maximum and minimum y-coordinates of the end_pos of the readout lines in the i-th row,
+        None if there are no readout lines in the row.
+        """
+        if not self.row_lines.get(i):
+            return None
+        max_y = float('-inf')
+        min_y = float('inf')
+        for line_info in self.row_lines[i]:
+            end_pos_y = line_info['end_pos'][1]
+            max_y = max(max_y, end_pos_y)
+            min_y = min(min_y, end_pos_y)
+        return max_y, min_y
+
+    def readout_line_space(self, i):
+        """
+        Returns the maximum and minimum space values of the readout lines in the i-th row,
+        None if there are no readout lines in the row.
+        """
+        if not self.row_lines.get(i):
+            return None
+        max_space = float('-inf')
+        min_space = float('inf')
+        for line_info in self.row_lines[i]:
+            space = line_info['space']
+            max_space = max(max_space, space)
+            min_space = min(min_space, space)
+        return max_space, min_space
+
+    def qubits_in_row(self, i):
+        """
+        Returns the names of the qubits in the i-th row.
+        """
+        return list(self.row_qubits.get(i, []))
+
+    def qubit_pos(self):
+        """
+        Returns the x-coordinates of the leftmost and rightmost qubits and the y-coordinates of the topmost and
+        bottommost qubits.
+        """
+        if self._qubit_pos is None:
+            gds_positions = [qubit["gds_pos"] for qubit in self.qubits.values()]
+            x_left, x_right = min([x for x, y in gds_positions]), max([x for x, y in gds_positions])
+            y_upper, y_lower = max([y for x, y in gds_positions]), min([y for x, y in gds_positions])
+            self._qubit_pos = (x_left, x_right, y_upper, y_lower)
+        return self._qubit_pos
+
+    def qubits_outline(self, i):
+        """
+        Returns the maximum and minimum x-coordinates of the coupling pins of the qubits in the i-th column,
+        widened by 100, None if there are no coupling pins in the column.
+        """
+        if i not in self._qubits_outline:
+            min_x = float('inf')
+            max_x = float('-inf')
+            for qubit in self.qubits.values():
+                if qubit['topo_pos'][0] == i:
+                    for key, coupling_qubit in qubit['coupling_pins'].items():
+                        if coupling_qubit:
+                            x = coupling_qubit[0]
+                            min_x = min(min_x, x)
+                            max_x = max(max_x, x)
+            if min_x == float('inf') or max_x == float('-inf'):
+                self._qubits_outline[i] = None
+            else:
+                self._qubits_outline[i] = (max_x + 100, min_x - 100)
+        return self._qubits_outline[i]
+
+    def transmission_boundary_point(self, i, qubits_left_x, qubits_right_x):
+        """
+        Returns the left and right boundary points of the transmission line of the i-th row,
+        None if there are no readout lines in the row.
+        """
+        if not self.row_lines.get(i):
+            return None
+        max_y = float('-inf')
+        max_space = float('-inf')
+        for line_info in self.row_lines[i]:
+            max_y = max(max_y, line_info['end_pos'][1])
+            max_space = max(max_space, line_info['space'])
+        return (qubits_left_x - 100, max_y + max_space), (qubits_right_x + 100, max_y + max_space)
@@ -7,12 +7,14 @@
 from addict import Dict
 import numpy as np
 import math
+import bisect
 from scipy.spatial import KDTree
 import matplotlib.pyplot as plt
 import networkx as nx
 import re
 import copy
 import func_modules
+from routing.Flipchip_IBM import path_router
 
 
 def convert_topo(topo_poss):
@@ -69,14 +71,15 @@ def count_points_in_quadrants(topo_poss, pins):
     right_num = 0
     positions = convert_topo(topo_poss)
     num = len(positions)
+    max_x = max([x for x, y in positions])
+    max_y = max([y for x, y in positions])
     for x, y in positions:
-        if x >= y and x + y <= max([x for x, y in positions]) and y <= max([y for x, y in positions]) / 2:
+        if x >= y and x + y <= max_x and y <= max_y / 2:
             lower_num += 1
-    upper_lines = math.ceil(max([y for x, y in positions]) / 2)
+    upper_lines = math.ceil(max_y / 2)
     for i in range(upper_lines):
-        upper_num += max([x for x, y in positions]) + 1 - i * 2
-    upper_num += (sum(1 for x, y in positions if y == max([y for x, y in positions])) - sum(
-        1 for x, y in positions if y == (max([y for x, y in positions]) - 1)))
+        upper_num += max_x + 1 - i * 2
+    upper_num += (sum(1 for x, y in positions if y == max_y) - sum(1 for x, y in positions if y == (max_y - 1)))
     left_num = right_num = int((num - upper_num - lower_num) / 2)
     return upper_num, lower_num, left_num, right_num
 
@@ -199,35 +202,26 @@ def calculate_qubit_control_pos(topo_poss, qubits):
 
 
 # Find the shortest disjoint paths in the given graph
-def find_disjoint_paths(G, start_to_end):
+def find_disjoint_paths(G, start_to_end, order=None, max_reroutes=2, weight=None):
     """
     Find the shortest disjoint paths in the given graph.
 
     Args:
         G: Network graph object.
         start_to_end: List containing tuples of start and end points.
+        order: None to route in the order of start_to_end, "shortest" to route the closest start and end points
+               first, or a list of indices into start_to_end.
+        max_reroutes: Integer, rip-up-and-reroute attempts for a pair that cannot be routed.
+        weight: None to find the paths with the fewest edges, "length" for the shortest paths.
 
     Returns:
-        paths: List containing all found disjoint paths.
+        paths: List containing all found disjoint paths, an empty list for each pair that could not be routed.
     """
-    paths = []
-    for start, end in start_to_end:
-        G_temp = copy.deepcopy(G)
-        for path in paths:
-            G_temp.remove_nodes_from(path)
-        other_points = []
-        for x, y in start_to_end:
-            if x != start and y != end:
-                other_points.append(x)
-                other_points.append(y)
-        other_points = list(set(other_points))
-        G_temp.remove_nodes_from(other_points)
-        try:
-            path = nx.astar_path(G_temp, source=start, target=end)
-            paths.append(path)
-        except nx.NetworkXNoPath:
-            paths.append([])
-
+    router = path_router.DisjointPathRouter(G, start_to_end, weight=weight)
+    paths, unroutable = router.route(order=order, max_reroutes=max_reroutes)
+    if unroutable:
+        print("Flipchip_routing_IBM could not route control lines {}: {}".format(
+            unroutable, [list(start_to_end[k]) for k in unroutable]))
     return paths
 
 
@@ -248,6 +242,63 @@ def calculate_distance(point1, point2):
     return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
 
+# Find the extreme points of each group of points sharing a key
+def group_extremes(keys, values):
+    """
+    Find, for each point, the points with the minimum and maximum value among the points sharing its key.
+    Points are grouped with one sort instead of rescanning all points for each point.
+
+    Args:
+        keys: Array containing the grouping coordinate of each point (y for rows, x for columns).
+        values: Array containing the coordinate to minimize and maximize (x for rows, y for columns).
+
+    Returns:
+        min_index, max_index: Two integer arrays containing, for each point, the index of the first point of its group
+                              with the minimum and the maximum value.
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values)
+    index = np.arange(len(keys))
+    _, group = np.unique(keys, return_inverse=True)
+    group = group.reshape(-1)
+    extremes = []
+    for sort_values in (values, -values):
+        # Sorted by key, then value, then index: the first point of each group is the extreme found first
+        order = np.lexsort((index, sort_values, keys))
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        extremes.append(order[starts][group])
+    return extremes[0], extremes[1]
+
+
+# Find the nearest candidate point of each point
+def find_nearest_points(points, candidates):
+    """
+    Find the nearest candidate point of each point with a KD tree.
+
+    Args:
+        points: Array containing the coordinates of the points.
+        candidates: Array containing the coordinates of the candidate points.
+
+    Returns:
+        nearest_index: List containing, for each point, the index of the nearest candidate point
+                       (the first one on equal distances).
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    candidates = np.asarray(candidates, dtype=float).reshape(-1, 2)
+    tree = KDTree(candidates)
+    distances, _ = tree.query(points)
+    # Collect all candidates at (about) the nearest distance, then compare their exact distances
+    radius = distances * (1 + 1e-9) + 1e-9
+    nearest_index = []
+    for point, ball in zip(points, tree.query_ball_point(points, radius)):
+        ball = np.sort(np.asarray(ball, dtype=int))
+        delta = candidates[ball] - point
+        exact = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+        nearest_index.append(int(ball[np.argmin(exact)]))
+    return nearest_index
+
+
 # Find the extreme points in the given point set
 def find_extreme_points(points):
     """
@@ -261,44 +312,14 @@ def find_extreme_points(points):
     """
     if not points:
         return [], [], [], []
-    min_x_points = []
-    max_x_points = []
-    min_y_points = []
-    max_y_points = []
-
-    for point in points:
-        y = point[1]
-        row_points = [p for p in points if p[1] == y]
-        min_x = float('inf')  # Initial value set to positive infinity
-        max_x = float('-inf')  # Initial value set to negative infinity
-
-        for row_point in row_points:
-            x = row_point[0]  # Get the x-coordinate
-            if x < min_x:
-                min_x = x
-            if x > max_x:
-                max_x = x
-        min_pos = [p for p in row_points if p[0] == min_x]
-        max_pos = [p for p in row_points if p[0] == max_x]
-        min_x_points.append(min_pos[0])
-        max_x_points.append(max_pos[0])
-
-    for point in points:
-        x = point[0]
-        column_points = [p for p in points if p[0] == x]
-        min_y = float('inf')  # Initial value set to positive infinity
-        max_y = float('-inf')  # Initial value set to negative infinity
-
-        for column_point in column_points:
-            y = column_point[1]  # Get the y-coordinate
-            if y < min_y:
-                min_y = y
-            if y > max_y:
-                max_y = y
-        min_pos = [p for p in column_points if p[1] == min_y]
-        max_pos = [p for p in column_points if p[1] == max_y]
-        min_y_points.append(min_pos[0])
-        max_y_points.append(max_pos[0])
+
+    coordinates = np.array(points, dtype=float)
+    row_min, row_max = group_extremes(coordinates[:, 1], coordinates[:, 0])
+    column_min, column_max = group_extremes(coordinates[:, 0], coordinates[:, 1])
+    min_x_points = [points[k] for k in row_min]
+    max_x_points = [points[k] for k in row_max]
+    min_y_points = [points[k] for k in column_min]
+    max_y_points = [points[k] for k in column_max]
 
     min_x_points = list(set(min_x_points))
     max_x_points = list(set(max_x_points))
@@ -400,81 +421,47 @@ def create_network(init_pos, pad_pos, control_pos, path_pos, topo_poss, pins):
     topology_pos_x = max([x for x, y in positions])
     topology_pos_y = max([y for x, y in positions])
 
-    way_points_tmp = copy.deepcopy(way_points)
+    # Leftmost and rightmost points of each row, bottommost and topmost points of each column
+    way_coordinates = np.array(way_points)
+    coordinates = way_coordinates.astype(float)
+    row_min, row_max = group_extremes(coordinates[:, 1], coordinates[:, 0])
+    column_min, column_max = group_extremes(coordinates[:, 0], coordinates[:, 1])
 
     selected_points = []
-    for point in way_points_tmp:
-        y = point[1]
-        row_points = [p for p in way_points_tmp if p[1] == y]
-        min_x = float('inf')  # Initial value set to positive infinity
-        max_x = float('-inf')  # Initial value set to negative infinity
-
-        for row_point in row_points:
-            x = row_point[0]  # Get the x-coordinate
-            if x < min_x:
-                min_x = x
-            if x > max_x:
-                max_x = x
-        min_pos = [p for p in row_points if p[0] == min_x]
-        max_pos = [p for p in row_points if p[0] == max_x]
-        selected_points.append(min_pos[0])
-        selected_points.append(max_pos[0])
-
-    for point in way_points_tmp:
-        x = point[0]
-        column_points = [p for p in way_points_tmp if p[0] == x]
-        min_y = float('inf')  # Initial value set to positive infinity
-        max_y = float('-inf')  # Initial value set to negative infinity
-
-        for column_point in column_points:
-            y = column_point[1]  # Get the y-coordinate
-            if y < min_y:
-                min_y = y
-            if y > max_y:
-                max_y = y
-        min_pos = [p for p in column_points if p[1] == min_y]
-        max_pos = [p for p in column_points if p[1] == max_y]
-        selected_points.append(min_pos[0])
-        selected_points.append(max_pos[0])
+    for k in range(len(way_points)):
+        selected_points.append(way_points[row_min[k]])
+        selected_points.append(way_points[row_max[k]])
+    for k in range(len(way_points)):
+        selected_points.append(way_points[column_min[k]])
+        selected_points.append(way_points[column_max[k]])
 
     selected_points = list(set(selected_points))
 
     matches = []
 
-    selected_coordinates = np.array(selected_points)
-    way_coordinates = np.array(way_points)
-
     corners = []  # Four corner coordinates
 
     # Find the top-left and bottom-right points
-    leftmost_topmost = min(way_points_tmp, key=lambda point: point[0] + point[1])
-    rightmost_bottommost = max(way_points_tmp, key=lambda point: point[0] + point[1])
+    leftmost_topmost = min(way_points, key=lambda point: point[0] + point[1])
+    rightmost_bottommost = max(way_points, key=lambda point: point[0] + point[1])
     corners.append(leftmost_topmost)
     corners.append(rightmost_bottommost)
 
     # Find the bottom-left and top-right points
-    leftmost_bottommost = min(way_points_tmp, key=lambda point: point[0] - point[1])
-    rightmost_topmost = max(way_points_tmp, key=lambda point: point[0] - point[1])
+    leftmost_bottommost = min(way_points, key=lambda point: point[0] - point[1])
+    rightmost_topmost = max(way_points, key=lambda point: point[0] - point[1])
     corners.append(leftmost_bottommost)
     corners.append(rightmost_topmost)
 
-    inner_points = [point for point in way_coordinates if tuple(point) not in selected_points]
-    inner_points = [point for point in inner_points if not np.array_equal(point, corners[0])
-                    and not np.array_equal(point, corners[1])
-                    and not np.array_equal(point, corners[2])
-                    and not np.array_equal(point, corners[3])]
+    selected_set = set(selected_points)
+    corner_set = set(corners)
+    inner_points = [point for point, way_point in zip(way_coordinates, way_points)
+                    if way_point not in selected_set and way_point not in corner_set]
 
     # Connect each selected point to its nearest inner point
-    for selected_point in selected_points:
-        min_distance = float('inf')
-        nearest_point = None
-
-        for inner_point in inner_points:
-            distance = calculate_distance(selected_point, inner_point)
-            if distance < min_distance:
-                min_distance = distance
-                nearest_point = inner_point
-
+    nearest_index = find_nearest_points(selected_points, inner_points) if inner_points else []
+    for selected_point, k in zip(selected_points, nearest_index):
+        nearest_point = inner_points[k]
         matches.append((selected_point, nearest_point))
         G.add_edge(tuple(selected_point), tuple(nearest_point))
 
@@ -496,20 +483,30 @@ def create_network(init_pos, pad_pos, control_pos, path_pos, topo_poss, pins):
             matches.append((sorted_by_y[i], sorted_by_y[i + 1]))
             G.add_edge(tuple(sorted_by_y[i]), tuple(sorted_by_y[i + 1]))
 
+    # Largest second key of the control positions at each x-coordinate
+    max_second_values = {}
+    for first_key, second_dict in control_pos.items():
+        for second_key, value in second_dict.items():
+            if second_key > max_second_values.get(value[0], float('-inf')):
+                max_second_values[value[0]] = second_key
+
+    # Waypoints of each x-coordinate, and the distinct x-coordinates in ascending order
+    x_points = {}
+    for way_point in way_points:
+        x_points.setdefault(way_point[0], []).append(way_point)
+    x_first = {x: k for k, x in enumerate(x_points)}
+    x_values = sorted(x_points)
+
     for end_point in end_points:
-        max_second_value = float('-inf')
-        for first_key, second_dict in control_pos.items():
-            if end_point[0] in [value[0] for value in second_dict.values()]:
-                for second_key, value in second_dict.items():
-                    if value[0] == end_point[0] and second_key > max_second_value:
-                        max_second_value = second_key
+        max_second_value = max_second_values.get(end_point[0], float('-inf'))
+        # Closest x-coordinate, the one found first on equal distances
         closest_x = None
-        min_x_distance = float('inf')
-        for way_point in way_points:
-            if abs(way_point[0] - end_point[0]) < min_x_distance:
-                closest_x = way_point[0]
-                min_x_distance = abs(way_point[0] - end_point[0])
-        same_x_points = [point for point in way_points if point[0] == closest_x]
+        k = bisect.bisect_left(x_values, end_point[0])
+        for x in x_values[max(k - 1, 0):k + 1]:
+            if (closest_x is None or abs(x - end_point[0]) < abs(closest_x - end_point[0]) or
+                    (abs(x - end_point[0]) == abs(closest_x - end_point[0]) and x_first[x] < x_first[closest_x])):
+                closest_x = x
+        same_x_points = list(x_points.get(closest_x, []))
 
         same_x_points.sort(key=lambda point: math.sqrt((end_point[0] - point[0]) ** 2 + (end_point[1] - point[1]) ** 2))
         same_x_points = same_x_points[:int(len(same_x_points) / (max_second_value + 1))]
@@ -518,6 +515,7 @@ def create_network(init_pos, pad_pos, control_pos, path_pos, topo_poss, pins):
             G.add_edge(tuple(end_point), tuple(same_x_point))
 
     start_to_end = []
+    start_to_end_set = set()
     upper_num, lower_num, left_num, right_num = count_points_in_quadrants(topo_poss, pins)
 
     paths = []
@@ -533,6 +531,7 @@ def create_network(init_pos, pad_pos, control_pos, path_pos, topo_poss, pins):
                 start_pos = tuple(pad_pos['lower'][lower_count])
                 end_pos = tuple(control_pos[i][j])
                 start_to_end.append([init_start_pos, end_pos])
+                start_to_end_set.add((init_start_pos, end_pos))
                 lower_count += 1
 
                 index = int(i * len(lower_points) / (topology_pos_x + 1))
@@ -540,18 +539,19 @@ def create_network(init_pos, pad_pos, control_pos, path_pos, topo_poss, pins):
                 count += 1
 
     upper_count = 0
+    top_row_num = sum(1 for x, y in positions if y == max([y for x, y in positions]))
     for i in range(topology_pos_x + 1):
         count = 0
         for j in range(topology_pos_y + 1):
             if (i <= j and i + j >= topology_pos_y and j >= (topology_pos_x + 1) / 2 and upper_count < upper_num):
-                if (j == topology_pos_y and i + 1 > sum(
-                        1 for x, y in positions if y == max([y for x, y in positions]))):
+                if j == topology_pos_y and i + 1 > top_row_num:
                     break
                 init_start_pos = tuple(init_pos['upper'][upper_count])
                 start_pos = tuple(pad_pos['upper'][upper_count])
                 end_pos = tuple(control_pos[i][j])
-                if [start_pos, end_pos] not in start_to_end:
+                if (start_pos, end_pos) not in start_to_end_set:
                     start_to_end.append([init_start_pos, end_pos])
+                    start_to_end_set.add((init_start_pos, end_pos))
                     upper_count += 1
 
                 index = int(i * len(upper_points) / (topology_pos_x + 1))
@@ -0,0 +1,207 @@
+#########################################################################
+# File Name: path_router.py
+# Description: Incremental router for vertex-disjoint control line paths.
+#              Routes all nets on one shared graph, with node occupancy masks instead of graph copies.
+#########################################################################
+
+import math
+import networkx as nx
+
+
+class DisjointPathRouter:
+    """
+    Routes nets (start, end) on a graph so that no two paths share a node.
+
+    The graph is never copied: the nodes used by routed nets and the terminals of the other nets are masked
+    through a subgraph view. Paths are found with A* and a Euclidean heuristic. When a net cannot be routed,
+    the nets blocking it are ripped up, the net is routed and the ripped-up nets are rerouted.
+    """
+
+    def __init__(self, G, nets, weight=None):
+        """
+        Initialize the router.
+
+        Args:
+            G: Network graph object, its nodes are (x, y) coordinates. It is not modified.
+            nets: List containing tuples of start and end points.
+            weight: None to find the paths with the fewest edges, or "length" to find the shortest paths.
+        """
+        self.G = G
+        self.nets = [(tuple(start), tuple(end)) for start, end in nets]
+        self.weight = weight
+
+        # Number of nets having each node as terminal
+        self.terminal_count = {}
+        self.start_nets = {}
+        self.end_nets = {}
+        for k, (start, end) in enumerate(self.nets):
+            for node in (start, end):
+                self.terminal_count[node] = self.terminal_count.get(node, 0) + 1
+            self.start_nets.setdefault(start, []).append(k)
+            self.end_nets.setdefault(end, []).append(k)
+
+        # Occupancy mask: node -> index of the net whose path uses it
+        self.occupied = {}
+        self.paths = [None] * len(self.nets)
+
+        # Edges cost 1 (or their length), a path has at least distance / longest edges, so the scaled
+        # Euclidean distance never overestimates the remaining cost
+        if weight == "length":
+            self.scale = 1.0
+        else:
+            longest = max((calculate_length(u, v) for u, v in G.edges()), default=0.0)
+            self.scale = 1.0 / longest if longest > 0 else 0.0
+        return
+
+    def cost(self, u, v, data):
+        """
+        Cost of the edge (u, v).
+        """
+        if self.weight == "length":
+            return calculate_length(u, v)
+        return 1
+
+    def heuristic(self, u, v):
+        """
+        Euclidean A* heuristic, never larger than the cost of the remaining path.
+        """
+        return calculate_length(u, v) * self.scale
+
+    def masked_terminals(self, k):
+        """
+        Returns the terminals of the other nets that net k must not cross, with the number of nets keeping them.
+
+        Nets sharing the start point or the end point of net k do not block it, as in the copy-based search.
+        """
+        start, end = self.nets[k]
+        excluded = set(self.start_nets[start]) | set(self.end_nets[end])
+        released = {}
+        for j in excluded:
+            for node in self.nets[j]:
+                released[node] = released.get(node, 0) + 1
+        return released
+
+    def search(self, k, ignore_occupied=False):
+        """
+        Find a path for net k on the masked graph.
+
+        Args:
+            k: Integer, index of the net.
+            ignore_occupied: Boolean, if True only the terminals of the other nets are masked.
+
+        Returns:
+            path: List containing the nodes of the path, None if there is no path.
+        """
+        start, end = self.nets[k]
+        released = self.masked_terminals(k)
+
+        def free(node):
+            if not ignore_occupied and node in self.occupied:
+                return False
+            return self.terminal_count.get(node, 0) - released.get(node, 0) <= 0
+
+        if start not in self.G or end not in self.G or not free(start) or not free(end):
+            return None
+        view = nx.subgraph_view(self.G, filter_node=free)
+        try:
+            return nx.astar_path(view, source=start, target=end, heuristic=self.heuristic, weight=self.cost)
+        except nx.NetworkXNoPath:
+            return None
+
+    def place(self, k, path):
+        """
+        Mark the nodes of the path of net k as occupied.
+        """
+        self.paths[k] = path
+        for node in path:
+            self.occupied[node] = k
+
+    def rip_up(self, k):
+        """
+        Remove the path of net k and free its nodes.
+        """
+        for node in self.paths[k]:
+            if self.occupied.get(node) == k:
+                del self.occupied[node]
+        self.paths[k] = None
+
+    def route(self, order=None, max_reroutes: int = 2):
+        """
+        Route all nets.
+
+        Args:
+            order: None to route the nets in the given order, "shortest" to route the nets with the closest
+                   terminals first, or a list of net indices.
+            max_reroutes: Integer, the number of rip-up-and-reroute attempts per net that cannot be routed.
+
+        Returns:
+            paths: List containing the path of each net in the given order, an empty list for unroutable nets.
+            unroutable: List containing the indices of the nets that could not be routed.
+        """
+        if order is None:
+            order = list(range(len(self.nets)))
+        elif order == "shortest":
+            order = sorted(range(len(self.nets)), key=lambda k: calculate_length(*self.nets[k]))
+
+        failed = []
+        for k in order:
+            path = self.search(k)
+            if path is None:
+                failed.append(k)
+            else:
+                self.place(k, path)
+
+        unroutable = []
+        for k in failed:
+            if self.paths[k] is None and not self.reroute(k, max_reroutes):
+                unroutable.append(k)
+
+        paths = [path if path is not None else [] for path in self.paths]
+        return paths, sorted(unroutable)
+
+    def reroute(self, k, max_reroutes):
+        """
+        Rip up the nets blocking net k, route net k and reroute the ripped-up nets.
+        The previous paths are restored if a ripped-up net cannot be rerouted, and the next attempt also
+        rips up the nets next to the blocked path.
+
+        Returns:
+            routed: Boolean, True if net k was routed.
+        """
+        free_path = self.search(k, ignore_occupied=True)
+        if free_path is None:
+            return False  # Blocked by terminals only, ripping up does not help
+        region = set(free_path)
+        for _ in range(max_reroutes):
+            blocking = sorted({self.occupied[node] for node in region if node in self.occupied})
+            saved = {j: self.paths[j] for j in blocking}
+            for j in blocking:
+                self.rip_up(j)
+            path = self.search(k)
+            if path is not None:
+                self.place(k, path)
+                rerouted = []
+                for j in blocking:
+                    new_path = self.search(j)
+                    if new_path is None:
+                        break
+                    self.place(j, new_path)
+                    rerouted.append(j)
+                else:
+                    return True
+                # Undo: a ripped-up net lost its path
+                for j in rerouted:
+                    self.rip_up(j)
+                self.rip_up(k)
+            for j in blocking:
+                self.place(j, saved[j])
+            # Next attempt: also rip up the nets running next to the free path
+            region |= {neighbor for node in region for neighbor in self.G.neighbors(node)}
+        return False
+
+
+def calculate_length(point1, point2):
+    """
+    Calculate the Euclidean distance between two points.
+    """
+    return math.hypot(point2[0] - point1[0], point2[1] - point1[1])
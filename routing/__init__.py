@@ -12,6 +12,7 @@ from routing import Flipchip_IBM
 # Operations related to wiring
 ##############################################################################################################
 from base.branch_base import BranchBase
+from base.cow_dict import CowDict
 from addict import Dict
 import copy, func_modules
 
@@ -23,7 +24,7 @@ def routing(**routing_ops):
         routing_ops: A dictionary of wiring operation parameters.
 
     Output:
-        Returns a deep copy of the wiring result.
+        Returns a deep copy of the wiring result, the only copy made by the routing dispatch.
     """
     rb = RoutingBranch(**routing_ops)
     return copy.deepcopy(rb.branch_process())
@@ -48,7 +49,7 @@ class RoutingBranch(BranchBase):
             self.method = branch_options["method"]
             del branch_options["method"]
 
-        self.branch_options = Dict(branch_options)
+        self.branch_options = CowDict.share(branch_options)  # View of the wiring options, see BranchBase
 
         return
 
@@ -57,39 +58,37 @@ class RoutingBranch(BranchBase):
         Process the wiring.
 
         Output:
-            Returns a deep copy of the wiring result.
+            Returns the wiring result, see BranchBase.branch_process.
         """
-        branch_options = copy.deepcopy(self.branch_options)
+        branch_options = CowDict.share(self.branch_options)
         hash_num = self.method
 
         # Error checking
         if not hasattr(self, hash_num):
             raise ValueError(f"No {hash_num} routing method available")
 
-        result = getattr(self, hash_num)(branch_options)
-
-        return copy.deepcopy(result)
+        return getattr(self, hash_num)(branch_options)
 
     def Control_off_chip_routing(self, branch_options):
         """
         Control chip off-chip routing method.
         """
         coc = ControlOffChip(**branch_options)
-        return copy.deepcopy(coc.branch_process())
+        return coc.branch_process()
 
     def Flipchip_routing_IBM(self, branch_options):
         """
         Flipchip_IBM routing method.
         """
         fci = FlipchipIBM(**branch_options)
-        return copy.deepcopy(fci.branch_process())
+        return fci.branch_process()
 
     def Flipchip_routing(self, branch_options):
         """
         Flipchip routing method.
         """
         fcr = FlipchipRouting(**branch_options)
-        return copy.deepcopy(fcr.branch_process())
+        return fcr.branch_process()
 
 class ControlOffChip(BranchBase):
     def gds_ops(self, branch_options):
@@ -102,11 +101,10 @@ class ControlOffChip(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_options = copy.deepcopy(branch_options)
-        gds_ops = copy.deepcopy(branch_options.gds_ops)
+        gds_ops = branch_options.gds_ops
         # Interface
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
-        rdls_ops = copy.deepcopy(gds_ops.readout_lines)
+        qubits_ops = gds_ops.qubits
+        rdls_ops = gds_ops.readout_lines
         chip_name = "chip0"
         chip_ops = gds_ops.chips[chip_name]
         pins_type = "LaunchPad"
@@ -117,10 +115,10 @@ class ControlOffChip(BranchBase):
         # Perform operations
         pins_ops, tmls_ops = Control_off_chip.control_off_chip_routing(qubits_ops, rdls_ops, chip_ops, pins_type,
                                                                        tmls_type)
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.transmission_lines = copy.deepcopy(tmls_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.transmission_lines = tmls_ops
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
     def chip_name__gds_ops(self, branch_options):
         """
@@ -132,11 +130,10 @@ class ControlOffChip(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_options = copy.deepcopy(branch_options)
-        gds_ops = copy.deepcopy(branch_options.gds_ops)
+        gds_ops = branch_options.gds_ops
         # Interface
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
-        rdls_ops = copy.deepcopy(gds_ops.readout_lines)
+        qubits_ops = gds_ops.qubits
+        rdls_ops = gds_ops.readout_lines
         chip_name = branch_options.chip_name
         chip_ops = gds_ops.chips[chip_name]
         pins_type = "LaunchPad"
@@ -147,10 +144,10 @@ class ControlOffChip(BranchBase):
         # Perform operations
         pins_ops, tmls_ops = Control_off_chip.control_off_chip_routing(qubits_ops, rdls_ops, chip_ops, pins_type,
                                                                        tmls_type)
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.transmission_lines = copy.deepcopy(tmls_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.transmission_lines = tmls_ops
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
 class FlipchipIBM(BranchBase):
     def gds_ops(self, branch_options):
@@ -163,10 +160,9 @@ class FlipchipIBM(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_options = copy.deepcopy(branch_options)
-        gds_ops = copy.deepcopy(branch_options.gds_ops)
+        gds_ops = branch_options.gds_ops
         # Interface
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
+        qubits_ops = gds_ops.qubits
         chip_ops = gds_ops.chips["chip0"]
         pins_type = "LaunchPad"
         ctls_type = "ChargeLine"
@@ -179,10 +175,10 @@ class FlipchipIBM(BranchBase):
                                                              pins_type=pins_type,
                                                              ctls_type=ctls_type)
 
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.control_lines = copy.deepcopy(ctls_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.control_lines = ctls_ops
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
     def chip_name__gds_ops(self, branch_options):
         """
@@ -194,11 +190,10 @@ class FlipchipIBM(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_options = copy.deepcopy(branch_options)
-        gds_ops = copy.deepcopy(branch_options.gds_ops)
-        chip_name = copy.deepcopy(branch_options.chip_name)
+        gds_ops = branch_options.gds_ops
+        chip_name = branch_options.chip_name
         # Interface
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
+        qubits_ops = gds_ops.qubits
         chip_ops = gds_ops.chips[chip_name]
         pins_type = "LaunchPad"
         ctls_type = "ChargeLine"
@@ -211,10 +206,10 @@ class FlipchipIBM(BranchBase):
                                                              pins_type=pins_type,
                                                              ctls_type=ctls_type)
 
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.control_lines = copy.deepcopy(ctls_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.control_lines = ctls_ops
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
     def chip_name__ctls_type__gds_ops(self, branch_options):
         """
@@ -226,12 +221,11 @@ class FlipchipIBM(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_options = copy.deepcopy(branch_options)
-        gds_ops = copy.deepcopy(branch_options.gds_ops)
+        gds_ops = branch_options.gds_ops
         chip_name = branch_options.chip_name
         ctls_type = branch_options.ctls_type
         # Interface
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
+        qubits_ops = gds_ops.qubits
         chip_ops = gds_ops.chips[chip_name]
         pins_type = "LaunchPad"
         ctls_type = ctls_type
@@ -244,10 +238,10 @@ class FlipchipIBM(BranchBase):
                                                              pins_type=pins_type,
                                                              ctls_type=ctls_type)
 
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.control_lines = copy.deepcopy(ctls_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.control_lines = ctls_ops
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
 class FlipchipRouting(BranchBase):
     def gds_ops(self, branch_ops):
@@ -260,14 +254,13 @@ class FlipchipRouting(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_ops = copy.deepcopy(branch_ops)
-        gds_ops = copy.deepcopy(branch_ops.gds_ops)
+        gds_ops = branch_ops.gds_ops
         chip_name = "chip0"
         # Interface
         from library import pins
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
-        rdls_ops = copy.deepcopy(gds_ops.readout_lines)
-        chip_ops = copy.deepcopy(gds_ops.chips[chip_name])
+        qubits_ops = gds_ops.qubits
+        rdls_ops = gds_ops.readout_lines
+        chip_ops = gds_ops.chips[chip_name]
         pins_type = "LaunchPad"
         tmls_type = "TransmissionPath"
         ctls_type = "ChargeLine"
@@ -284,12 +277,12 @@ class FlipchipRouting(BranchBase):
                                                                                ctls_type=ctls_type,
                                                                                pins_geometric_ops=pins_geometric_ops)
 
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.transmission_lines = copy.deepcopy(tmls_ops)
-        gds_ops.control_lines = copy.deepcopy(ctls_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.transmission_lines = tmls_ops
+        gds_ops.control_lines = ctls_ops
         # gds_ops.chips[chip_name] = copy.deepcopy(new_chip_ops)
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
     def chip_name__gds_ops(self, branch_ops):
         """
@@ -301,14 +294,13 @@ class FlipchipRouting(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_ops = copy.deepcopy(branch_ops)
-        gds_ops = copy.deepcopy(branch_ops.gds_ops)
+        gds_ops = branch_ops.gds_ops
         chip_name = branch_ops.chip_name
         # Interface
         from library import pins
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
-        rdls_ops = copy.deepcopy(gds_ops.readout_lines)
-        chip_ops = copy.deepcopy(gds_ops.chips[chip_name])
+        qubits_ops = gds_ops.qubits
+        rdls_ops = gds_ops.readout_lines
+        chip_ops = gds_ops.chips[chip_name]
         pins_type = "LaunchPad"
         tmls_type = "TransmissionPath"
         ctls_type = "ChargeLine"
@@ -325,12 +317,12 @@ class FlipchipRouting(BranchBase):
                                                                                ctls_type=ctls_type,
                                                                                pins_geometric_ops=pins_geometric_ops)
 
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.transmission_lines = copy.deepcopy(tmls_ops)
-        gds_ops.control_lines = copy.deepcopy(ctls_ops)
-        gds_ops.chips[chip_name] = copy.deepcopy(new_chip_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.transmission_lines = tmls_ops
+        gds_ops.control_lines = ctls_ops
+        gds_ops.chips[chip_name] = new_chip_ops
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
     def chip_name__ctls_type__gds_ops__pins_type__tmls_type(self, branch_ops):
         """
@@ -342,17 +334,16 @@ class FlipchipRouting(BranchBase):
         Output:
             Returns the updated gds operation dictionary.
         """
-        branch_ops = copy.deepcopy(branch_ops)
-        gds_ops = copy.deepcopy(branch_ops.gds_ops)
+        gds_ops = branch_ops.gds_ops
         chip_name = branch_ops.chip_name
         # Interface
-        qubits_ops = copy.deepcopy(gds_ops.qubits)
-        rdls_ops = copy.deepcopy(gds_ops.readout_lines)
-        chip_ops = copy.deepcopy(gds_ops.chips[chip_name])
+        qubits_ops = gds_ops.qubits
+        rdls_ops = gds_ops.readout_lines
+        chip_ops = gds_ops.chips[chip_name]
         pins_type = branch_ops.pins_type
         tmls_type = branch_ops.tmls_type
         ctls_type = branch_ops.ctls_type
-        pins_geometric_ops = copy.deepcopy(branch_ops.pins_geometric_ops)
+        pins_geometric_ops = branch_ops.pins_geometric_ops
         # Input check
         if chip_ops == Dict():
             raise ValueError(f"Missing {chip_name}!")
@@ -365,12 +356,12 @@ class FlipchipRouting(BranchBase):
                                                                                ctls_type=ctls_type,
                                                                                pins_geometric_ops=pins_geometric_ops)
 
-        gds_ops.pins = copy.deepcopy(pins_ops)
-        gds_ops.transmission_lines = copy.deepcopy(tmls_ops)
-        gds_ops.control_lines = copy.deepcopy(ctls_ops)
+        gds_ops.pins = pins_ops
+        gds_ops.transmission_lines = tmls_ops
+        gds_ops.control_lines = ctls_ops
         # gds_ops.chips[chip_name] = copy.deepcopy(new_chip_ops)
 
-        return copy.deepcopy(gds_ops)
+        return gds_ops
 
 class zhuanxiang156(BranchBase):
     def __init__(self, **branch_options):
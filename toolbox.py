@@ -1,5 +1,6 @@
-import copy, os, importlib, math
+import copy, os, importlib, math, time, tracemalloc, contextlib
 from addict import Dict
+import numpy as np
 import gdspy
 
 def get_module_Dict(dirpath, pre_path, exclusions: list = None):
@@ -162,7 +163,7 @@ def save_svg(cell, width: float = 500, path: str = "./svg/temp/svg"):
 
 def get_width(cell):
     # Get the bounding box of the Cell
-    box = cell.get_bounding_box()
+    box = get_cell_bounding_box(cell, include_paths=True)
     if box is None:
         return 0
     min_point, max_point = box
@@ -253,6 +254,82 @@ def change_layer_of_entire_cell(cell, layer, datatype=None):
         for label in c.labels:
             label.layer = layer
 
+def flatten_to_layer(cell, layer, datatype=0, keep_references=False):
+    """
+    Flatten a cell onto a single layer without duplicating the polygon point arrays.
+
+    Unlike gdspy.Cell.flatten, which deep-copies every polygon before remapping its layer,
+    the cell gets new PolygonSet objects that share the point arrays of the original ones.
+    gdspy never modifies point arrays in place, so the cells the polygons came from are left untouched.
+
+    Input:
+        cell: gdspy.Cell, the cell to flatten.
+        layer: int, the layer all elements are moved to.
+        datatype: int, the datatype all elements are moved to.
+        keep_references: bool, if True, references are kept instead of being flattened into polygons.
+
+    Output:
+        cell: gdspy.Cell, the flattened cell.
+    """
+    polygons = []
+    for polygon in cell.polygons:
+        new_polygon = copy.copy(polygon)
+        new_polygon.polygons = list(polygon.polygons)
+        new_polygon.layers = [layer] * len(polygon.polygons)
+        new_polygon.datatypes = [datatype] * len(polygon.polygons)
+        polygons.append(new_polygon)
+    references = cell.references
+    if not keep_references:
+        # Referenced geometry has to be transformed, so these polygons are new anyway
+        for reference in references:
+            for polygon in reference.get_polygonsets():
+                polygon.layers = [layer] * len(polygon.polygons)
+                polygon.datatypes = [datatype] * len(polygon.polygons)
+                polygons.append(polygon)
+        references = []
+    paths = cell.get_paths(depth=0 if keep_references else None)
+    for path in paths:
+        path.layers = [layer] * path.n
+        path.datatypes = [datatype] * path.n
+    labels = cell.get_labels(depth=0 if keep_references else None)
+    for label in labels:
+        label.layer = layer
+    cell.polygons = polygons
+    cell.paths = paths
+    cell.labels = labels
+    cell.references = references
+    cell._bb_valid = False
+    return cell
+
+@contextlib.contextmanager
+def profile_phase(report, phase):
+    """
+    Record the wall time and the peak traced memory of a phase.
+
+    Input:
+        report: Dict or None, phase -> Dict(time, peak_memory) where the measurement is stored.
+                Nothing is measured if report is None.
+        phase: str, the name of the phase.
+
+    Output:
+        None
+    """
+    if report is None:
+        yield
+        return
+    start_tracing = not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report[phase].time = time.perf_counter() - start
+        report[phase].peak_memory = tracemalloc.get_traced_memory()[1]
+        if start_tracing:
+            tracemalloc.stop()
+
 def custom_hash(s):
     """
     Hash a string to a number
@@ -264,6 +341,26 @@ def custom_hash(s):
         result = (result * prime + ord(char)) % (255)  # Prevent overflow, modulo
     return result
 
+def freeze_options(options):
+    """
+    Converts an options tree (nested dicts, lists, tuples and scalars) to a hashable tuple.
+    Two trees give equal tuples only if they hold the same values of the same types (1, 1.0 and True differ),
+    so comparing the tuples with == detects whether the parameters of a component changed.
+    """
+    if isinstance(options, dict):
+        return tuple((k, freeze_options(v)) for k, v in dict.items(options))
+    if isinstance(options, (list, tuple)):
+        return tuple(freeze_options(v) for v in options)
+    if hasattr(options, "tolist"):  # numpy arrays and scalars
+        return freeze_options(options.tolist())
+    if isinstance(options, (bool, int, float, complex)):
+        return (options.__class__, options)
+    try:
+        hash(options)
+        return options
+    except TypeError:
+        return (options.__class__, repr(options))
+
 def jg_dir(topo_pos0, topo_pos1):
     """
     Judging based on two topological coordinates whether topo_pos0 is to the left, right, top, or bottom of topo_pos1
@@ -357,7 +454,7 @@ def export_options(data, path):
     supported_types = (Dict, str, int, float, bool, type(None), list, dict, tuple)
 
     # Check if the data type is supported
-    if type(data) not in supported_types:
+    if not isinstance(data, supported_types):
         raise ValueError(f"Unsupported data type: {type(data)}")
 
     # Export the data to the specified path
@@ -437,73 +534,103 @@ def write_txt(data, path, mode: str = "w"):
     with open(path, mode) as f:
         f.write(data)
 
+def intersect_segments(segs1, segs2, pairs=None, eps: float = 0.0, include_touching: bool = True,
+                       chunk_size: int = 2**22):
+    """
+    Batched intersection of two sets of segments.
+
+    Input:
+        segs1: array-like with shape (N, 2, 2), segments as pairs of (x, y) points.
+        segs2: array-like with shape (M, 2, 2).
+        pairs: (i, j) index arrays of the pairs to intersect, or None for all pairs whose bounding boxes overlap.
+        eps: float, tolerance. Segments are parallel (or collinear) and have no intersection if the sine of
+             their angle is at most eps, and intersection points may lie up to eps outside the segment
+             bounds. With eps=0, the results are those of the exact per-pair test find_itsct.
+        include_touching: bool, if False, intersections within eps of an end point of either segment are dropped.
+        chunk_size: int, the maximum number of pairs compared at once by the bounding box prefilter.
+
+    Output:
+        points: numpy array with shape (K, 2), the intersection points.
+        idx1: numpy array with shape (K,), the indices of the intersecting segments in segs1.
+        idx2: numpy array with shape (K,), the indices in segs2, pairs are in row-major order if pairs is None.
+    """
+    segs1 = np.asarray(segs1, dtype=float).reshape(-1, 2, 2)
+    segs2 = np.asarray(segs2, dtype=float).reshape(-1, 2, 2)
+    if pairs is None:
+        # Bounding box prefilter, in chunks of rows of the pair matrix
+        lo1, hi1 = segs1.min(axis=1) - eps, segs1.max(axis=1) + eps
+        lo2, hi2 = segs2.min(axis=1), segs2.max(axis=1)
+        rows = max(1, chunk_size // max(1, len(segs2)))
+        idx1, idx2 = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)]
+        for start in range(0, len(segs1), rows):
+            stop = min(start + rows, len(segs1))
+            overlap = np.all((lo1[start:stop, None] <= hi2[None]) & (lo2[None] <= hi1[start:stop, None]), axis=2)
+            i, j = np.nonzero(overlap)
+            idx1.append(i + start)
+            idx2.append(j)
+        idx1, idx2 = np.concatenate(idx1), np.concatenate(idx2)
+    else:
+        idx1, idx2 = np.asarray(pairs[0], dtype=int), np.asarray(pairs[1], dtype=int)
+
+    (x1, y1), (x2, y2) = segs1[idx1, 0].T, segs1[idx1, 1].T
+    (x3, y3), (x4, y4) = segs2[idx2, 0].T, segs2[idx2, 1].T
+    det = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    if eps == 0:
+        valid = det != 0
+    else:
+        valid = np.abs(det) > eps * np.hypot(x1 - x2, y1 - y2) * np.hypot(x3 - x4, y3 - y4)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = x1 * y2 - y1 * x2
+        b = x3 * y4 - y3 * x4
+        intersection_x = (a * (x3 - x4) - (x1 - x2) * b) / det
+        intersection_y = (a * (y3 - y4) - (y1 - y2) * b) / det
+
+    # The intersection point must be within the bounds of both segments
+    for u, v, w in [(x1, x2, intersection_x), (y1, y2, intersection_y),
+                    (x3, x4, intersection_x), (y3, y4, intersection_y)]:
+        valid &= (np.minimum(u, v) - eps <= w) & (w <= np.maximum(u, v) + eps)
+    if not include_touching:
+        for x, y in [(x1, y1), (x2, y2), (x3, y3), (x4, y4)]:
+            valid &= np.hypot(intersection_x - x, intersection_y - y) > eps
+
+    points = np.stack([intersection_x[valid], intersection_y[valid]], axis=1)
+    return points, idx1[valid], idx2[valid]
+
 def calc_itscts(path1, path2):
-    path1 = copy.deepcopy(path1)
-    path2 = copy.deepcopy(path2)
-
-    segs1 = []
-    segs2 = []
-
-    for i in range(0, len(path1) - 1):
-        segs1.append([path1[i], path1[i + 1]])
-    for i in range(0, len(path2) - 1):
-        segs2.append([path2[i], path2[i + 1]])
-
-    itscts = []
-    for i in range(0, len(segs1)):
-        for j in range(0, len(segs2)):
-            seg1 = segs1[i]
-            seg2 = segs2[j]
-            itsct = find_itsct(seg1, seg2)
-            if itsct is None:
-                pass
-            else:
-                itscts.append(itsct)
-    return copy.deepcopy(itscts)
+    """
+    Intersection points of the segments of two paths, see intersect_segments.
+
+    Input:
+        path1: list, the points of the first path.
+        path2: list, the points of the second path.
+
+    Output:
+        itscts: list, the [x, y] intersection points, ordered by segment of path1, then segment of path2.
+    """
+    if len(path1) < 2 or len(path2) < 2:
+        return []
+    path1 = np.asarray(path1, dtype=float)[:, :2]
+    path2 = np.asarray(path2, dtype=float)[:, :2]
+    segs1 = np.stack([path1[:-1], path1[1:]], axis=1)
+    segs2 = np.stack([path2[:-1], path2[1:]], axis=1)
+    points, _, _ = intersect_segments(segs1, segs2)
+    return points.tolist()
 
 def find_itsct(segment1, segment2):
-    x1 = segment1[0][0]
-    y1 = segment1[0][1]
-    x2 = segment1[1][0]
-    y2 = segment1[1][1]
-    x3 = segment2[0][0]
-    y3 = segment2[0][1]
-    x4 = segment2[1][0]
-    y4 = segment2[1][1]
-
-    def cross_product(v1, v2):
-        return v1[0] * v2[1] - v1[1] * v2[0]
-
-    def subtract(v1, v2):
-        return (v1[0] - v2[0], v1[1] - v2[1])
-
-    def line_params(p1, p2):
-        a = p2[1] - p1[1]
-        b = p1[0] - p2[0]
-        c = a * p1[0] + b * p1[1]
-        return a, b, c
-
-    det = cross_product((x1 - x2, y1 - y2), (x3 - x4, y3 - y4))
-
-    if det == 0:
-        # Lines are parallel, no intersection
-        return None
+    """
+    Intersection point of two segments, see intersect_segments.
 
-    # Calculate intersection point
-    intersection_x = cross_product((x1 * y2 - y1 * x2, x1 - x2), (x3 * y4 - y3 * x4, x3 - x4)) / det
-    intersection_y = cross_product((x1 * y2 - y1 * x2, y1 - y2), (x3 * y4 - y3 * x4, y3 - y4)) / det
-
-    # Check if the intersection point is within the bounds of both line segments
-    if (
-        min(x1, x2) <= intersection_x <= max(x1, x2) and
-        min(y1, y2) <= intersection_y <= max(y1, y2) and
-        min(x3, x4) <= intersection_x <= max(x3, x4) and
-        min(y3, y4) <= intersection_y <= max(y3, y4)
-    ):
-        return [intersection_x, intersection_y]
-    else:
-        # Intersection point is outside the bounds of at least one line segment
+    Input:
+        segment1: list, the two end points of the first segment.
+        segment2: list, the two end points of the second segment.
+
+    Output:
+        itsct: list, the [x, y] intersection point, or None if the segments do not intersect or are parallel.
+    """
+    points, _, _ = intersect_segments([segment1], [segment2], pairs=([0], [0]))
+    if len(points) == 0:
         return None
+    return points[0].tolist()
     
 def rotate_point(point, center, angle):
     # Convert angles to radians
@@ -587,7 +714,7 @@ def generate_python_class_from_gds(filepath: str, location: str):
 
     # Create class content
     class_definition = f"""
-import gdspy, copy
+import gdspy, copy, toolbox
 from addict import Dict
 import math as mt
 from base.library_base import LibraryBase
@@ -629,20 +756,11 @@ class {class_name}(LibraryBase):
             self.cell.add(gdspy.Polygon(polygon_points, layer=layer))
 
     def _calculate_bounding_box(self):
-        min_x, min_y = float("inf"), float("inf")
-        max_x, max_y = float("-inf"), float("-inf")
-
-        for polygon in self.cell.polygons:
-            bbox = polygon.get_bounding_box()
-            if bbox is not None:
-                min_x = min(min_x, bbox[0][0])
-                min_y = min(min_y, bbox[0][1])
-                max_x = max(max_x, bbox[1][0])
-                max_y = max(max_y, bbox[1][1])
-
-        if min_x == float("inf") or min_y == float("inf"):
+        bbox = toolbox.get_polygons_bounding_box(self.cell.polygons)
+        if bbox is None:
             raise ValueError("No valid polygons found in the cell.")
 
+        (min_x, min_y), (max_x, max_y) = bbox
         return min_x, min_y, max_x, max_y
 
     def _transform_polygons(self, dx, dy, rotation, center):
@@ -708,36 +826,63 @@ def generate_gds_pos2(topo_positions, dist):
         gds_pos[q_name] = (topo_pos[0]*dist, topo_pos[1]*dist)
     return copy.deepcopy(gds_pos)
 
-def get_cell_bounding_box(cell):
-    if not cell.polygons and not cell.references:
-        return None  # if Cell is empty, return None
+def get_points_bounding_box(point_arrays):
+    """
+    Bounding box of a list of vertex arrays, computed on the concatenated vertices.
 
-    # Initialize minimum and maximum coordinates
-    min_x, min_y = float('inf'), float('inf')
-    max_x, max_y = -float('inf'), -float('inf')
+    Input:
+        point_arrays: list of numpy arrays with shape (n, 2).
 
-    # Traverse all polygons
-    for polygon in cell.polygons:
-        bbox = polygon.get_bounding_box()
-        if bbox.any():
-            min_x = min(min_x, bbox[0][0])
-            min_y = min(min_y, bbox[0][1])
-            max_x = max(max_x, bbox[1][0])
-            max_y = max(max_y, bbox[1][1])
-
-    # Traverse all references (CellReference and CellArray)
-    for ref in cell.references:
-        bbox = ref.get_bounding_box()
-        if bbox.any():
-            min_x = min(min_x, bbox[0][0])
-            min_y = min(min_y, bbox[0][1])
-            max_x = max(max_x, bbox[1][0])
-            max_y = max(max_y, bbox[1][1])
-
-    # If there is no effective bounding box, return None
-    if min_x == float('inf'):
+    Output:
+        bbox: numpy array [[min_x, min_y], [max_x, max_y]], or None if there are no vertices.
+    """
+    point_arrays = [points for points in point_arrays if len(points) > 0]
+    if not point_arrays:
         return None
+    points = np.concatenate(point_arrays)
+    return np.array([points.min(axis=0), points.max(axis=0)], dtype=float)
+
+def get_polygons_bounding_box(polygons):
+    """
+    Bounding box of a list of gdspy PolygonSet objects.
+
+    Input:
+        polygons: list of gdspy.PolygonSet.
 
+    Output:
+        bbox: numpy array [[min_x, min_y], [max_x, max_y]], or None if there are no vertices.
+    """
+    return get_points_bounding_box([points for polygon in polygons for points in polygon.polygons])
+
+def get_cell_bounding_box(cell, include_paths: bool = False):
+    """
+    Bounding box of a cell, including its references.
+
+    The vertices of all the polygons are reduced in one vectorized pass. Nothing is cached between calls,
+    gdspy modifies the vertex arrays of a PolygonSet in place (fillet, fracture, user code).
+
+    Input:
+        cell: gdspy.Cell.
+        include_paths: bool, also include the paths of the cell, as gdspy.Cell.get_bounding_box does.
+
+    Output:
+        bbox: ((min_x, min_y), (max_x, max_y)) as floats, or None if the cell is empty.
+    """
+    polygons_bbox = get_polygons_bounding_box(cell.polygons)
+    bboxes = [] if polygons_bbox is None else [polygons_bbox]
+    for ref in cell.references:  # CellReference and CellArray
+        bbox = ref.get_bounding_box()
+        if bbox is not None:
+            bboxes.append(bbox)
+    if include_paths:
+        for path in cell.paths:
+            polygon = path.to_polygonset()
+            if polygon is not None:
+                bboxes.append(get_polygons_bounding_box([polygon]))
+    bbox = get_points_bounding_box([b for b in bboxes if b is not None])
+    if bbox is None:
+        return None
+    (min_x, min_y), (max_x, max_y) = bbox.tolist()
     return (min_x, min_y), (max_x, max_y)
 
 def custom_calculation(options1, options2):